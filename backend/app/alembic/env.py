@@ -5,6 +5,9 @@ from sqlalchemy import pool
 
 from alembic import context
 from models.todo import Base
+import models.event  # noqa: F401
+import models.archive  # noqa: F401
+from models.search_index import FTS_TABLE
 from core.config import settings
 
 # this is the Alembic Config object, which provides
@@ -13,7 +16,8 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# (skipped when run from the app, which has its own logging)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -28,6 +32,14 @@ target_metadata = Base.metadata
 # ... etc.
 config.set_main_option("sqlalchemy.url", settings.database_url)
 
+
+def include_name(name, type_, parent_names):
+    """Keep autogenerate away from the FTS5 shadow tables (see 0003)."""
+    if type_ == "table":
+        return not name.startswith(FTS_TABLE)
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -46,6 +58,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -67,7 +80,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
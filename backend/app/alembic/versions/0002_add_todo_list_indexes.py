@@ -0,0 +1,30 @@
+"""add keyset list indexes on todos
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_todos_status_id', 'todos', ['status', 'id'], unique=False)
+    op.create_index('ix_todos_assignee_id', 'todos', ['assignee', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_assignee_id', table_name='todos')
+    op.drop_index('ix_todos_status_id', table_name='todos')
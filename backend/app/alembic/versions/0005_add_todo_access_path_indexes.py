@@ -0,0 +1,39 @@
+"""add assignee/status and claim queue indexes on todos
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CLAIMABLE = "status = 'TODO'"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # duplicates the primary key; every insert paid for it twice
+    op.drop_index('ix_todos_id', table_name='todos')
+    op.create_index('ix_todos_assignee_status_id', 'todos', ['assignee', 'status', 'id'], unique=False)
+    op.create_index(
+        'ix_todos_claimable', 'todos', ['created_at', 'id'], unique=False,
+        sqlite_where=sa.text(CLAIMABLE), postgresql_where=sa.text(CLAIMABLE),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_claimable', table_name='todos')
+    op.drop_index('ix_todos_assignee_status_id', table_name='todos')
+    op.create_index('ix_todos_id', 'todos', ['id'], unique=False)
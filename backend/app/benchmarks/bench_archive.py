@@ -0,0 +1,129 @@
+# app/benchmarks/bench_archive.py
+"""
+Tiered storage: reads on a table full of old completed tasks vs. after archiving them.
+
+    python -m benchmarks.bench_archive --rows 1000000 --completed 0.9
+
+Seeds --rows tasks, of which the --completed fraction are COMPLETED and
+older than the archive cutoff, then times the common reads (a list page,
+a status page, title search, a full keyset walk as the WebSocket
+snapshot does it) and the on-disk size of todos and its indexes. Then
+moves the old completed tasks to todos_archive in --batch-size batches
+(reporting the time and the longest single transaction) and times the
+same reads again, plus the include_archived variants.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text, update
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import ASSIGNEES, NOUNS, drop_engine, measure, seed_todos, summarize, temp_engine
+from models.todo import TaskStatus, Todo
+from repositories.todo import TodoRepository
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def table_size(db) -> str:
+    sizes = db.execute(text(
+        "SELECT SUM(pgsize) FROM dbstat WHERE name = 'todos' OR name LIKE 'ix_todos_%' OR name LIKE 'todos_fts%'"
+    )).scalar()
+    return f"{sizes / 2**20:.1f}MiB"
+
+
+def reads(db, rows: int, iterations: int, limit: int, include_archived: bool = False) -> dict:
+    rng = random.Random(5)
+
+    def list_page():
+        TodoRepository.list_page(db, limit, after_id=rng.randrange(rows), include_archived=include_archived)
+        db.expunge_all()
+
+    def completed_page():
+        TodoRepository.list_page(db, limit, after_id=rng.randrange(rows), status=TaskStatus.COMPLETED,
+                                 include_archived=include_archived)
+        db.expunge_all()
+
+    def assignee_page():
+        TodoRepository.list_page(db, limit, assignee=rng.choice(ASSIGNEES), include_archived=include_archived)
+        db.expunge_all()
+
+    def search():
+        TodoRepository.search_by_title(db, rng.choice(NOUNS), limit=limit, include_archived=include_archived)
+        db.expunge_all()
+
+    def snapshot_walk():
+        for _ in TodoRepository.iter_batches(db, 1000):
+            pass
+        db.expunge_all()
+
+    results = {
+        "list page": measure(list_page, iterations),
+        "completed page": measure(completed_page, iterations),
+        "assignee page": measure(assignee_page, iterations),
+        "search": measure(search, iterations),
+    }
+    if not include_archived:
+        results["snapshot walk"] = measure(snapshot_walk, 3)
+    return results
+
+
+def report(label: str, results: dict) -> None:
+    for name, r in results.items():
+        print(f"{label:<16} {name:<15} p50={r['p50']:9.2f}ms  p99={r['p99']:9.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--completed", type=float, default=0.9, help="fraction of old completed tasks")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = temp_engine("archive")
+    seed_todos(engine, args.rows)
+    old = NOW - timedelta(days=90)
+    with engine.begin() as conn:
+        conn.execute(update(Todo).where(Todo.id % 100 < args.completed * 100)
+                     .values(status=TaskStatus.COMPLETED))
+        conn.execute(update(Todo).where(Todo.id % 100 >= args.completed * 100, Todo.status == TaskStatus.COMPLETED)
+                     .values(status=TaskStatus.TODO))
+        # last, so updated_at's onupdate does not stamp the rows as fresh
+        conn.execute(update(Todo).values(created_at=old, updated_at=old))
+        conn.execute(text("ANALYZE"))
+    db = sessionmaker(bind=engine)()
+    try:
+        print(f"before           todos={table_size(db)}")
+        report("before", reads(db, args.rows, args.iterations, args.limit))
+
+        batches, moved, after_id = [], 0, 0
+        start = time.perf_counter()
+        while True:
+            batch_start = time.perf_counter()
+            rows = TodoRepository.archive_completed(db, NOW - timedelta(days=30), args.batch_size, after_id)
+            if not rows:
+                break
+            batches.append((time.perf_counter() - batch_start) * 1000)
+            moved += len(rows)
+            after_id = rows[-1]["id"]
+        elapsed = time.perf_counter() - start
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        batch = summarize(batches)
+        print(f"archive          moved {moved} in {elapsed:.1f}s  ({moved / elapsed:.0f} rows/s)  "
+              f"batch p50={batch['p50']:.1f}ms max={batch['max']:.1f}ms")
+
+        print(f"after            todos={table_size(db)}")
+        report("after", reads(db, args.rows, args.iterations, args.limit))
+        report("after+archived", reads(db, args.rows, args.iterations, args.limit, include_archived=True))
+    finally:
+        db.close()
+        drop_engine(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# app/benchmarks/bench_async_load.py
+"""
+Concurrent create/list load against the old sync-session handlers and the
+AsyncSession path, in one process on one event loop.
+
+    python -m benchmarks.bench_async_load --concurrency 20 --requests 400
+
+Besides requests/sec it samples event-loop lag: blocking DB calls made
+from `async def` handlers show up as lag every other coroutine (sockets,
+other requests) has to wait out.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.common import drop_engine, seed_todos, summarize, temp_engine
+from database.async_connection import get_async_db, to_async_url
+from routers.todo_routers import router
+from schemas.todo import TodoCreate, TodoResponse
+from service.todo_service import TodoService
+
+
+def sync_app(url: str, pool_size: int) -> FastAPI:
+    """The pre-async handlers: sync Session used directly inside async def."""
+    # a pool checkout that has to wait blocks the loop that would release
+    # the connection, so the old path needs a pool as wide as the load
+    engine = create_engine(url, pool_size=pool_size, connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.post("/tasks/", response_model=TodoResponse, status_code=201)
+    async def create_task(payload: TodoCreate, db: Session = Depends(get_db)):
+        return TodoService.create_task(db, payload)
+
+    @app.get("/tasks/")
+    async def list_tasks(db: Session = Depends(get_db)):
+        rows, _ = TodoService.list_tasks(db, 100)
+        return [TodoResponse.model_validate(r) for r in rows]
+
+    return app
+
+
+def async_app(url: str, pool_size: int) -> FastAPI:
+    async_engine = create_async_engine(to_async_url(url), pool_size=pool_size)
+    SessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router, prefix="/tasks")
+    app.dependency_overrides[get_async_db] = get_db
+    return app
+
+
+async def drive(app: FastAPI, concurrency: int, total: int) -> dict:
+    lag: list = []
+    errors = 0
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag.append((time.perf_counter() - start - 0.001) * 1000)
+
+    async def worker(client: httpx.AsyncClient, n: int):
+        nonlocal errors
+        for i in range(n):
+            if i % 4 == 0:
+                response = await client.get("/tasks/")
+            else:
+                response = await client.post("/tasks/", json={"title": f"load {i}"})
+            errors += response.status_code >= 400
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, total // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+    return {"rps": total / elapsed, "errors": errors, "lag": summarize(lag)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--seed-rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    for name, build in (("sync (old)", sync_app), ("async", async_app)):
+        engine = temp_engine("load")
+        seed_todos(engine, args.seed_rows)
+        app = build(str(engine.url), args.concurrency)
+        result = asyncio.run(drive(app, args.concurrency, args.requests))
+        lag = result["lag"]
+        print(f"{name:<11} {result['rps']:8.1f} req/s  errors={result['errors']}  loop lag p50={lag['p50']:.2f}ms "
+              f"p99={lag['p99']:.2f}ms max={lag['max']:.2f}ms")
+        drop_engine(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# app/benchmarks/bench_batching.py
+"""
+Socket fan-out per event vs. a coalescing batch window, at a steady write rate.
+
+    python -m benchmarks.bench_batching --sockets 1000 --rate 1000 --windows 0,20,50
+
+Writes arrive at --rate per second for --seconds; --claims of them claim a
+task created a moment earlier (what merging by task id saves). Reports
+frames written per second (each one a send and a client re-render), CPU
+seconds spent by the process, and how long events took to reach a socket.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.loadgen import latency
+from core.ConnectionManager import ConnectionManager
+
+
+class SimSocket:
+    def __init__(self, written: dict, sent_at: dict = None):
+        self.written = written
+        # only one socket decodes its frames, to time delivery
+        self.sent_at = sent_at
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        self.written["frames"] += 1
+        if self.sent_at is not None:
+            now = time.perf_counter()
+            frame = json.loads(data)
+            for event in frame.get("events") or [frame]:
+                self.written["delays"].append((now - self.sent_at.pop(event["seq"])) * 1000)
+        await asyncio.sleep(0)  # a real send always yields once
+
+
+async def run(window_ms: float, sockets: int, rate: int, seconds: float, claims: float, batch_max: int) -> dict:
+    rng = random.Random(11)
+    manager = ConnectionManager(queue_size=4096, batch_window=window_ms / 1000, batch_max=batch_max)
+    written = {"frames": 0, "delays": []}
+    sent_at = {}
+    for i in range(sockets):
+        await manager.connect(SimSocket(written, sent_at if i == 0 else None))
+
+    total = int(rate * seconds)
+    created = []
+    cpu, start = time.process_time(), time.perf_counter()
+    for n in range(total):
+        due = start + n / rate
+        if due > time.perf_counter():
+            await asyncio.sleep(due - time.perf_counter())
+        if created and rng.random() < claims:
+            task = {"id": created[-rng.randrange(min(len(created), 20)) - 1], "assignee": "bench",
+                    "status": "inprogress", "title": "benchmark task", "description": "x" * 80}
+            event = {"type": "task_updated", "task": task}
+        else:
+            created.append(n)
+            event = {"type": "task_created", "task": {"id": n, "assignee": None, "status": "todo",
+                                                      "title": "benchmark task", "description": "x" * 80}}
+        sent_at[manager.events.last_seq + 1] = time.perf_counter()
+        await manager.broadcast(event)
+    manager.flush()
+    while any(q.qsize() for q in manager._queues.values()):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    await manager.stop()
+    return {
+        "frames_per_sec": written["frames"] / elapsed,
+        "cpu_seconds": cpu,
+        "merged": manager.merged,
+        "dropped": manager.dropped,
+        "elapsed": elapsed,
+        **latency(written["delays"]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sockets", type=int, default=1000)
+    parser.add_argument("--rate", type=int, default=1000, help="writes per second")
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--claims", type=float, default=0.3, help="fraction of writes claiming a recent task")
+    parser.add_argument("--windows", default="0,20,50", help="batch windows (ms) to compare; 0 = per event")
+    parser.add_argument("--batch-max", type=int, default=256)
+    args = parser.parse_args()
+
+    for window in (float(w) for w in args.windows.split(",")):
+        r = asyncio.run(run(window, args.sockets, args.rate, args.seconds, args.claims, args.batch_max))
+        name = "per event" if window <= 0 else f"window {window:g}ms"
+        print(f"{name:<12} {r['frames_per_sec']:10.0f} frames/s  cpu {r['cpu_seconds']:6.2f}s  "
+              f"{r['elapsed']:5.1f}s wall  merged {r['merged']:5d}  dropped {r['dropped']:6d}  "
+              f"delivery p50={r['p50']:8.1f}ms p99={r['p99']:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# app/benchmarks/bench_broadcast.py
+"""
+WebSocket fan-out: old serial `send_json` loop vs. the queued broadcast
+engine, against simulated sockets.
+
+    python -m benchmarks.bench_broadcast --sockets 10000 --slow 0.01
+
+A --slow fraction of sockets takes --slow-ms per send. Reports how long
+until every *fast* socket has the event (what a slow client costs
+everyone else) and until all sockets have it.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from core.ConnectionManager import ConnectionManager
+
+EVENT = {
+    "type": "task_created",
+    "task": {"id": 1, "title": "benchmark task", "description": "x" * 80,
+             "assignee": "user1", "status": "todo",
+             "created_at": "2026-10-17T09:00:00", "updated_at": None},
+}
+
+
+class SimSocket:
+    def __init__(self, delay: float, remaining: dict):
+        self.delay = delay
+        self.remaining = remaining
+
+    async def accept(self):
+        pass
+
+    async def _deliver(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)  # a real send always yields once
+        self.remaining[self.delay > 0] -= 1
+        if not self.remaining[False]:
+            self.remaining.setdefault("fast_done", time.perf_counter())
+
+    async def send_text(self, data: str):
+        await self._deliver()
+
+    async def send_json(self, data: dict):
+        json.dumps(data)  # what starlette does per socket
+        await self._deliver()
+
+
+class SerialManager:
+    """The pre-change broadcast loop."""
+
+    def __init__(self):
+        self.active = set()
+
+    async def connect(self, ws):
+        await ws.accept()
+        self.active.add(ws)
+
+    async def broadcast(self, message: dict):
+        for ws in list(self.active):
+            await ws.send_json(message)
+
+
+async def run(manager, sockets: int, slow: float, slow_ms: float, events: int) -> dict:
+    rng = random.Random(3)
+    slow_count = int(sockets * slow)
+    remaining = {}
+    socks = [SimSocket(slow_ms / 1000 if i < slow_count else 0.0, remaining) for i in range(sockets)]
+    rng.shuffle(socks)
+    for ws in socks:
+        await manager.connect(ws)
+
+    fast_ms, all_ms = [], []
+    for _ in range(events):
+        remaining.clear()
+        remaining.update({True: slow_count, False: sockets - slow_count})
+        start = time.perf_counter()
+        await manager.broadcast(EVENT)
+        while remaining[True] or remaining[False]:
+            await asyncio.sleep(0.0005)
+        all_ms.append((time.perf_counter() - start) * 1000)
+        fast_ms.append((remaining["fast_done"] - start) * 1000)
+    return {"fast": sorted(fast_ms)[len(fast_ms) // 2], "all": sorted(all_ms)[len(all_ms) // 2]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sockets", type=int, default=10_000)
+    parser.add_argument("--slow", type=float, default=0.01, help="fraction of slow sockets")
+    parser.add_argument("--slow-ms", type=float, default=20.0)
+    parser.add_argument("--events", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, factory in (("serial (old)", SerialManager), ("queued", ConnectionManager)):
+        result = asyncio.run(run(factory(), args.sockets, args.slow, args.slow_ms, args.events))
+        print(f"{name:<13} {args.sockets} sockets  fast sockets served in {result['fast']:9.1f}ms  "
+              f"all in {result['all']:9.1f}ms  (median of {args.events} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# app/benchmarks/bench_bulk.py
+"""
+Importing tasks: looped single POSTs vs. POST /tasks/bulk vs. NDJSON upload.
+
+    python -m benchmarks.bench_bulk --rows 20000 --single-rows 500
+
+Reports rows/sec for each path and how many broadcast events it
+produced. Single POSTs pay a commit (fsync) per row, so they run on a
+smaller --single-rows sample.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.bench_cache import build_app
+from benchmarks.common import drop_engine, temp_engine
+from core.ConnectionManager import manager
+
+
+def payloads(n: int, tag: str):
+    return [{"title": f"{tag} import {i}", "description": "imported", "assignee": f"user{i % 50}"} for i in range(n)]
+
+
+async def run(url: str, rows: int, single_rows: int, batch: int) -> None:
+    app = build_app(url, 5)
+    events = []
+
+    async def count(payload: str):
+        events.append(payload)
+
+    manager.backplane.attach(count)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def single():
+            for item in payloads(single_rows, "single"):
+                (await client.post("/tasks/", json=item)).raise_for_status()
+            return single_rows
+
+        async def bulk():
+            items = payloads(rows, "bulk")
+            for i in range(0, rows, batch):
+                (await client.post("/tasks/bulk", json=items[i:i + batch])).raise_for_status()
+            return rows
+
+        async def ndjson():
+            body = "\n".join(json.dumps(item) for item in payloads(rows, "ndjson")).encode()
+
+            async def stream():
+                for i in range(0, len(body), 64 * 1024):
+                    yield body[i:i + 64 * 1024]
+
+            response = await client.post(
+                "/tasks/bulk/ndjson", content=stream(), headers={"content-type": "application/x-ndjson"}
+            )
+            response.raise_for_status()
+            return response.json()["created"]
+
+        for name, path in (("single POST", single), ("bulk JSON", bulk), ("NDJSON", ndjson)):
+            events.clear()
+            start = time.perf_counter()
+            created = await path()
+            elapsed = time.perf_counter() - start
+            await asyncio.sleep(0)  # let the background broadcasts run
+            print(f"{name:<12} {created:>7} rows  {created / elapsed:10.0f} rows/s  {len(events):>6} events")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--single-rows", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=5000, help="items per /tasks/bulk request")
+    args = parser.parse_args()
+    engine = temp_engine("bulk")
+    asyncio.run(run(str(engine.url), args.rows, args.single_rows, args.batch))
+    drop_engine(engine)
+
+
+if __name__ == "__main__":
+    main()
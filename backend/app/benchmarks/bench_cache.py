@@ -0,0 +1,100 @@
+# app/benchmarks/bench_cache.py
+"""
+Read-heavy polling load with the response cache off, on, and on with ETags.
+
+    python -m benchmarks.bench_cache --concurrency 20 --requests 4000 --write-ratio 0.02
+
+Clients poll the first pages of /tasks (unfiltered and by status) and a
+few searches; --write-ratio of requests create a task, which evicts the
+entries it touches. In the `etag` run clients send If-None-Match with the
+last ETag they saw for each URL and get 304s while nothing changed.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from benchmarks.common import WORDS, drop_engine, seed_todos, summarize, temp_engine
+from database.async_connection import get_async_db, to_async_url
+from routers.todo_routers import router
+from service.task_cache import task_cache
+
+URLS = ["/tasks/?limit=100", "/tasks/?limit=100&status=todo", "/tasks/?limit=100&status=completed"] + [
+    f"/tasks/search?title={w}&limit=20" for w in WORDS[:4]
+]
+
+
+def build_app(url: str, pool_size: int) -> FastAPI:
+    engine = create_async_engine(to_async_url(url), pool_size=pool_size)
+    SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router, prefix="/tasks")
+    app.dependency_overrides[get_async_db] = get_db
+    return app
+
+
+async def drive(app: FastAPI, concurrency: int, total: int, write_ratio: float, etags: bool) -> dict:
+    samples = []
+    statuses = {}
+    rng = random.Random(3)
+    remaining = total
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal remaining
+        seen = {}
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            if rng.random() < write_ratio:
+                response = await client.post("/tasks/", json={"title": "poll bench"})
+            else:
+                url = rng.choice(URLS)
+                headers = {"If-None-Match": seen[url]} if etags and url in seen else {}
+                response = await client.get(url, headers=headers)
+                if "etag" in response.headers:
+                    seen[url] = response.headers["etag"]
+            samples.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {**summarize(samples), "rps": total / elapsed, "statuses": statuses}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--write-ratio", type=float, default=0.02)
+    parser.add_argument("--seed-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = temp_engine("cache")
+    seed_todos(engine, args.seed_rows)
+    for name, enabled, etags in (("no cache", False, False), ("cache", True, False), ("cache+etag", True, True)):
+        task_cache.clear()
+        task_cache.enabled = enabled
+        hits_before, misses_before = task_cache.hits, task_cache.misses
+        app = build_app(str(engine.url), args.concurrency)
+        r = asyncio.run(drive(app, args.concurrency, args.requests, args.write_ratio, etags))
+        lookups = task_cache.hits - hits_before + task_cache.misses - misses_before
+        hit_ratio = (task_cache.hits - hits_before) / lookups if enabled and lookups else 0.0
+        print(f"{name:<11} {r['rps']:8.1f} req/s  p50={r['p50']:7.2f}ms  p99={r['p99']:7.2f}ms  "
+              f"hit ratio={hit_ratio:.2f}  statuses={dict(sorted(r['statuses'].items()))}")
+    drop_engine(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# app/benchmarks/bench_claim.py
+"""
+Contended claims: old read-modify-write vs. the conditional UPDATE.
+
+    python -m benchmarks.bench_claim --claimers 16 --tasks 200
+
+Every claimer thread (own connection, like a worker) tries to claim every
+task, in a shuffled order. Reports claim attempts/sec, how many tasks
+ended up with more than one "winner" (a claim that was overwritten) and
+how many attempts failed with "database is locked" (the old path reads
+before it writes; SQLite fails a lock upgrade that would deadlock
+instead of waiting for it).
+"""
+import argparse
+import random
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import drop_engine, temp_engine
+from models.todo import TaskStatus
+from repositories.todo import TodoRepository
+from schemas.todo import TodoClaim, TodoCreate
+from service.todo_service import TaskConflictError, TodoService
+
+
+def old_claim(db, task_id: int, data: TodoClaim):
+    """The previous TodoService.claim_task."""
+    todo = TodoRepository.get_by_id(db, task_id)
+    if not todo:
+        return None
+    if todo.status != TaskStatus.TODO:
+        raise ValueError("Only TODO tasks can be claimed")
+    todo.assignee = data.assignee
+    todo.status = data.status
+    return TodoRepository.save(db, todo)
+
+
+def run(name: str, claim, claimers: int, tasks: int) -> None:
+    schema = temp_engine("claim")
+    # writers queue on SQLite's lock; wait for it rather than erroring out
+    engine = create_engine(schema.url, connect_args={"timeout": 120})
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        ids = [t.id for t in TodoService.create_tasks(db, [TodoCreate(title=f"job {n}") for n in range(tasks)])]
+
+    wins = {task_id: 0 for task_id in ids}
+    locked = 0
+    lock = threading.Lock()
+    start = threading.Barrier(claimers + 1)
+
+    def claimer(n: int):
+        nonlocal locked
+        order = random.Random(n).sample(ids, len(ids))
+        start.wait()
+        with Session() as db:
+            for task_id in order:
+                try:
+                    if claim(db, task_id, TodoClaim(assignee=f"worker{n}")) is not None:
+                        with lock:
+                            wins[task_id] += 1
+                except (TaskConflictError, ValueError):
+                    db.rollback()
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        locked += 1
+
+    threads = [threading.Thread(target=claimer, args=(n,)) for n in range(claimers)]
+    for t in threads:
+        t.start()
+    start.wait()
+    began = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - began
+    attempts = claimers * tasks
+    doubled = sum(1 for w in wins.values() if w > 1)
+    print(f"{name:<20} {attempts / elapsed:9.0f} attempts/s  {sum(wins.values()):>5} wins for {tasks} tasks  "
+          f"{doubled} claimed more than once  {locked} lock errors")
+    engine.dispose()
+    drop_engine(schema)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--claimers", type=int, default=16)
+    parser.add_argument("--tasks", type=int, default=200)
+    args = parser.parse_args()
+    run("read-modify-write", old_claim, args.claimers, args.tasks)
+    run("conditional UPDATE", TodoService.claim_task, args.claimers, args.tasks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# app/benchmarks/bench_claim_next.py
+"""
+Competing queue workers: list-then-claim vs. POST /tasks/claim-next.
+
+    python -m benchmarks.bench_claim_next --workers 32 --tasks 2000 --rows 100000
+
+Starts uvicorn on a database of --rows finished tasks plus a queue of
+--tasks TODO tasks, then --workers clients drain the queue:
+
+  list+claim  GET /tasks?status=todo, PUT /{id}/claim on the first task,
+              again on a 409 (what workers had to do before)
+  claim-next  POST /tasks/claim-next until it answers 204
+  long-poll   tasks are created one at a time (--rate per second) while
+              the workers wait in claim-next?wait=5; reports the delay
+              from a task's creation to its claim
+
+Reports claims/sec, requests per claim, 409s, and fairness: tasks per
+worker (min / max) and Jain's index (1.0 = every worker got the same).
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import insert, update
+
+from benchmarks.common import drop_engine, seed_todos, temp_engine
+from benchmarks.loadgen import LocalServer, latency
+from models.todo import TaskStatus, Todo
+
+
+def fairness(per_worker: List[int]) -> Dict[str, float]:
+    total = sum(per_worker)
+    squares = sum(n * n for n in per_worker)
+    return {
+        "min": min(per_worker),
+        "max": max(per_worker),
+        "jain": round(total * total / (len(per_worker) * squares), 3) if squares else 0.0,
+    }
+
+
+async def drain(base_url: str, mode: str, workers: int) -> dict:
+    claims = [0] * workers
+    requests = Counter()
+
+    async def worker(n: int, client: httpx.AsyncClient):
+        claim = {"assignee": f"worker{n}"}
+        while True:
+            if mode == "claim-next":
+                response = await client.post("/tasks/claim-next", json=claim)
+                requests[response.status_code] += 1
+                if response.status_code == 204:
+                    return
+                response.raise_for_status()
+                claims[n] += 1
+                continue
+            page = await client.get("/tasks/", params={"status": "todo", "limit": 20})
+            requests[page.status_code] += 1
+            tasks = page.json()
+            if not tasks:
+                return
+            response = await client.put(f"/tasks/{tasks[0]['id']}/claim", json=claim)
+            requests[response.status_code] += 1
+            if response.status_code == 200:
+                claims[n] += 1
+            elif response.status_code != 409:
+                response.raise_for_status()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60,
+                                 limits=httpx.Limits(max_connections=workers)) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n, client) for n in range(workers)))
+        elapsed = time.perf_counter() - start
+    total = sum(claims)
+    return {
+        "claims_per_sec": total / elapsed,
+        "requests_per_claim": sum(requests.values()) / max(1, total),
+        "conflicts": requests[409],
+        "claimed": total,
+        **fairness(claims),
+    }
+
+
+async def long_poll(base_url: str, workers: int, tasks: int, rate: float) -> dict:
+    claims = [0] * workers
+    created_at: Dict[int, float] = {}
+    delays: List[float] = []
+    empty = 0
+    done = asyncio.Event()
+
+    async def worker(n: int, client: httpx.AsyncClient):
+        nonlocal empty
+        while not done.is_set():
+            response = await client.post("/tasks/claim-next", params={"wait": 5},
+                                         json={"assignee": f"worker{n}"})
+            if response.status_code == 204:
+                empty += 1
+                continue
+            response.raise_for_status()
+            now = time.perf_counter()
+            claims[n] += 1
+            task_id = response.json()["id"]
+            if task_id in created_at:
+                delays.append((now - created_at[task_id]) * 1000)
+            if sum(claims) >= tasks:
+                done.set()
+
+    async def producer(client: httpx.AsyncClient):
+        start = time.perf_counter()
+        for i in range(tasks):
+            due = start + i / rate
+            if due > time.perf_counter():
+                await asyncio.sleep(due - time.perf_counter())
+            sent = time.perf_counter()
+            response = await client.post("/tasks/", json={"title": f"job {i}"})
+            created_at[response.json()["id"]] = sent
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60,
+                                 limits=httpx.Limits(max_connections=workers + 1)) as client:
+        waiting = [asyncio.create_task(worker(n, client)) for n in range(workers)]
+        await asyncio.sleep(0.5)
+        await producer(client)
+        try:
+            await asyncio.wait_for(done.wait(), 30)
+        finally:
+            done.set()
+            await asyncio.gather(*waiting)
+    return {"claimed": sum(claims), "empty_polls": empty, **latency(delays), **fairness(claims)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=100_000, help="finished tasks already in the table")
+    parser.add_argument("--rate", type=float, default=100, help="long-poll: tasks created per second")
+    args = parser.parse_args()
+
+    for mode in ("list+claim", "claim-next", "long-poll"):
+        engine = temp_engine("claim-next")
+        seed_todos(engine, args.rows)
+        with engine.begin() as conn:
+            conn.execute(update(Todo).values(status=TaskStatus.COMPLETED))
+            if mode != "long-poll":
+                conn.execute(insert(Todo), [{"title": f"job {i}", "status": TaskStatus.TODO}
+                                            for i in range(args.tasks)])
+        try:
+            with LocalServer(str(engine.url)) as server:
+                if mode == "long-poll":
+                    r = asyncio.run(long_poll(server.base_url, args.workers, args.tasks, args.rate))
+                    print(f"{mode:<11} {r['claimed']:>6} claimed  {r['empty_polls']:>4} empty polls  "
+                          f"create->claim p50={r['p50']:7.1f}ms p99={r['p99']:7.1f}ms  "
+                          f"per worker {r['min']}-{r['max']}  jain={r['jain']}")
+                else:
+                    r = asyncio.run(drain(server.base_url, mode, args.workers))
+                    print(f"{mode:<11} {r['claimed']:>6} claimed  {r['claims_per_sec']:8.0f} claims/s  "
+                          f"{r['requests_per_claim']:5.2f} requests/claim  {r['conflicts']:>6} conflicts  "
+                          f"per worker {r['min']}-{r['max']}  jain={r['jain']}")
+        finally:
+            drop_engine(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# app/benchmarks/bench_indexes.py
+"""
+Access-path indexes on todos: the schema before migration 0005 vs. after.
+
+    python -m benchmarks.bench_indexes --rows 1000000
+
+"before" drops ix_todos_assignee_status_id and ix_todos_claimable and
+restores the old ix_todos_id; the next TODO tasks are then read the only
+way that schema allows (status index, sort by created_at). Reports query
+latency per access path, the insert rate with each index set and the
+on-disk size of every index.
+"""
+import argparse
+import random
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import ASSIGNEES, drop_engine, measure, seed_todos, temp_engine
+from models.todo import Todo, TaskStatus
+from repositories.todo import TodoRepository
+
+BEFORE = [
+    "DROP INDEX ix_todos_assignee_status_id",
+    "DROP INDEX ix_todos_claimable",
+    "CREATE INDEX ix_todos_id ON todos (id)",
+]
+
+
+def run(schema: str, rows: int, iterations: int, limit: int) -> None:
+    engine = temp_engine("indexes")
+    with engine.begin() as conn:
+        for stmt in BEFORE if schema == "before" else []:
+            conn.execute(text(stmt))
+    seed_todos(engine, rows)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(3)
+
+    def next_claimable():
+        if schema == "before":
+            stmt = (select(Todo).where(Todo.status == TaskStatus.TODO)
+                    .order_by(Todo.created_at, Todo.id).limit(limit))
+            list(db.scalars(stmt))
+        else:
+            TodoRepository.next_claimable(db, limit)
+        db.expunge_all()
+
+    def my_tasks_in_status():
+        TodoRepository.list_by_assignee(db, rng.choice(ASSIGNEES), limit, status=TaskStatus.INPROGRESS,
+                                        after_id=rng.randrange(rows))
+        db.expunge_all()
+
+    def my_tasks():
+        TodoRepository.list_by_assignee(db, rng.choice(ASSIGNEES), limit, after_id=rng.randrange(rows))
+        db.expunge_all()
+
+    def by_status():
+        TodoRepository.list_by_status(db, TaskStatus.TODO, limit, after_id=rng.randrange(rows))
+        db.expunge_all()
+
+    def insert_batch():
+        db.execute(insert(Todo), [{"title": "bench insert", "status": TaskStatus.TODO,
+                                   "assignee": rng.choice(ASSIGNEES)} for _ in range(1000)])
+        db.commit()
+
+    results = {
+        "next_claimable": measure(next_claimable, max(1, iterations // 20) if schema == "before" else iterations),
+        "assignee+status": measure(my_tasks_in_status, iterations),
+        "assignee": measure(my_tasks, iterations),
+        "status": measure(by_status, iterations),
+        "insert x1000": measure(insert_batch, 20),
+    }
+    for name, r in results.items():
+        print(f"{schema:<7} {rows:>9} rows  {name:<16} p50={r['p50']:9.2f}ms  p99={r['p99']:9.2f}ms")
+    sizes = db.execute(text(
+        "SELECT name, SUM(pgsize) FROM dbstat WHERE name LIKE 'ix_todos_%' GROUP BY name ORDER BY name"
+    )).all()
+    print(f"{schema:<7} index sizes  " + "  ".join(f"{name}={size / 2**20:.1f}MiB" for name, size in sizes))
+    db.close()
+    drop_engine(engine)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    for schema in ("before", "after"):
+        run(schema, args.rows, args.iterations, args.limit)
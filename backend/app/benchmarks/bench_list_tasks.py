@@ -0,0 +1,71 @@
+# app/benchmarks/bench_list_tasks.py
+"""
+Keyset-paginated GET /tasks vs. the old load-everything path.
+
+    python -m benchmarks.bench_list_tasks --sizes 10000,100000,1000000
+
+Page latency should stay flat as the table grows; the full load is only
+run up to --full-max rows because it grows linearly.
+"""
+import argparse
+import random
+
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import ASSIGNEES, drop_engine, measure, seed_todos, temp_engine
+from core.pagination import encode_cursor
+from models.todo import TaskStatus
+from schemas.todo import TodoResponse
+from service.todo_service import TodoService
+
+
+def run(rows: int, iterations: int, limit: int, full_max: int) -> None:
+    engine = temp_engine("list")
+    seed_todos(engine, rows)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(1)
+
+    def deep_page():
+        cursor = encode_cursor(rng.randrange(rows))
+        items, _ = TodoService.list_tasks(db, limit, cursor=cursor)
+        [TodoResponse.model_validate(t) for t in items]
+        db.expunge_all()
+
+    def filtered_page():
+        TodoService.list_tasks(
+            db, limit, cursor=encode_cursor(rng.randrange(rows)),
+            status=TaskStatus.TODO, assignee=rng.choice(ASSIGNEES),
+        )
+        db.expunge_all()
+
+    def projected_page():
+        TodoService.list_tasks(
+            db, limit, cursor=encode_cursor(rng.randrange(rows)), fields=["title", "status"]
+        )
+
+    results = {
+        "page": measure(deep_page, iterations),
+        "filtered": measure(filtered_page, iterations),
+        "projected": measure(projected_page, iterations),
+    }
+    if rows <= full_max:
+        def full_load():
+            [TodoResponse.model_validate(t) for t in TodoService.get_all_tasks(db)]
+            db.expunge_all()
+        results["full (old)"] = measure(full_load, max(1, iterations // 20))
+
+    for name, r in results.items():
+        print(f"{rows:>9} rows  {name:<12} p50={r['p50']:8.2f}ms  p99={r['p99']:8.2f}ms")
+    db.close()
+    drop_engine(engine)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--full-max", type=int, default=100_000)
+    args = parser.parse_args()
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.iterations, args.limit, args.full_max)
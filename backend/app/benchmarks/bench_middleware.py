@@ -0,0 +1,148 @@
+# app/benchmarks/bench_middleware.py
+"""
+Middleware overhead: the old BaseHTTPMiddleware pair vs. the pure-ASGI layer.
+
+    python -m benchmarks.bench_middleware --concurrency 50 --requests 20000
+
+A trivial GET /tasks handler behind each stack (CORS outermost, as in
+main.py), driven straight through the ASGI interface so that only the
+middleware differs, plus the pure-ASGI layer with the request metrics
+middleware on top. Reports per-request p50/p99 and requests/sec.
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from benchmarks.common import summarize
+from core.metrics import Histogram
+from core.middleware import MetricsMiddleware, SecurityMiddleware
+from core.ratelimit import MemoryRateLimitBackend, RateLimiter
+
+LIMIT = "1000000000/60"  # never trips: we are measuring the check, not rejections
+
+
+def base_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/tasks")
+    async def tasks():
+        return []
+
+    return app
+
+
+def old_stack() -> FastAPI:
+    """The two BaseHTTPMiddleware classes main.py used to install."""
+    app = base_app()
+    client_requests = defaultdict(list)
+
+    class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            response = await call_next(request)
+            response.headers["X-Frame-Options"] = "DENY"
+            response.headers["X-Content-Type-Options"] = "nosniff"
+            response.headers["Referrer-Policy"] = "same-origin"
+            response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains; preload"
+            if request.url.path in ["/docs", "/docs/", "/redoc", "/redoc/", "/openapi.json"]:
+                response.headers["Content-Security-Policy"] = "default-src 'self'; img-src 'self' data:;"
+            else:
+                response.headers["Content-Security-Policy"] = "default-src 'self'"
+            return response
+
+    class RateLimitMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            client_ip = request.client.host
+            now = time.time()
+            client_requests[client_ip] = [t for t in client_requests[client_ip] if t > now - 60]
+            client_requests[client_ip].append(now)
+            return await call_next(request)
+
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(RateLimitMiddleware)
+    return app
+
+
+def new_stack() -> FastAPI:
+    app = base_app()
+    app.add_middleware(SecurityMiddleware, limiter=RateLimiter(MemoryRateLimitBackend(), LIMIT, {}))
+    return app
+
+
+def metrics_stack() -> FastAPI:
+    """new_stack plus the request latency histogram, as main.py installs it."""
+    app = new_stack()
+    app.add_middleware(MetricsMiddleware, histogram=Histogram("bench_seconds", "bench", labels=("m", "r", "s")))
+    return app
+
+
+def with_cors(app: FastAPI) -> FastAPI:
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    return app
+
+
+async def call(app, client: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/tasks", "raw_path": b"/tasks",
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": (client, 50000), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def drive(app, concurrency: int, total: int) -> dict:
+    samples = []
+    remaining = total
+
+    async def worker(n: int):
+        nonlocal remaining
+        # a handful of client IPs, like clients behind a few proxies
+        client = f"10.0.0.{n % 8}"
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            assert await call(app, client) == 200
+            samples.append((time.perf_counter() - start) * 1000)
+
+    await call(app, "warmup")  # build the middleware stack outside the timing
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {**summarize(samples), "rps": len(samples) / elapsed}
+
+
+async def run(concurrency: int, total: int) -> None:
+    stacks = {
+        "no middleware": with_cors(base_app()),
+        "BaseHTTPMiddleware (old)": with_cors(old_stack()),
+        "pure ASGI": with_cors(new_stack()),
+        "pure ASGI + metrics": with_cors(metrics_stack()),
+    }
+    for name, app in stacks.items():
+        r = await drive(app, concurrency, total)
+        print(f"{name:<25} p50={r['p50']:7.3f}ms  p99={r['p99']:7.3f}ms  {r['rps']:9.0f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.requests))
@@ -0,0 +1,89 @@
+# app/benchmarks/bench_rate_limit.py
+"""
+Rate limiter: old per-IP timestamp list vs. sliding-window counters.
+
+    python -m benchmarks.bench_rate_limit --limit 1000 --clients 10000
+
+Per-check latency for a client sitting at its limit (the old filter
+rebuilds a list of up to --limit timestamps on every request), and how
+many keys each limiter still holds after --clients distinct IPs have
+come and gone.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.common import summarize
+from core.ratelimit import Limit, MemoryRateLimitBackend, SQLiteRateLimitBackend
+
+
+class OldListLimiter:
+    """The previous middleware's logic, verbatim apart from the clock."""
+
+    def __init__(self, limit: Limit):
+        self.limit = limit
+        self.client_requests = defaultdict(list)
+
+    async def hit(self, key: str, limit: Limit, now: float):
+        window = now - limit.period
+        self.client_requests[key] = [t for t in self.client_requests[key] if t > window]
+        if len(self.client_requests[key]) >= limit.requests:
+            return False
+        self.client_requests[key].append(now)
+        return True
+
+    def __len__(self):
+        return len(self.client_requests)
+
+
+async def per_check(limiter, limit: Limit, iterations: int):
+    # fill the window first, then time checks spread across the period
+    now = 1_000_000.0
+    step = limit.period / limit.requests
+    for n in range(limit.requests):
+        await limiter.hit("hot", limit, now=now + n * step)
+    now += limit.period
+    samples = []
+    for n in range(iterations):
+        start = time.perf_counter()
+        await limiter.hit("hot", limit, now=now + n * step)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+async def churn(limiter, limit: Limit, clients: int) -> int:
+    # one request per IP, a second apart, then one more request much later
+    now = 1_000_000.0
+    for n in range(clients):
+        await limiter.hit(f"10.0.{n // 256}.{n % 256}", limit, now=now + n)
+    await limiter.hit("late", limit, now=now + clients + 3 * limit.period)
+    return len(limiter)
+
+
+async def run(limit: Limit, iterations: int, clients: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "ratelimit.db")
+    limiters = {
+        "list (old)": lambda: OldListLimiter(limit),
+        "memory": MemoryRateLimitBackend,
+        "sqlite": lambda: SQLiteRateLimitBackend(path),
+    }
+    for name, make in limiters.items():
+        r = await per_check(make(), limit, iterations)
+        line = f"{name:<11} limit={limit.requests:<6} p50={r['p50'] * 1000:8.1f}us  p99={r['p99'] * 1000:8.1f}us"
+        churner = make()
+        if hasattr(churner, "__len__"):
+            line += f"  keys after {clients} clients={await churn(churner, limit, clients)}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--period", type=int, default=60)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(run(Limit(args.limit, args.period), args.iterations, args.clients))
@@ -0,0 +1,71 @@
+# app/benchmarks/bench_search.py
+"""
+Indexed title search vs. the old `ILIKE '%...%'` scan.
+
+    python -m benchmarks.bench_search --sizes 100000,1000000
+
+Both paths return the first page (--limit rows) for the same queries,
+reported per query class. FTS cost tracks the number of matches (bm25
+scores every match); ILIKE cost tracks how far it must scan before the
+page fills, which is the whole table for rare terms.
+"""
+import argparse
+import random
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import NOUNS, WORDS, drop_engine, measure, seed_todos, temp_engine
+from models.todo import Todo
+from repositories.todo import TodoRepository
+
+
+def run(rows: int, iterations: int, limit: int) -> None:
+    engine = temp_engine("search")
+    seed_todos(engine, rows)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(7)
+    query_classes = {
+        # a few letters typed into the search box
+        "keystroke": [w[:2] for w in WORDS],
+        # common verb present in ~8% of titles
+        "common": list(WORDS),
+        "rare": rng.sample(NOUNS, 50),
+        "id": [str(rng.randrange(rows)) for _ in range(50)],
+    }
+
+    for label, queries in query_classes.items():
+        def indexed():
+            TodoRepository.search_by_title(db, rng.choice(queries), limit=limit)
+            db.expunge_all()
+
+        def ilike():
+            q = rng.choice(queries)
+            list(db.scalars(select(Todo).where(Todo.title.ilike(f"%{q}%")).order_by(Todo.id).limit(limit)))
+            db.expunge_all()
+
+        def ilike_unbounded():
+            # the old endpoint had no limit: every match was loaded
+            q = rng.choice(queries)
+            list(db.scalars(select(Todo).where(Todo.title.ilike(f"%{q}%"))))
+            db.expunge_all()
+
+        results = {
+            "fts5": measure(indexed, iterations),
+            "ilike+limit": measure(ilike, iterations),
+            "ilike (old)": measure(ilike_unbounded, max(1, iterations // 10)),
+        }
+        for name, r in results.items():
+            print(f"{rows:>9} rows  {label:<9} {name:<12} p50={r['p50']:8.2f}ms  p99={r['p99']:8.2f}ms")
+    db.close()
+    drop_engine(engine)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.iterations, args.limit)
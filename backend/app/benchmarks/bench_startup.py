@@ -0,0 +1,102 @@
+# app/benchmarks/bench_startup.py
+"""
+Cold start: import time, time to first request, and the first requests' latency.
+
+    python -m benchmarks.bench_startup --rows 100000 --runs 5
+
+Each run starts a fresh uvicorn process on a seeded SQLite database and
+polls until GET /tasks/ answers (time to first request, measured from
+the spawn, so interpreter start and the lifespan are included), then
+times the first GET /tasks/{id}, PUT claim and GET /openapi.json. Import
+time is `import main` in a fresh interpreter. --env KEY=VALUE (repeatable)
+is passed to the server, e.g. to compare STARTUP_WARMUP=false.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.common import drop_engine, seed_todos, temp_engine
+from benchmarks.loadgen import APP_DIR, SERVER_ENV, free_port
+from models.todo import TaskStatus, Todo
+
+
+def import_ms(env: dict) -> float:
+    code = "import time; t = time.perf_counter(); import main; print((time.perf_counter() - t) * 1000)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def timed(client: httpx.Client, method: str, url: str, **kwargs) -> float:
+    start = time.perf_counter()
+    client.request(method, url, **kwargs).raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def cold_start(env: dict, task_id: int) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=base, timeout=30) as client:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"server exited with {process.returncode}")
+                try:
+                    client.get("/tasks/?limit=50").raise_for_status()
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.002)
+            first = (time.perf_counter() - start) * 1000
+            return {
+                "first_request": first,
+                "get_task": timed(client, "GET", f"/tasks/{task_id}"),
+                "claim": timed(client, "PUT", f"/tasks/{task_id}/claim", json={"assignee": "bench"}),
+                "openapi": timed(client, "GET", "/openapi.json"),
+            }
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE for the server")
+    args = parser.parse_args()
+
+    engine = temp_engine("startup")
+    seed_todos(engine, args.rows)
+    # a TODO task per run, so every claim succeeds
+    with engine.connect() as conn:
+        todo_ids = list(conn.scalars(
+            select(Todo.id).where(Todo.status == TaskStatus.TODO).order_by(Todo.id).limit(args.runs)
+        ))
+    env = {**os.environ, **SERVER_ENV, "DATABASE_URL": str(engine.url),
+           **dict(kv.split("=", 1) for kv in args.env)}
+    try:
+        imports = [import_ms(env) for _ in range(args.runs)]
+        runs = [cold_start(env, task_id) for task_id in todo_ids]
+    finally:
+        drop_engine(engine)
+
+    print(f"import main          median {statistics.median(imports):8.1f}ms")
+    for key in ("first_request", "get_task", "claim", "openapi"):
+        values = [r[key] for r in runs]
+        print(f"{key:<20} median {statistics.median(values):8.1f}ms  max {max(values):8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
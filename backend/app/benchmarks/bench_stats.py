@@ -0,0 +1,63 @@
+# app/benchmarks/bench_stats.py
+"""
+Board counts three ways: client-side count, GROUP BY, maintained counters.
+
+    python -m benchmarks.bench_stats --sizes 10000,100000,1000000
+
+  - client count: page through GET /tasks (1000 per page) and count, as
+    the board had to before GET /tasks/stats (run up to --full-max rows)
+  - group by:     the reconciliation query, once per request
+  - counters:     TaskStats.snapshot(), what GET /tasks/stats serves
+"""
+import argparse
+from collections import Counter
+
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import drop_engine, measure, seed_todos, temp_engine
+from repositories.todo import TodoRepository
+from service.task_stats import TaskStats, counts_from_rows
+from service.todo_service import TodoService
+
+
+def run(rows: int, iterations: int, full_max: int) -> None:
+    engine = temp_engine("stats")
+    seed_todos(engine, rows)
+    db = sessionmaker(bind=engine)()
+    stats = TaskStats()
+    stats.replace(*counts_from_rows(TodoRepository.count_by_status_and_assignee(db)))
+
+    def client_count():
+        by_status, cursor = Counter(), None
+        while True:
+            page, cursor = TodoService.list_tasks(db, 1000, cursor=cursor, fields=["status", "assignee"])
+            by_status.update(t["status"] for t in page)
+            if cursor is None:
+                return by_status
+
+    def group_by():
+        counts_from_rows(TodoRepository.count_by_status_and_assignee(db))
+
+    cases = {"group by": group_by, "counters": stats.snapshot}
+    if rows <= full_max:
+        cases = {"client count": client_count, **cases}
+    for name, fn in cases.items():
+        n = iterations if name == "counters" else max(1, iterations // 20)
+        r = measure(fn, n)
+        print(f"rows={rows:>8} {name:<13} p50={r['p50']:10.3f}ms p99={r['p99']:10.3f}ms")
+    db.close()
+    drop_engine(engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--full-max", type=int, default=100_000)
+    args = parser.parse_args()
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.iterations, args.full_max)
+
+
+if __name__ == "__main__":
+    main()
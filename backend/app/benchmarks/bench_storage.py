@@ -0,0 +1,114 @@
+# app/benchmarks/bench_storage.py
+"""
+Mixed read/write workload on SQLite under each storage profile.
+
+    python -m benchmarks.bench_storage --readers 8 --writers 2 --seconds 10
+
+Writer threads create single tasks and claim them (one commit each, like
+the REST handlers); reader threads list pages and fetch tasks by id.
+Every thread has its own connection, as separate requests/workers would.
+Reports throughput and latency for both sides per profile.
+"""
+import argparse
+import random
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import drop_engine, seed_todos, summarize, temp_engine
+from core.config import Settings
+from database.tuning import apply_sqlite_pragmas, engine_options, sqlite_pragmas
+from repositories.todo import TodoRepository
+from schemas.todo import TodoClaim, TodoCreate
+from service.todo_service import TaskConflictError, TodoService
+
+PROFILES = {
+    "legacy": Settings(storage_profile="legacy"),
+    # WAL alone, still an fsync per commit
+    "wal+full": Settings(sqlite_synchronous="full"),
+    "production": Settings(),
+}
+
+
+def run(name: str, profile: Settings, args) -> None:
+    schema = temp_engine("storage")
+    seed_todos(schema, args.seed_rows)
+    url = str(schema.url)
+    engine = create_engine(url, **engine_options(url, profile), pool_size=args.readers + args.writers)
+    apply_sqlite_pragmas(engine, sqlite_pragmas(profile))
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    stop = time.perf_counter() + args.seconds
+    reads, writes, errors = [], [], [0]
+    lock = threading.Lock()
+
+    def writer(n: int):
+        rng = random.Random(n)
+        samples = []
+        with Session() as db:
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                try:
+                    todo = TodoService.create_task(db, TodoCreate(title=f"mixed {n}"))
+                    if rng.random() < 0.5:
+                        TodoService.claim_task(db, todo.id, TodoClaim(assignee=f"user{n}"))
+                except (OperationalError, TaskConflictError):
+                    db.rollback()
+                    with lock:
+                        errors[0] += 1
+                    continue
+                samples.append((time.perf_counter() - start) * 1000)
+        with lock:
+            writes.extend(samples)
+
+    def reader(n: int):
+        rng = random.Random(100 + n)
+        samples = []
+        with Session() as db:
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                try:
+                    TodoRepository.list_page(db, 100, after_id=rng.randrange(args.seed_rows))
+                    TodoRepository.get_by_id(db, rng.randrange(1, args.seed_rows))
+                    db.rollback()  # end the read transaction, as a request would
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        errors[0] += 1
+                    continue
+                db.expunge_all()
+                samples.append((time.perf_counter() - start) * 1000)
+        with lock:
+            reads.extend(samples)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(args.readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    r, w = summarize(reads or [0.0]), summarize(writes or [0.0])
+    print(f"{name:<11} writes {len(writes) / args.seconds:7.1f}/s p50={w['p50']:7.2f}ms p99={w['p99']:7.2f}ms | "
+          f"reads {len(reads) / args.seconds:8.1f}/s p50={r['p50']:6.2f}ms p99={r['p99']:7.2f}ms | "
+          f"errors={errors[0]}")
+    engine.dispose()
+    drop_engine(schema)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed-rows", type=int, default=50_000)
+    args = parser.parse_args()
+    for name, profile in PROFILES.items():
+        run(name, profile, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# app/benchmarks/bench_streaming.py
+"""
+Peak memory of a full task export: load-everything vs. streaming.
+
+    python -m benchmarks.bench_streaming --sizes 10000,100000,1000000
+
+For each table size, a fresh process per mode exports every task and
+reports how far peak RSS grew over its idle baseline:
+  - materialize: the old path, all ORM rows -> TodoResponse list ->
+    jsonable_encoder -> one json.dumps payload
+  - ndjson/json: GET /tasks/export through the ASGI app, reading with a
+    streaming cursor and sending `stream_batch_size` tasks per chunk
+Streaming growth should stay flat as the table grows.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+
+MODES = ["materialize", "ndjson", "json"]
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+async def export(url: str, mode: str) -> int:
+    """Run one export in this process; returns bytes produced."""
+    from fastapi.encoders import jsonable_encoder
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from benchmarks.bench_cache import build_app
+    from database.async_connection import to_async_url
+    from schemas.todo import TodoResponse
+    from service.todo_service import AsyncTodoService
+
+    if mode == "materialize":
+        engine = create_async_engine(to_async_url(url))
+        async with async_sessionmaker(bind=engine, class_=AsyncSession)() as db:
+            todos = await AsyncTodoService.get_all_tasks(db)
+            body = json.dumps(jsonable_encoder([TodoResponse.model_validate(t) for t in todos])).encode()
+        await engine.dispose()
+        return len(body)
+
+    app = build_app(url, pool_size=1)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/tasks/export", "raw_path": b"/tasks/export",
+        "query_string": f"format={mode}".encode(), "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80), "state": {},
+    }
+    sent = 0
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # the client never disconnects
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))  # discarded, as a socket would
+
+    await app(scope, receive, send)
+    return sent
+
+
+def child(url: str, mode: str) -> None:
+    # import everything up front so the baseline includes the code, not the data
+    import benchmarks.bench_cache  # noqa: F401
+    import fastapi.encoders  # noqa: F401
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    size = asyncio.run(export(url, mode))
+    print(json.dumps({"baseline": baseline, "peak": peak_rss_mb(), "bytes": size,
+                      "seconds": time.perf_counter() - start}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--child", nargs=2, metavar=("URL", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    from benchmarks.common import drop_engine, seed_todos, temp_engine
+
+    for rows in (int(s) for s in args.sizes.split(",")):
+        engine = temp_engine("stream")
+        seed_todos(engine, rows)
+        url = str(engine.url)
+        for mode in args.modes.split(","):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_streaming", "--child", url, mode],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"rows={rows:>8} {mode:<12} peak RSS +{r['peak'] - r['baseline']:8.1f} MB "
+                  f"(baseline {r['baseline']:6.1f} MB)  {r['bytes'] / 2**20:8.1f} MB sent  "
+                  f"{r['seconds']:6.2f}s", flush=True)
+        drop_engine(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# app/benchmarks/bench_subscriptions.py
+"""
+Filtered WebSocket fan-out: everything to everyone vs. per-socket filter
+scan vs. the topic index, against simulated sockets.
+
+    python -m benchmarks.bench_subscriptions --sockets 10000 --assignees 500
+
+Every socket watches one assignee's tasks (a personal board); the
+workload is claims, each touching one random assignee. Reports server
+time per event (routing plus the writers' sends, until every queue is
+drained) and frames written per event.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from core.ConnectionManager import ConnectionManager
+from core.metrics import WS_FANOUT
+from core.subscriptions import Subscription, narrow
+
+
+class SimSocket:
+    def __init__(self, written: dict):
+        self.written = written
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        self.written["frames"] += 1
+        await asyncio.sleep(0)  # a real send always yields once
+
+
+class ScanManager(ConnectionManager):
+    """Filtering without the index: every socket's filter tested per event."""
+
+    async def deliver(self, payload: str):
+        self.events.record(payload)
+        event = json.loads(payload)
+        for ws, queue in list(self._queues.items()):
+            message = narrow(payload, event, self.subscriptions.get(ws))
+            if message is not None:
+                self._offer(ws, queue, message)
+                WS_FANOUT.inc()
+
+
+def claim(n: int, assignee: str) -> dict:
+    return {"type": "task_updated", "task": {
+        "id": n, "title": f"benchmark task {n}", "description": "x" * 80, "assignee": assignee,
+        "status": "inprogress", "created_at": "2026-10-17T09:00:00", "updated_at": None,
+    }}
+
+
+async def run(manager: ConnectionManager, filtered: bool, sockets: int, assignees: int, events: int) -> dict:
+    rng = random.Random(7)
+    names = [f"user{i}" for i in range(assignees)]
+    written = {"frames": 0}
+    socks = [SimSocket(written) for _ in range(sockets)]
+    for i, ws in enumerate(socks):
+        subscription = Subscription.parse(assignee=[names[i % assignees]]) if filtered else Subscription()
+        await manager.connect(ws, subscription=subscription)
+
+    fanout = lambda: WS_FANOUT.values.get((), 0)
+    base = fanout()
+    start = time.perf_counter()
+    for n in range(events):
+        await manager.broadcast(claim(n, rng.choice(names)))
+        while written["frames"] < fanout() - base:
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    await manager.stop()
+    return {"ms_per_event": elapsed * 1000 / events, "frames_per_event": written["frames"] / events}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sockets", type=int, default=10_000)
+    parser.add_argument("--assignees", type=int, default=500)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = (
+        ("everyone (old)", ConnectionManager, False),
+        ("filter scan", ScanManager, True),
+        ("topic index", ConnectionManager, True),
+    )
+    for name, factory, filtered in cases:
+        result = asyncio.run(run(factory(), filtered, args.sockets, args.assignees, args.events))
+        print(f"{name:<15} {args.sockets} sockets  {result['ms_per_event']:8.3f}ms/event  "
+              f"{result['frames_per_event']:8.1f} frames/event")
+
+
+if __name__ == "__main__":
+    main()
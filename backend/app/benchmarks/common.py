@@ -0,0 +1,75 @@
+# app/benchmarks/common.py
+"""Shared helpers for the benchmark scripts (run from backend/app)."""
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+
+from models.todo import Base, Todo, TaskStatus
+
+ASSIGNEES = [f"user{i}" for i in range(50)]
+WORDS = ["fix", "write", "review", "deploy", "refactor", "test", "plan",
+         "design", "migrate", "document", "profile", "release", "triage"]
+# ~2k pseudo-nouns so titles have a realistic long-tail vocabulary
+NOUNS = [a + b for a in ("auth", "api", "db", "ui", "cache", "queue", "log", "job",
+                         "user", "task", "board", "sync", "mail", "pay", "file",
+                         "search", "build", "web", "node", "core")
+         for b in [f"{c}{v}" for c in "bcdfghjklmnprstvwz" for v in "aeiou"] + ["", "s"]]
+
+
+def temp_engine(name: str = "bench") -> Engine:
+    """Fresh file-backed SQLite database with the current schema."""
+    fd, path = tempfile.mkstemp(prefix=f"{name}-", suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def drop_engine(engine: Engine) -> None:
+    engine.dispose()
+    os.remove(engine.url.database)
+
+
+def seed_todos(engine: Engine, rows: int, batch: int = 10_000, seed: int = 42) -> None:
+    """Bulk-insert `rows` synthetic todos with a realistic status mix."""
+    rng = random.Random(seed)
+    statuses = [TaskStatus.TODO] * 5 + [TaskStatus.INPROGRESS] * 3 + [TaskStatus.COMPLETED] * 2
+    with engine.begin() as conn:
+        done = 0
+        while done < rows:
+            n = min(batch, rows - done)
+            conn.execute(insert(Todo), [
+                {
+                    "title": f"{rng.choice(WORDS)} {' '.join(rng.choices(NOUNS, k=2))} #{done + i}",
+                    "description": "generated",
+                    "assignee": rng.choice(ASSIGNEES) if rng.random() < 0.7 else None,
+                    "status": rng.choice(statuses),
+                }
+                for i in range(n)
+            ])
+            done += n
+
+
+def measure(fn: Callable[[], object], iterations: int) -> Dict[str, float]:
+    """Call `fn` repeatedly and summarise latency in milliseconds."""
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_ms)
+    return {
+        "p50": statistics.median(ordered),
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "max": ordered[-1],
+    }
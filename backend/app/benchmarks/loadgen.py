@@ -0,0 +1,188 @@
+# app/benchmarks/loadgen.py
+"""
+Local load generation against a real server process: start uvicorn on a
+seeded database, drive HTTP with concurrent httpx clients, hold N
+WebSocket subscribers, and read the server's RSS from /proc.
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import websockets
+
+from benchmarks.common import summarize
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# a limiter that never trips: the suite measures the paths, not rejections
+SERVER_ENV = {
+    "RATE_LIMIT": "1000000000/1",
+    "RATE_LIMIT_ROUTES": "{}",
+    "DEBUG": "false",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalServer:
+    """`python -m uvicorn main:app` on a free port, for the duration of a `with`."""
+
+    def __init__(self, database_url: str, env: Optional[Dict[str, str]] = None):
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.ws_url = f"ws://127.0.0.1:{self.port}"
+        self.env = {**os.environ, **SERVER_ENV, "DATABASE_URL": database_url, **(env or {})}
+        self.process: Optional[subprocess.Popen] = None
+        # server output (slow query warnings, tracebacks) kept out of the report
+        self.log_path = os.path.join(tempfile.gettempdir(), f"bench-server-{self.port}.log")
+
+    def __enter__(self) -> "LocalServer":
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning", "--no-access-log"],
+            cwd=APP_DIR, env=self.env, stdout=subprocess.DEVNULL,
+            stderr=open(self.log_path, "w"),
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"server exited with {self.process.returncode}, see {self.log_path}")
+            try:
+                if httpx.get(f"{self.base_url}/ws/metrics", timeout=1).status_code == 200:
+                    return self
+            except httpx.TransportError:
+                time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError("server did not come up within 30s")
+
+    def __exit__(self, *exc) -> None:
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def rss_mb(self) -> Dict[str, float]:
+        """Current and peak resident set size of the server, in MB (Linux only)."""
+        try:
+            with open(f"/proc/{self.process.pid}/status") as f:
+                fields = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            return {}
+        kib = lambda key: int(fields[key].split()[0]) if key in fields else 0
+        return {"rss_mb": round(kib("VmRSS") / 1024, 1), "peak_rss_mb": round(kib("VmHWM") / 1024, 1)}
+
+
+async def drive_http(
+    client: httpx.AsyncClient,
+    request: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    concurrency: int,
+    seconds: float,
+    ok: Callable[[int], bool] = lambda status: status < 400,
+) -> dict:
+    """
+    `concurrency` workers call `request(client, n)` back to back for
+    `seconds`; n counts up across workers. Returns rps, latency percentiles
+    (ms), the status histogram and the number of non-`ok` responses.
+    """
+    samples: List[float] = []
+    statuses: Counter = Counter()
+    counter = iter(range(10 ** 12))
+    stop = time.perf_counter() + seconds
+
+    async def worker():
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                status = (await request(client, next(counter))).status_code
+            except httpx.HTTPError:
+                status = 0
+            samples.append((time.perf_counter() - start) * 1000)
+            statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1),
+        **latency(samples),
+        "errors": sum(n for status, n in statuses.items() if not ok(status)),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+def latency(samples_ms: List[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(samples_ms)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    s = summarize(ordered)
+    return {"p50": round(s["p50"], 3), "p95": round(p95, 3), "p99": round(s["p99"], 3)}
+
+
+async def snapshot_header(ws_url: str) -> dict:
+    """Epoch and seq of the event stream, read from a snapshot's first frame."""
+    async with websockets.connect(f"{ws_url}/ws/tasks", max_size=None) as ws:
+        return json.loads(await ws.recv())
+
+
+class Subscriber:
+    """
+    One WebSocket client that resumes from a known seq (so it is never
+    sent a full snapshot) and records when each event arrives.
+    """
+
+    def __init__(self, ws_url: str, epoch: str, seq: int):
+        self.ws_url, self.epoch, self.seq = ws_url, epoch, seq
+        self.arrivals: Dict[int, float] = {}
+        self._ws = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def connect(self) -> float:
+        """Connect and wait until caught up; returns the seconds it took."""
+        start = time.perf_counter()
+        self._ws = await websockets.connect(
+            f"{self.ws_url}/ws/tasks?since={self.seq}&epoch={self.epoch}", max_size=None
+        )
+        header = json.loads(await self._ws.recv())
+        if header.get("type") != "resync":
+            raise RuntimeError(f"expected a resync, got {header.get('type')}")
+        for _ in range(header["count"]):
+            self._record(await self._ws.recv())
+        elapsed = time.perf_counter() - start
+        self._reader = asyncio.create_task(self._read())
+        return elapsed
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _read(self) -> None:
+        try:
+            async for frame in self._ws:
+                self._record(frame)
+        except websockets.ConnectionClosed:
+            pass
+
+    def _record(self, frame: str) -> None:
+        event = json.loads(frame)
+        self.seq = max(self.seq, event.get("seq", self.seq))
+        for task in event.get("tasks") or [event.get("task") or {}]:
+            if "id" in task:
+                self.arrivals.setdefault(task["id"], time.perf_counter())
@@ -0,0 +1,39 @@
+# app/benchmarks/seed.py
+"""
+Create a SQLite database with the current schema and N synthetic todos.
+
+    python -m benchmarks.seed --rows 1000000 --path /tmp/todos-1m.db
+
+Point a dev server (DATABASE_URL) or `benchmarks.suite --database` at it.
+Same generator as the other benchmarks, so runs with one --seed match.
+"""
+import argparse
+import os
+import time
+
+from sqlalchemy import create_engine
+
+from benchmarks.common import seed_todos
+from models.todo import Base
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--path", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} exists; seeding appends to nothing, pick a new path")
+
+    engine = create_engine(f"sqlite:///{args.path}")
+    Base.metadata.create_all(engine)
+    start = time.perf_counter()
+    seed_todos(engine, args.rows, seed=args.seed)
+    engine.dispose()
+    print(f"seeded {args.rows} todos into {args.path} in {time.perf_counter() - start:.1f}s")
+    print(f"DATABASE_URL=sqlite:///{args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+# app/benchmarks/suite.py
+"""
+End-to-end load suite: REST and WebSocket scenarios against a real server.
+
+    python -m benchmarks.suite --rows 100000 --seconds 10 --out results.json \
+        --baseline benchmarks/baseline.json
+
+Seeds a fresh SQLite database (or uses --database), starts uvicorn on it
+and runs each scenario in turn against the one server process:
+  list       keyset pages of GET /tasks at random depths (1 in 4 the first page)
+  search     GET /tasks/search with short title prefixes
+  create     POST /tasks
+  claim      PUT /tasks/{id}/claim, --contenders clients racing for each task
+  broadcast  creates while --subscribers sockets listen; delivery latency
+  reconnect  every subscriber drops, misses events and reconnects at once
+Each result carries rps, p50/p95/p99 (ms) and the server's RSS. With
+--baseline, results are compared against a stored run and the exit status
+is 1 if any metric regressed by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import NOUNS, WORDS, drop_engine, seed_todos, temp_engine
+from benchmarks.loadgen import LocalServer, Subscriber, drive_http, latency, snapshot_header
+from core.pagination import encode_cursor
+
+HIGHER_IS_BETTER = {"rps", "delivered_ratio"}
+LOWER_IS_BETTER = {"p95", "p99", "delivery_p95", "delivery_p99", "catchup_p99", "storm_seconds", "peak_rss_mb"}
+
+
+class Context:
+    def __init__(self, server: LocalServer, client: httpx.AsyncClient, args):
+        self.server, self.client, self.args = server, client, args
+        self.rng = random.Random(args.seed)
+
+    async def subscribers(self, n: int) -> List[Subscriber]:
+        header = await snapshot_header(self.server.ws_url)
+        subs = [Subscriber(self.server.ws_url, header["epoch"], header["seq"]) for _ in range(n)]
+        await asyncio.gather(*(s.connect() for s in subs))
+        return subs
+
+
+async def scenario_list(ctx: Context) -> dict:
+    rows, rng = ctx.args.rows, ctx.rng
+
+    def request(client, n):
+        if n % 4 == 0:
+            return client.get("/tasks/?limit=100")
+        return client.get("/tasks/", params={"limit": 100, "cursor": encode_cursor(rng.randrange(rows))})
+
+    return await drive_http(ctx.client, request, ctx.args.concurrency, ctx.args.seconds)
+
+
+async def scenario_search(ctx: Context) -> dict:
+    terms = [w[:3] for w in WORDS] + [n[:4] for n in NOUNS[::40]]
+    rng = ctx.rng
+    return await drive_http(
+        ctx.client,
+        lambda client, n: client.get("/tasks/search", params={"title": rng.choice(terms), "limit": 20}),
+        ctx.args.concurrency, ctx.args.seconds,
+    )
+
+
+async def scenario_create(ctx: Context) -> dict:
+    return await drive_http(
+        ctx.client,
+        lambda client, n: client.post("/tasks/", json={"title": f"load create {n}"}),
+        ctx.args.concurrency, ctx.args.seconds,
+    )
+
+
+async def scenario_claim(ctx: Context) -> dict:
+    """Each task is claimed by --contenders requests; exactly one may win."""
+    ids: List[int] = []
+    pool = min(50_000, max(2_000, int(ctx.args.seconds * 1_000)))
+    while len(ids) < pool:
+        response = await ctx.client.post(
+            "/tasks/bulk", json=[{"title": f"load claim {len(ids) + i}"} for i in range(5_000)]
+        )
+        ids += [task["id"] for task in response.json()["created"]]
+    contenders = ctx.args.contenders
+    winners: Dict[int, int] = {}
+
+    async def request(client, n):
+        task_id = ids[(n // contenders) % len(ids)]
+        response = await client.put(f"/tasks/{task_id}/claim", json={"assignee": f"worker{n % contenders}"})
+        if response.status_code == 200:
+            winners[task_id] = winners.get(task_id, 0) + 1
+        return response
+
+    result = await drive_http(
+        ctx.client, request, ctx.args.concurrency, ctx.args.seconds, ok=lambda status: status in (200, 409)
+    )
+    result["claimed"] = len(winners)
+    result["double_claims"] = sum(n - 1 for n in winners.values())
+    result["errors"] += result["double_claims"]
+    return result
+
+
+async def scenario_broadcast(ctx: Context) -> dict:
+    subs = await ctx.subscribers(ctx.args.subscribers)
+    sent: Dict[int, float] = {}
+
+    async def request(client, n):
+        start = time.perf_counter()
+        response = await client.post("/tasks/", json={"title": f"load broadcast {n}"})
+        if response.status_code == 201:
+            sent[response.json()["id"]] = start
+        return response
+
+    result = await drive_http(ctx.client, request, ctx.args.concurrency, ctx.args.seconds)
+    await asyncio.sleep(2)  # let the last events drain to every socket
+    samples = [(s.arrivals[i] - t) * 1000 for s in subs for i, t in sent.items() if i in s.arrivals]
+    await asyncio.gather(*(s.close() for s in subs))
+    delivery = latency(samples)
+    result.update({
+        "subscribers": len(subs),
+        "delivered_ratio": round(len(samples) / max(1, len(sent) * len(subs)), 4),
+        "delivery_p50": delivery["p50"], "delivery_p95": delivery["p95"], "delivery_p99": delivery["p99"],
+    })
+    return result
+
+
+async def scenario_reconnect(ctx: Context) -> dict:
+    """All subscribers drop, --missed events happen, then they all resume at once."""
+    subs = await ctx.subscribers(ctx.args.subscribers)
+    await asyncio.gather(*(s.close() for s in subs))
+    for n in range(ctx.args.missed):
+        await ctx.client.post("/tasks/", json={"title": f"load missed {n}"})
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(s.connect() for s in subs), return_exceptions=True)
+    storm = time.perf_counter() - start
+    await asyncio.gather(*(s.close() for s in subs))
+    catchup = [o * 1000 for o in outcomes if isinstance(o, float)]
+    caught_up = sum(1 for s in subs if len(s.arrivals) >= ctx.args.missed)
+    c = latency(catchup)
+    return {
+        "subscribers": len(subs), "missed_events": ctx.args.missed,
+        "storm_seconds": round(storm, 3), "catchup_p50": c["p50"], "catchup_p99": c["p99"],
+        "errors": len(subs) - caught_up,
+    }
+
+
+SCENARIOS = {
+    "list": scenario_list,
+    "search": scenario_search,
+    "create": scenario_create,
+    "claim": scenario_claim,
+    "broadcast": scenario_broadcast,
+    "reconnect": scenario_reconnect,
+}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_suite(database_url: str, args) -> dict:
+    results = {
+        "meta": {
+            "rows": args.rows, "seconds": args.seconds, "concurrency": args.concurrency,
+            "subscribers": args.subscribers, "revision": git_revision(),
+            "python": platform.python_version(), "machine": platform.machine(),
+            "cpus": os.cpu_count(), "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": {},
+    }
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    with LocalServer(database_url) as server:
+        async with httpx.AsyncClient(base_url=server.base_url, limits=limits, timeout=30) as client:
+            ctx = Context(server, client, args)
+            for name in args.scenarios.split(","):
+                result = await SCENARIOS[name](ctx)
+                result.update(server.rss_mb())
+                results["scenarios"][name] = result
+                print(f"{name:<10} " + "  ".join(
+                    f"{k}={v}" for k, v in result.items() if k not in ("statuses", "requests")
+                ), flush=True)
+    print(f"server log: {server.log_path}")
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Human-readable regressions of `current` against `baseline`."""
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        now = current["scenarios"].get(name)
+        if now is None:
+            continue
+        for metric, old in base.items():
+            new = now.get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+                continue
+            if metric in HIGHER_IS_BETTER and new < old * (1 - tolerance):
+                regressions.append(f"{name}.{metric}: {new} < {old} (-{(1 - new / old) * 100:.0f}%)")
+            elif metric in LOWER_IS_BETTER and old > 0 and new > old * (1 + tolerance):
+                regressions.append(f"{name}.{metric}: {new} > {old} (+{(new / old - 1) * 100:.0f}%)")
+            elif metric == "errors" and new > old:
+                regressions.append(f"{name}.errors: {new} > {old}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--database", help="pre-seeded sqlite:/// URL (see benchmarks.seed); it is written to")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--contenders", type=int, default=4)
+    parser.add_argument("--subscribers", type=int, default=100)
+    parser.add_argument("--missed", type=int, default=50, help="events each subscriber misses in `reconnect`")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    engine = None
+    if args.database:
+        database_url = args.database
+    else:
+        engine = temp_engine("suite")
+        seed_todos(engine, args.rows, seed=args.seed)
+        database_url = str(engine.url)
+    try:
+        results = asyncio.run(run_suite(database_url, args))
+    finally:
+        if engine is not None:
+            drop_engine(engine)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,381 @@
-from fastapi import WebSocket, WebSocketDisconnect
-from typing import Set
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import WebSocket
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Union
+
+from core.backplane import Backplane, InProcessBackplane, build_backplane
+from core.batching import batch_frame, merge_events
+from core.config import settings
+from core.events import DatabaseEventStore, EventLog, seq_of
+from core.metrics import WS_DELIVERY, WS_FANOUT
+from core.subscriptions import EVERYTHING, Subscription, SubscriptionIndex
+from database.async_connection import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+# close code sent to consumers evicted for falling behind ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+def encode_message(message: Union[dict, str, bytes]) -> str:
+    """Serialize an event once; str/bytes payloads are passed through."""
+    if isinstance(message, str):
+        return message
+    if isinstance(message, bytes):
+        return message.decode()
+    return json.dumps(message, separators=(",", ":"))
+
 
 class ConnectionManager:
-    def __init__(self):
+    """
+    Tracks sockets and fans events out to them.
+
+    Each socket gets a bounded outbound queue drained by its own writer
+    task, so `broadcast` only serializes the event once and enqueues it;
+    a slow client backs up its own queue instead of delaying everyone else.
+    When a queue is full the policy either drops that socket's oldest
+    pending message or disconnects it. The next frame after a drop carries
+    `prev`, the newest seq dropped, so the client can tell it missed
+    events and reconnect with `since`. A paused socket (snapshot or resync
+    still being written) never drops: its queue is cleared and the socket
+    marked `lagging`, and the caller catches it up again from the seq it
+    just sent.
+
+    Broadcasts go through a backplane so that events published on one
+    worker reach the sockets held by every worker; the backplane calls
+    `deliver` on each worker's manager. Events are stamped with a seq
+    before publishing and remembered in `events` on delivery, for resync.
+
+    A socket may subscribe to a subset of tasks (core/subscriptions.py);
+    filtered sockets are reached through a topic index, so an event only
+    costs a parse and a lookup per filtered socket it actually concerns.
+
+    With a `batch_window` (seconds), delivered events are held for that
+    long, or until `batch_max` of them, and each socket gets one `batch`
+    frame for them (core/batching.py). Zero sends every event on its own.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 256,
+        send_timeout: float = 5.0,
+        policy: str = DROP_OLDEST,
+        backplane: Optional[Backplane] = None,
+        events: Optional[EventLog] = None,
+        batch_window: float = 0.0,
+        batch_max: int = 256,
+    ):
+        if policy not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.batch_window = batch_window
+        self.batch_max = batch_max
+        self._pending: List[str] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.merged = 0
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.policy = policy
         self.active: Set[WebSocket] = set()
+        self._queues: Dict[WebSocket, asyncio.Queue] = {}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
+        self._send_locks: Dict[WebSocket, asyncio.Lock] = {}
+        # sockets the caller is writing to directly, and those of them whose
+        # queue overflowed meanwhile; newest seq dropped per socket
+        self._paused: Set[WebSocket] = set()
+        self._lagging: Set[WebSocket] = set()
+        self._lost: Dict[WebSocket, int] = {}
+        # sockets taking every event; the rest are reached via the index
+        self._everyone: Set[WebSocket] = set()
+        self.subscriptions = SubscriptionIndex()
+        self._closing: Set[asyncio.Task] = set()
+        self.sent = 0
+        self.dropped = 0
+        self.send_timeouts = 0
+        self.slow_disconnects = 0
+        self.overflow_resyncs = 0
+        self.backplane = backplane or InProcessBackplane()
+        self.events = events or EventLog()
+        if self.events.store is None and not isinstance(self.backplane, InProcessBackplane):
+            # each worker would count from 1 into rings shared by all of them
+            raise ValueError("A cross-worker backplane needs a durable event log (EVENT_LOG=database)")
+        self.backplane.attach(self.deliver)
+        self._listeners: List[Callable[[str], None]] = []
 
-    async def connect(self, ws: WebSocket):
+    async def start(self):
+        await self.events.start()
+        await self.backplane.start()
+
+    async def stop(self):
+        await self.backplane.stop()
+        self.flush()
+        for ws in list(self.active):
+            self.disconnect(ws)
+
+    async def connect(
+        self, ws: WebSocket, paused: bool = False, subscription: Subscription = EVERYTHING
+    ):
+        """
+        Accept and start collecting events for `ws`. A paused socket buffers
+        events until `release`, so the caller can write a snapshot or resync
+        straight to the socket first (see `restart` and `lagging`).
+        """
         await ws.accept()
         self.active.add(ws)
+        self._queues[ws] = asyncio.Queue(maxsize=self.queue_size)
+        self._send_locks[ws] = asyncio.Lock()
+        self._subscribe(ws, subscription)
+        if paused:
+            self._paused.add(ws)
+        else:
+            self.release(ws)
+
+    def release(self, ws: WebSocket):
+        self._paused.discard(ws)
+        queue = self._queues.get(ws)
+        if queue is not None and ws not in self._writers:
+            self._writers[ws] = asyncio.create_task(self._writer(ws, queue))
+
+    def restart(self, ws: WebSocket):
+        """
+        Empty the buffer of a paused socket and clear its lagging mark. Call
+        right before reading the seq a snapshot or resync is current as of
+        (no await in between): everything queued so far is covered by it.
+        """
+        self._lagging.discard(ws)
+        queue = self._queues.get(ws)
+        while queue is not None and not queue.empty():
+            queue.get_nowait()
+
+    def lagging(self, ws: WebSocket) -> bool:
+        """Whether events overflowed the queue since the last `restart`."""
+        return ws in self._lagging
+
+    def subscribe(self, ws: WebSocket, subscription: Subscription):
+        """Route only events matching `subscription` to `ws` from now on."""
+        if ws in self.active:
+            self._subscribe(ws, subscription)
+
+    def _subscribe(self, ws: WebSocket, subscription: Subscription):
+        self.subscriptions.set(ws, subscription)
+        if subscription.everything:
+            self._everyone.add(ws)
+        else:
+            self._everyone.discard(ws)
+
+    def subscription(self, ws: WebSocket) -> Subscription:
+        return self.subscriptions.get(ws)
+
+    @asynccontextmanager
+    async def hold(self, ws: WebSocket) -> AsyncIterator[None]:
+        """
+        While held, the writer sends nothing to `ws` (events keep queueing,
+        as for a paused socket), so the caller can write frames straight to
+        the socket, e.g. a fresh snapshot after a subscription change.
+        """
+        async with self._send_locks.get(ws) or asyncio.Lock():
+            paused = ws in self._paused
+            self._paused.add(ws)
+            try:
+                yield
+            finally:
+                if not paused:
+                    self._paused.discard(ws)
 
     def disconnect(self, ws: WebSocket):
         self.active.discard(ws)
+        self._queues.pop(ws, None)
+        self._send_locks.pop(ws, None)
+        self._paused.discard(ws)
+        self._lagging.discard(ws)
+        self._lost.pop(ws, None)
+        self._everyone.discard(ws)
+        self.subscriptions.discard(ws)
+        writer = self._writers.pop(ws, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
 
-    async def broadcast(self, message: dict):
-        for ws in list(self.active):
+    def add_listener(self, listener: Callable[[str], None]):
+        """Call `listener(payload)` for every event this worker delivers."""
+        self._listeners.append(listener)
+
+    async def broadcast(self, message: Union[dict, str, bytes]):
+        """Stamp an event with its seq and publish it to every worker."""
+        payload = await self.events.stamp(encode_message(message))
+        await self.backplane.publish(payload)
+
+    async def publish(self, message: Union[dict, str, bytes]):
+        """
+        Publish to every worker without a seq, for state that supersedes
+        itself (stats counters): it takes no place in the replay buffer or
+        the durable event log, and is not replayed on resync.
+        """
+        await self.backplane.publish(encode_message(message))
+
+    async def deliver(self, payload: str):
+        """Fan a serialized event out to this worker's sockets."""
+        start = time.perf_counter()
+        self.events.record(payload)
+        for listener in self._listeners:
             try:
-                await ws.send_json(message)
-            except WebSocketDisconnect:
-                self.disconnect(ws)
+                listener(payload)
+            except Exception:
+                logger.exception("event listener failed")
+        if self.batch_window <= 0:
+            WS_FANOUT.inc(amount=self._fan_out([payload]))
+            WS_DELIVERY.observe(time.perf_counter() - start)
+            return
+        self._pending.append(payload)
+        if len(self._pending) >= self.batch_max:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(self.batch_window, self.flush)
+
+    def flush(self):
+        """Send the events held by the batch window, one frame per socket."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        start = time.perf_counter()
+        payloads = merge_events(pending)
+        self.batches += 1
+        self.merged += len(pending) - len(payloads)
+        WS_FANOUT.inc(amount=self._fan_out(payloads))
+        WS_DELIVERY.observe(time.perf_counter() - start)
+
+    def _fan_out(self, payloads: List[str]) -> int:
+        """Queue `payloads` as one frame per socket; returns the frame count."""
+        frame = batch_frame(payloads)
+        targets = [(ws, frame) for ws in self._everyone]
+        if self.subscriptions:
+            routed: Dict[WebSocket, List[str]] = {}
+            for payload in payloads:
+                for ws, message in self.subscriptions.route(payload).items():
+                    routed.setdefault(ws, []).append(message)
+            targets += [(ws, batch_frame(messages)) for ws, messages in routed.items()]
+        for ws, message in targets:
+            queue = self._queues.get(ws)
+            if queue is not None:
+                self._offer(ws, queue, message)
+        return len(targets)
+
+    def metrics(self) -> dict:
+        depths = [q.qsize() for q in self._queues.values()]
+        return {
+            "connections": len(self.active),
+            "filtered_connections": len(self.subscriptions),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "messages_sent": self.sent,
+            "messages_dropped": self.dropped,
+            "send_timeouts": self.send_timeouts,
+            "slow_consumer_disconnects": self.slow_disconnects,
+            "overflow_resyncs": self.overflow_resyncs,
+            "last_seq": self.events.last_seq,
+            "batches_sent": self.batches,
+            "events_merged": self.merged,
+        }
+
+    def _offer(self, ws: WebSocket, queue: asyncio.Queue, payload: str):
+        if ws in self._lagging:
+            return  # the caller's next resync covers it
+        if not queue.full():
+            queue.put_nowait(payload)
+            return
+        if self.policy == DROP_OLDEST and ws in self._paused:
+            # the client has not caught up yet: a silent drop would leave a
+            # hole it cannot see, so have the caller resync it instead
+            self.restart(ws)
+            self._lagging.add(ws)
+            self.overflow_resyncs += 1
+        elif self.policy == DROP_OLDEST:
+            seq = seq_of(queue.get_nowait())
+            if seq is not None:
+                self._lost[ws] = max(seq, self._lost.get(ws, 0))
+            queue.put_nowait(payload)
+            self.dropped += 1
+        else:
+            self.dropped += queue.qsize() + 1
+            self.evict(ws)
+
+    def evict(self, ws: WebSocket):
+        """Disconnect a consumer that fell behind and close its socket."""
+        self.slow_disconnects += 1
+        self.disconnect(ws)
+        task = asyncio.create_task(self._close(ws))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, ws: WebSocket):
+        try:
+            await asyncio.wait_for(
+                ws.close(code=SLOW_CONSUMER_CLOSE_CODE), timeout=self.send_timeout
+            )
+        except Exception:
+            pass
+
+    async def _writer(self, ws: WebSocket, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        writer = asyncio.current_task()
+        timed_out = False
+
+        def on_timeout():
+            nonlocal timed_out
+            timed_out = True
+            writer.cancel()
+
+        lock = self._send_locks[ws]
+        try:
+            while True:
+                payload = await queue.get()
+                lost = self._lost.pop(ws, None)
+                if lost is not None:
+                    payload = f'{{"prev":{lost},{payload[1:]}'
+                # a timer handle per send is far cheaper than wrapping every
+                # send in its own task, which wait_for/asyncio.wait would do
+                async with lock:
+                    timer = loop.call_later(self.send_timeout, on_timeout)
+                    try:
+                        await ws.send_text(payload)
+                    finally:
+                        timer.cancel()
+                self.sent += 1
+        except asyncio.CancelledError:
+            # the timeout's cancel may land on the next queue.get() if the
+            # send finished in the same loop tick, hence the outer handler
+            if not timed_out:
+                raise
+            self.send_timeouts += 1
+            self.evict(ws)
+        except Exception:
+            # socket went away mid-send
+            self.disconnect(ws)
 
 # expose a single instance
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager(
+    queue_size=settings.ws_queue_size,
+    send_timeout=settings.ws_send_timeout,
+    policy=settings.ws_slow_consumer_policy,
+    batch_window=settings.ws_batch_window_ms / 1000,
+    batch_max=settings.ws_batch_max_events,
+    backplane=build_backplane(
+        settings.backplane,
+        directory=settings.backplane_dir,
+        url=settings.backplane_url,
+        channel=settings.backplane_channel,
+    ),
+    events=EventLog(
+        size=settings.event_buffer_size,
+        store=DatabaseEventStore(AsyncSessionLocal, settings.event_log_retention)
+        if settings.event_log == "database" else None,
+    ),
+)
@@ -0,0 +1,375 @@
+# app/core/backplane.py
+"""
+Broadcast backplanes: how a serialized event published on one worker
+reaches the ConnectionManager of every worker.
+
+- InProcessBackplane: single process, hands the event straight back.
+- UnixSocketBackplane: several workers on one host, no broker. Every
+  worker binds a datagram socket in a shared directory and publishing
+  sends the event to each socket found there (see the class for its
+  size and loss limits).
+- BrokerBackplane: Redis/NATS-style pub/sub through any client with
+  `publish(channel, data)` and `subscribe(channel)`; LocalBroker is an
+  in-memory stand-in, RedisPubSubClient adapts redis.asyncio.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str], Awaitable[None]]
+
+
+class Backplane(ABC):
+    """Base class: `attach` the local delivery handler, then start/publish/stop."""
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+
+    def attach(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, payload: str) -> None:
+        """Deliver `payload` to every worker's handler, this one's included."""
+
+    def metrics(self) -> Dict[str, float]:
+        return {}
+
+    async def _deliver(self, payload: str) -> None:
+        if self._handler is not None:
+            await self._handler(payload)
+
+
+class InProcessBackplane(Backplane):
+    async def publish(self, payload: str) -> None:
+        await self._deliver(payload)
+
+
+# first byte of a fragment datagram (an event on its own starts with "{")
+FRAGMENT = b"\x1e"
+
+
+class UnixSocketBackplane(Backplane):
+    """
+    Brokerless relay between processes on one host. Peers discover each
+    other by listing `directory`; sockets whose owner died are unlinked
+    the first time a send to them is refused.
+
+    Limits. A datagram cannot exceed the send buffer the kernel grants
+    (SO_SNDBUF is clamped to net.core.wmem_max), so events over
+    `max_datagram` bytes go out as fragments that the receiver
+    reassembles. When a peer's socket is full, datagrams wait in a
+    per-peer backlog and are retried every RETRY_DELAY seconds. Only past
+    `max_backlog` queued bytes is an event dropped for that peer
+    (`dropped_events`). That worker then never sees it: its caches
+    stay stale until their TTL, and its clients miss the event. Where that
+    is not acceptable, use the redis backplane.
+    """
+
+    SUFFIX = ".sock"
+    RETRY_DELAY = 0.002
+    # partially received fragmented events kept; older ones are given up on
+    MAX_PARTIAL = 64
+
+    def __init__(
+        self,
+        directory: str,
+        buffer_size: int = 4 * 1024 * 1024,
+        max_datagram: int = 64 * 1024,
+        max_backlog: int = 16 * 1024 * 1024,
+    ):
+        super().__init__()
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.max_datagram = max_datagram
+        self.max_backlog = max_backlog
+        self._origin = uuid.uuid4().hex[:8]
+        self.path = os.path.join(directory, f"{os.getpid()}-{self._origin}{self.SUFFIX}")
+        self._sock: Optional[socket.socket] = None
+        self._pending: set = set()
+        self._backlog: Dict[str, Deque[bytes]] = {}
+        self._backlog_bytes: Dict[str, int] = {}
+        self._retry: Optional[asyncio.TimerHandle] = None
+        self._partial: Dict[str, List] = {}
+        self._fragmented_ids = itertools.count(1)
+        self.dropped = 0
+        self.fragmented = 0
+        self.incomplete = 0
+
+    async def start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.buffer_size)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.buffer_size)
+        # what the kernel granted, less room for its per-datagram overhead
+        granted = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        self.max_datagram = max(1024, min(self.max_datagram, granted - 1024))
+        sock.bind(self.path)
+        sock.setblocking(False)
+        self._sock = sock
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+
+    async def stop(self) -> None:
+        if self._sock is None:
+            return
+        if self._retry is not None:
+            self._retry.cancel()
+            self._retry = None
+        self._backlog.clear()
+        self._backlog_bytes.clear()
+        asyncio.get_running_loop().remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def publish(self, payload: str) -> None:
+        frames = self._frames(payload.encode())
+        for peer in self._peers():
+            if peer in self._backlog:
+                self._queue(peer, frames)  # behind what is already waiting
+            else:
+                self._send(peer, frames)
+        await self._deliver(payload)
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "peers_backlogged": len(self._backlog),
+            "backlog_bytes": sum(self._backlog_bytes.values()),
+            "dropped_events": self.dropped,
+            "fragmented_events": self.fragmented,
+            "incomplete_events": self.incomplete,
+        }
+
+    def _frames(self, data: bytes) -> List[bytes]:
+        """`data` as one datagram, or as fragments when it is too large."""
+        if len(data) <= self.max_datagram:
+            return [data]
+        self.fragmented += 1
+        event_id = f"{self._origin}:{next(self._fragmented_ids)}"
+        size = self.max_datagram - 64  # room for the header
+        chunks = [data[i:i + size] for i in range(0, len(data), size)]
+        return [
+            FRAGMENT + f"{event_id} {n} {len(chunks)}\n".encode() + chunk
+            for n, chunk in enumerate(chunks)
+        ]
+
+    def _send(self, peer: str, frames: List[bytes]) -> None:
+        for n, frame in enumerate(frames):
+            try:
+                self._sock.sendto(frame, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._forget(peer)
+                return
+            except BlockingIOError:
+                # peer not draining fast enough: the rest waits its turn
+                self._queue(peer, frames[n:])
+                return
+            except OSError as exc:
+                self.dropped += 1
+                logger.warning("backplane: dropped event for %s: %s", peer, exc)
+                return
+
+    def _queue(self, peer: str, frames: List[bytes]) -> None:
+        size = sum(len(frame) for frame in frames)
+        queued = self._backlog_bytes.get(peer, 0)
+        if queued + size > self.max_backlog:
+            self.dropped += 1
+            logger.warning("backplane: dropped event for %s: %d bytes already waiting", peer, queued)
+            return
+        self._backlog.setdefault(peer, deque()).extend(frames)
+        self._backlog_bytes[peer] = queued + size
+        if self._retry is None:
+            self._retry = asyncio.get_running_loop().call_later(self.RETRY_DELAY, self._flush_backlog)
+
+    def _flush_backlog(self) -> None:
+        self._retry = None
+        for peer in list(self._backlog):
+            backlog = self._backlog[peer]
+            while backlog:
+                try:
+                    self._sock.sendto(backlog[0], peer)
+                except BlockingIOError:
+                    break
+                except (ConnectionRefusedError, FileNotFoundError):
+                    self._forget(peer)
+                    break
+                except OSError as exc:
+                    self.dropped += 1
+                    logger.warning("backplane: dropped event for %s: %s", peer, exc)
+                self._backlog_bytes[peer] -= len(backlog.popleft())
+            if not backlog:
+                self._backlog.pop(peer, None)
+                self._backlog_bytes.pop(peer, None)
+        if self._backlog and self._sock is not None:
+            self._retry = asyncio.get_running_loop().call_later(self.RETRY_DELAY, self._flush_backlog)
+
+    def _peers(self) -> List[str]:
+        try:
+            entries = os.scandir(self.directory)
+        except FileNotFoundError:
+            return []
+        with entries:
+            return [
+                e.path for e in entries
+                if e.name.endswith(self.SUFFIX) and e.path != self.path
+            ]
+
+    def _forget(self, peer: str) -> None:
+        self._backlog.pop(peer, None)
+        self._backlog_bytes.pop(peer, None)
+        try:
+            os.unlink(peer)
+        except FileNotFoundError:
+            pass
+
+    def _reassemble(self, data: bytes) -> Optional[bytes]:
+        """Collect a fragment; the whole event once its last part is in."""
+        header, _, chunk = data[1:].partition(b"\n")
+        event_id, n, count = header.decode().split(" ")
+        entry = self._partial.get(event_id)
+        if entry is None:
+            if len(self._partial) >= self.MAX_PARTIAL:
+                # a fragment of the oldest was dropped on the way
+                del self._partial[next(iter(self._partial))]
+                self.incomplete += 1
+            entry = self._partial[event_id] = [[None] * int(count), int(count)]
+        parts = entry[0]
+        if parts[int(n)] is None:
+            parts[int(n)] = chunk
+            entry[1] -= 1
+        if entry[1]:
+            return None
+        del self._partial[event_id]
+        return b"".join(parts)
+
+    def _on_readable(self) -> None:
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(self.max_datagram)
+            except (BlockingIOError, InterruptedError):
+                return
+            if data[:1] == FRAGMENT:
+                data = self._reassemble(data)
+                if data is None:
+                    continue
+            task = asyncio.ensure_future(self._deliver(data.decode()))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+
+class PubSubClient(Protocol):
+    """What BrokerBackplane needs from a broker client."""
+
+    async def publish(self, channel: str, data: bytes) -> None: ...
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        """Subscribe, then return an iterator over the channel's messages."""
+        ...
+
+
+class BrokerBackplane(Backplane):
+    def __init__(self, client: PubSubClient, channel: str = "tasks"):
+        super().__init__()
+        self.client = client
+        self.channel = channel
+        self._pump: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        messages = await self.client.subscribe(self.channel)
+        self._pump = asyncio.create_task(self._run(messages))
+
+    async def stop(self) -> None:
+        if self._pump is not None:
+            self._pump.cancel()
+            try:
+                await self._pump
+            except asyncio.CancelledError:
+                pass
+            self._pump = None
+
+    async def publish(self, payload: str) -> None:
+        # our own subscription delivers it back to this worker as well
+        await self.client.publish(self.channel, payload.encode())
+
+    async def _run(self, messages: AsyncIterator[bytes]) -> None:
+        async for data in messages:
+            try:
+                await self._deliver(data.decode())
+            except Exception:
+                logger.exception("backplane: failed to deliver event")
+
+
+class LocalBroker:
+    """In-memory PubSubClient: a stand-in for Redis in tests and dev."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    async def publish(self, channel: str, data: bytes) -> None:
+        for queue in self._subscribers.get(channel, []):
+            queue.put_nowait(data)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, []).append(queue)
+        return self._drain(channel, queue)
+
+    async def _drain(self, channel: str, queue: asyncio.Queue) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[channel].remove(queue)
+
+
+class RedisPubSubClient:
+    """PubSubClient over redis.asyncio (optional dependency: `redis`)."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # imported lazily: only needed for this backplane
+
+        self._redis = redis.from_url(url)
+
+    async def publish(self, channel: str, data: bytes) -> None:
+        await self._redis.publish(channel, data)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(channel)
+        return self._listen(pubsub, channel)
+
+    async def _listen(self, pubsub, channel: str) -> AsyncIterator[bytes]:
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
+
+def build_backplane(kind: str, directory: str, url: str, channel: str) -> Backplane:
+    if kind == "memory":
+        return InProcessBackplane()
+    if kind == "unix":
+        return UnixSocketBackplane(directory)
+    if kind == "redis":
+        return BrokerBackplane(RedisPubSubClient(url), channel)
+    raise ValueError(f"Unknown backplane: {kind}")
@@ -0,0 +1,64 @@
+# app/core/batching.py
+"""
+Coalescing for socket fan-out under high write rates.
+
+With a batch window set, ConnectionManager collects delivered events for
+`ws_batch_window_ms` (or until `ws_batch_max_events`) and writes them to
+each socket as one `batch` frame instead of one frame per event:
+
+    {"seq":<last seq>,"type":"batch","events":[<event>, ...]}
+
+The events inside are the stamped payloads exactly as they would have
+been sent on their own. Single-task events for the same task id are
+merged, the latest state winning: a task created and claimed within one
+window arrives once, as `task_created` with its claimed state. Bulk
+events pass through as they are (they are batches already).
+
+Only the socket side is batched: seqs, the replay buffer and delivery
+listeners still see every event, so resync and cache invalidation behave
+as without a window.
+"""
+import json
+from typing import Dict, List, Sequence
+
+from core.events import seq_of
+
+MERGEABLE = ("task_created", "task_updated")
+
+
+def merge_events(payloads: Sequence[str]) -> List[str]:
+    """
+    Drop single-task events superseded by a later one for the same task;
+    the survivor keeps its place in order and its seq.
+    """
+    if len(payloads) < 2:
+        return list(payloads)
+    latest: Dict[int, int] = {}
+    created: Dict[int, bool] = {}
+    events = [json.loads(p) for p in payloads]
+    for i, event in enumerate(events):
+        if event.get("type") in MERGEABLE and isinstance(event.get("task"), dict):
+            task_id = event["task"].get("id")
+            latest[task_id] = i
+            created[task_id] = created.get(task_id, False) or event["type"] == "task_created"
+    merged = []
+    for i, (payload, event) in enumerate(zip(payloads, events)):
+        if event.get("type") in MERGEABLE and isinstance(event.get("task"), dict):
+            task_id = event["task"].get("id")
+            if latest[task_id] != i:
+                continue
+            if created[task_id] and event["type"] != "task_created":
+                # the client has not seen the task yet: it must still be a create
+                payload = json.dumps({**event, "type": "task_created"}, separators=(",", ":"))
+        merged.append(payload)
+    return merged
+
+
+def batch_frame(payloads: Sequence[str]) -> str:
+    """One frame for `payloads`; a lone event is sent as itself."""
+    if len(payloads) == 1:
+        return payloads[0]
+    seqs = [s for s in map(seq_of, payloads) if s is not None]
+    # seq first, as in single events, so seq_of() reads it
+    head = f'{{"seq":{max(seqs)},"type":"batch",' if seqs else '{"type":"batch",'
+    return f'{head}"events":[{",".join(payloads)}]}}'
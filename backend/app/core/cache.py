@@ -0,0 +1,132 @@
+# app/core/cache.py
+"""
+Bounded LRU/TTL cache of serialized responses.
+
+Entries hold the exact bytes sent to clients plus an ETag, so a hit
+costs no query and no serialization, and a matching If-None-Match costs
+neither a query nor a body. Each entry carries a `scope` describing the
+rows it was built from; `invalidate` drops the entries whose scope says
+an event affects them (see service/task_cache.py).
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# rough per-entry overhead on top of the body (key, entry object, dict slot)
+ENTRY_OVERHEAD = 256
+
+
+def make_etag(body: bytes) -> str:
+    return 'W/"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "next_cursor", "scope", "expires", "size")
+
+    def __init__(self, body: bytes, next_cursor: Optional[str], scope: Any, expires: float):
+        self.body = body
+        self.etag = make_etag(body)
+        self.next_cursor = next_cursor
+        self.scope = scope
+        self.expires = expires
+        self.size = len(body) + ENTRY_OVERHEAD
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 30.0, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.bytes = 0
+        # bumped by every invalidation; a result read from the database
+        # before a bump may already be stale, so `put` refuses it
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(
+        self, key: Hashable, body: bytes, next_cursor: Optional[str], scope: Any, version: int
+    ) -> CacheEntry:
+        """Store a freshly built response unless an invalidation raced it."""
+        entry = CacheEntry(body, next_cursor, scope, time.monotonic() + self.ttl)
+        if not self.enabled or version != self.version or entry.size > self.max_bytes:
+            return entry
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self.bytes += entry.size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, affected: Callable[[Any], bool]) -> int:
+        """Drop every entry whose scope `affected` returns true for."""
+        self.version += 1
+        stale = [key for key, entry in self._entries.items() if affected(entry.scope)]
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self.version += 1
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
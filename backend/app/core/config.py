@@ -1,12 +1,132 @@
+import os
+import tempfile
+from typing import Dict, Literal, Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class Settings(BaseSettings):
     app_name: str = "Todo App"
     database_url: str = "sqlite:///./todos.db"
+    # derived from database_url (aiosqlite / asyncpg) unless set explicitly
+    async_database_url: Optional[str] = None
+    # storage profile (database/tuning.py): "production" applies the sqlite_*
+    # pragmas to every SQLite connection, "legacy" keeps SQLite's defaults
+    storage_profile: Literal["production", "legacy"] = "production"
+    sqlite_journal_mode: Literal["wal", "delete", "truncate", "persist", "memory", "off"] = "wal"
+    sqlite_synchronous: Literal["normal", "full", "extra", "off"] = "normal"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    # server databases (Postgres): connection pool per engine and statement
+    # caching (SQLAlchemy's compiled cache; asyncpg's prepared statements,
+    # set to 0 behind pgbouncer in transaction mode)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 1000
+    db_prepared_statement_cache_size: int = 500
+    # WebSocket fan-out: per-socket outbound queue length, per-send timeout
+    # (seconds) and what to do when a socket's queue is full
+    ws_queue_size: int = 256
+    ws_send_timeout: float = 5.0
+    ws_slow_consumer_policy: Literal["drop_oldest", "disconnect"] = "drop_oldest"
+    # coalesce socket fan-out: hold events this long (or until this many)
+    # and send each socket one `batch` frame; 0 sends every event on its own
+    ws_batch_window_ms: float = 0.0
+    ws_batch_max_events: int = 256
+    # how events reach the other workers: "memory" (single process), "unix"
+    # (workers on one host, datagram sockets in backplane_dir) or "redis"
+    backplane: Literal["memory", "unix", "redis"] = "memory"
+    backplane_dir: str = os.path.join(tempfile.gettempdir(), "todo-backplane")
+    backplane_url: str = "redis://localhost:6379/0"
+    backplane_channel: str = "tasks"
+    # WebSocket resync: recent events kept per worker for reconnecting
+    # clients; "database" also persists them in task_events (needed for
+    # seqs to agree across workers and to survive restarts)
+    event_log: Literal["memory", "database"] = "memory"
+    event_buffer_size: int = 1024
+    event_log_retention: int = 100_000
+    # tasks per frame when a client has to take a full snapshot
+    snapshot_page_size: int = 500
+    # most values one /ws/tasks subscription filter (status, assignee, ids) may list
+    ws_subscription_max_values: int = 1000
+    # cold start (core/startup.py): apply Alembic migrations in the lifespan
+    # (off: run `alembic upgrade head` at deploy), warm this many pooled
+    # connections and the hot statements before serving, and serve this
+    # pre-built OpenAPI schema ("" or a missing file: generate on first use)
+    migrate_on_startup: bool = False
+    startup_warmup: bool = True
+    startup_warm_connections: int = 2
+    openapi_path: str = os.path.join(APP_DIR, "openapi.json")
+    # POST /tasks/claim-next long-poll: longest `wait` accepted (seconds),
+    # and how often a waiting request re-checks without a task_created event
+    claim_wait_max: float = 30.0
+    claim_poll_interval: float = 1.0
+    # archiving (service/archive.py): completed tasks untouched for this many
+    # days move to todos_archive (0: never), checked every archive_interval
+    # seconds, archive_batch_size rows per transaction with archive_batch_pause
+    # seconds between them so writers are not held up
+    archive_after_days: float = 0.0
+    archive_interval: float = 300.0
+    archive_batch_size: int = 1000
+    archive_batch_pause: float = 0.05
+    # rows fetched and sent per chunk by GET /tasks/export
+    stream_batch_size: int = 1000
+    # rate limiting: "requests/seconds" per client IP, with per-route
+    # overrides keyed "METHOD /path-prefix" (METHOD may be "*"). Counters
+    # live in "memory" (per worker), "sqlite" (rate_limit_path, shared by
+    # the workers on one host) or "redis" (rate_limit_url)
+    rate_limit: str = "100/60"
+    rate_limit_routes: Dict[str, str] = {
+        # workers loop on it, each call waiting up to claim_wait_max
+        "POST /tasks/claim-next": "600/60",
+    }
+    rate_limit_backend: Literal["memory", "sqlite", "redis"] = "memory"
+    rate_limit_path: str = os.path.join(tempfile.gettempdir(), "todo-ratelimit.db")
+    rate_limit_url: str = "redis://localhost:6379/1"
+    # bulk endpoints: items accepted per JSON request, and rows per
+    # transaction / coalesced broadcast event
+    bulk_max_items: int = 10_000
+    bulk_batch_size: int = 1000
+    # NDJSON uploads: lines per request, bytes per line, and per-item
+    # errors reported (later ones are only flagged by errors_truncated)
+    bulk_upload_max_items: int = 100_000
+    bulk_max_line_bytes: int = 16_384
+    bulk_max_errors: int = 1000
+    # read-through cache of serialized task listings/search/lookups,
+    # invalidated by broadcast events; the TTL caps staleness if an event
+    # is lost (or never sent, e.g. several workers on the memory backplane)
+    cache_enabled: bool = True
+    cache_max_bytes: int = 32 * 1024 * 1024
+    cache_ttl: float = 30.0
+    # GET /tasks/stats counters: coalesced changes are broadcast as one
+    # stats_delta event per push interval; a GROUP BY resets them from the
+    # database every reconcile interval (seconds)
+    stats_push_interval: float = 0.5
+    stats_reconcile_interval: float = 60.0
+    # instrumentation behind GET /metrics: request latency per route, SQL
+    # timing (statements over slow_query_ms are logged) and event loop lag
+    # sampled every loop_lag_interval seconds. With debug on, requests
+    # sent with "X-Profile: 1" are profiled into profile_dir
+    metrics_enabled: bool = True
+    slow_query_ms: float = 200.0
+    loop_lag_interval: float = 0.5
+    profile_dir: str = os.path.join(tempfile.gettempdir(), "todo-profiles")
     debug: bool = True  # WARNING: Set to False in production!
     # Add a note for future: restrict CORS and disable debug in prod
     # For authentication, see docs/auth.md (to be implemented)
     
+    @model_validator(mode="after")
+    def check_event_log(self) -> "Settings":
+        # per-worker counters would hand out the same seqs on every worker
+        if self.backplane != "memory" and self.event_log == "memory":
+            raise ValueError(f"backplane={self.backplane!r} needs event_log='database'")
+        return self
+
     class Config:
         env_file = ".env"
 
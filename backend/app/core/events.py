@@ -0,0 +1,116 @@
+# app/core/events.py
+"""
+Event sequencing and the replay buffer behind incremental WebSocket resync.
+
+Every broadcast event is stamped with a monotonically increasing `seq`
+(first key of the JSON object) before it is published. Each worker keeps
+the most recent events in a bounded ring as they are delivered, so a
+reconnecting client that reports its last seen seq gets just the events
+it missed; a gap older than the ring means a fresh snapshot.
+
+Sequences come from an in-process counter, or from the `task_events`
+table when the event log is durable. The durable log is required for
+seqs to be unique across workers and lets a restarted worker refill its
+ring instead of sending every reconnecting client a snapshot.
+"""
+import itertools
+import re
+import uuid
+from collections import deque
+from typing import Deque, List, Optional, Protocol, Sequence, Tuple
+
+from repositories.event import EventRepository
+
+_SEQ_PREFIX = re.compile(r'^\{"seq":(\d+),')
+
+
+class EventStore(Protocol):
+    """Durable sequence source (see DatabaseEventStore)."""
+
+    async def append(self, payload: str) -> int: ...
+
+    async def recent(self, limit: int) -> Sequence[Tuple[int, str]]: ...
+
+
+def stamp(seq: int, payload: str) -> str:
+    """Prefix a serialized JSON object with its seq: '{"seq":N,...}'."""
+    if not payload.startswith("{"):
+        raise ValueError(f"Only JSON objects can be stamped: {payload[:40]!r}")
+    if payload == "{}":
+        return f'{{"seq":{seq}}}'
+    return f'{{"seq":{seq},{payload[1:]}'
+
+
+def seq_of(payload: str) -> Optional[int]:
+    match = _SEQ_PREFIX.match(payload)
+    return int(match.group(1)) if match else None
+
+
+class EventLog:
+    def __init__(self, size: int = 1024, store: Optional[EventStore] = None):
+        self.size = size
+        self.store = store
+        # seqs only mean something within one epoch: a restarted in-memory
+        # log starts counting again, so clients from before must resnapshot
+        self.epoch = "durable" if store else uuid.uuid4().hex[:12]
+        self._ring: Deque[Tuple[int, str]] = deque(maxlen=size)
+        self._counter = itertools.count(1)
+        self.last_seq = 0
+
+    async def start(self) -> None:
+        """Refill the ring from the durable log after a restart."""
+        if self.store is None:
+            return
+        for seq, payload in await self.store.recent(self.size):
+            self.record(stamp(seq, payload))
+
+    async def stamp(self, payload: str) -> str:
+        if self.store is not None:
+            seq = await self.store.append(payload)
+        else:
+            seq = next(self._counter)
+        return stamp(seq, payload)
+
+    def record(self, payload: str) -> None:
+        """Remember a delivered event; unstamped payloads are ignored."""
+        seq = seq_of(payload)
+        if seq is None:
+            return
+        self._ring.append((seq, payload))
+        self.last_seq = max(self.last_seq, seq)
+
+    def since(self, seq: int, epoch: Optional[str]) -> Optional[List[str]]:
+        """
+        Events after `seq`, oldest first, or None when the client has to
+        take a snapshot instead (other epoch, or the gap outgrew the ring).
+        """
+        if epoch != self.epoch or seq > self.last_seq:
+            return None
+        if seq == self.last_seq:
+            return []
+        if not self._ring or self._ring[0][0] > seq + 1:
+            return None
+        return [payload for s, payload in self._ring if s > seq]
+
+
+class DatabaseEventStore:
+    """EventStore on the `task_events` table, pruned to `retention` rows."""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, session_factory, retention: int = 100_000):
+        self.session_factory = session_factory
+        self.retention = retention
+        self._appends = 0
+
+    async def append(self, payload: str) -> int:
+        async with self.session_factory() as db:
+            seq = await db.run_sync(EventRepository.append, payload)
+            self._appends += 1
+            if self._appends % self.PRUNE_EVERY == 0:
+                await db.run_sync(EventRepository.prune, self.retention)
+        return seq
+
+    async def recent(self, limit: int) -> Sequence[Tuple[int, str]]:
+        async with self.session_factory() as db:
+            return await db.run_sync(EventRepository.recent, limit)
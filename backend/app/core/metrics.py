@@ -0,0 +1,207 @@
+# app/core/metrics.py
+"""
+In-process metrics in the Prometheus text format, without a client library.
+
+Counters and histograms are plain dicts keyed by label values, updated
+inline (a bisect and two additions per observation); collectors are
+callables that return current values when /metrics is scraped, so state
+that already lives elsewhere (ConnectionManager, ResponseCache) is read
+rather than duplicated. Also here: SQL timing hooks for an Engine and an
+event-loop lag sampler.
+"""
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 labels: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self.series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self.series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket = _labels(self.label_names, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class Collector:
+    """Gauges read at scrape time: `read()` returns {suffix: number}."""
+
+    def __init__(self, prefix: str, help: str, read: Callable[[], Dict[str, float]]):
+        self.prefix, self.help, self.read = prefix, help, read
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, value in self.read().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            lines += [f"# HELP {name} {self.help}", f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                  labels: Sequence[str] = ()) -> Histogram:
+        return self.register(Histogram(name, help, buckets, labels))
+
+    def collector(self, prefix: str, help: str, read: Callable[[], Dict[str, float]]) -> Collector:
+        return self.register(Collector(prefix, help, read))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            try:
+                lines += metric.render()
+            except Exception:
+                logger.exception("metrics collector %s failed", getattr(metric, "prefix", metric))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    labels=("method", "route", "status"),
+)
+QUERY_LATENCY = registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time", QUERY_BUCKETS,
+)
+SLOW_QUERIES = registry.counter("db_slow_queries_total", "Statements slower than slow_query_ms")
+LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer scheduled every loop_lag_interval",
+    QUERY_BUCKETS,
+)
+WS_DELIVERY = registry.histogram(
+    "ws_delivery_duration_seconds", "Time to hand one event (or batch) to every local socket queue",
+    QUERY_BUCKETS,
+)
+WS_FANOUT = registry.counter("ws_fanout_messages_total", "Frames (events or batches) queued for sockets")
+
+
+def track_queries(engine: Engine, slow_query_ms: float) -> None:
+    """Time every statement on `engine` and log the ones over `slow_query_ms`."""
+    slow = slow_query_ms / 1000
+
+    # statements on one connection never overlap, so one start slot will do;
+    # a statement that raised is simply overwritten by the next one
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"]
+        QUERY_LATENCY.observe(elapsed)
+        if elapsed >= slow:
+            SLOW_QUERIES.inc()
+            logger.warning("slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split())[:500])
+
+
+class LoopLagMonitor:
+    """
+    Sleeps `interval` seconds in a loop and records how late it woke up:
+    anything that blocks the event loop shows up as lag.
+    """
+
+    def __init__(self, interval: float = 0.5, histogram: Histogram = LOOP_LAG):
+        self.interval = interval
+        self.histogram = histogram
+        self.last = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last = max(0.0, loop.time() - expected)
+            self.histogram.observe(self.last)
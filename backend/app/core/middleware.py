@@ -0,0 +1,157 @@
+# app/core/middleware.py
+"""
+Rate limiting and security headers as one pure-ASGI middleware, and the
+request metrics layer in the same style.
+
+BaseHTTPMiddleware runs every request through an extra task and a
+response stream; here the limiter check happens before the app is
+called and the headers are appended to the `http.response.start`
+message, from tuples built once at import.
+"""
+import json
+import os
+import re
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+from core.metrics import REQUEST_LATENCY, Histogram
+from core.ratelimit import RateLimiter, retry_after_header
+
+Header = Tuple[bytes, bytes]
+
+_BASE_HEADERS: List[Header] = [
+    (b"x-frame-options", b"DENY"),
+    (b"x-content-type-options", b"nosniff"),
+    (b"referrer-policy", b"same-origin"),
+    (b"strict-transport-security", b"max-age=63072000; includeSubDomains; preload"),
+]
+# strict CSP for API routes; Swagger UI and ReDoc need inline scripts/styles
+API_HEADERS: List[Header] = _BASE_HEADERS + [
+    (b"content-security-policy", b"default-src 'self'"),
+]
+DOCS_HEADERS: List[Header] = _BASE_HEADERS + [
+    (b"content-security-policy",
+     b"default-src 'self'; img-src 'self' data:; script-src 'self' 'unsafe-inline'; "
+     b"style-src 'self' 'unsafe-inline'; connect-src 'self'; font-src 'self' data:;"),
+]
+DOCS_PATHS = frozenset({"/docs", "/docs/", "/redoc", "/redoc/", "/openapi.json"})
+
+_TOO_MANY = json.dumps({"detail": "Too Many Requests"}).encode()
+
+
+class SecurityMiddleware:
+    """Reject over-limit clients with 429, add security headers to everything else."""
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        extra = DOCS_HEADERS if path in DOCS_PATHS else API_HEADERS
+        client = scope.get("client")
+        decision = await self.limiter.check(client[0] if client else "unknown", scope["method"], path)
+        if not decision.allowed:
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_TOO_MANY)).encode()),
+                    (b"retry-after", retry_after_header(decision).encode()),
+                    *extra,
+                ],
+            })
+            await send({"type": "http.response.body", "body": _TOO_MANY})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *extra]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def route_template(scope) -> str:
+    """
+    The matched route as a template ("/tasks/{task_id}"), rebuilt from the
+    path and its path params so it holds however routers were included.
+    """
+    if "route" not in scope:
+        return "unmatched"
+    path = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        value = str(value)
+        if value:
+            path = re.sub(rf"/{re.escape(value)}(?=/|$)", f"/{{{name}}}", path, count=1)
+    return path
+
+
+class MetricsMiddleware:
+    """
+    Per-route latency histogram, labelled with the matched route template
+    (never the raw path, which would mint a series per task id).
+
+    With `profile_dir` set (only when Settings.debug is on), a request
+    carrying `X-Profile: 1` runs under cProfile; the stats are written to
+    profile_dir and the file name returned in the X-Profile response header.
+    """
+
+    def __init__(self, app, histogram: Histogram = REQUEST_LATENCY, profile_dir: Optional[str] = None):
+        self.app = app
+        self.histogram = histogram
+        self.profile_dir = profile_dir
+        self._profiling = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            if self.profile_dir and (b"x-profile", b"1") in scope["headers"] and not self._profiling:
+                await self._profiled(scope, receive, send_with_status)
+            else:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            self.histogram.observe(
+                time.perf_counter() - start, scope["method"], route_template(scope), str(status)
+            )
+
+    async def _profiled(self, scope, receive, send):
+        # one profile at a time: cProfile hooks the whole thread, so other
+        # requests interleaved on the loop are included in the numbers
+        import cProfile  # imported lazily: only debug builds ever profile
+
+        self._profiling = True
+        profiler = cProfile.Profile()
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{uuid.uuid4().hex[:8]}.prof"
+
+        async def send_with_name(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (b"x-profile", name.encode())]
+            await send(message)
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_name)
+        finally:
+            profiler.disable()
+            self._profiling = False
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.profile_dir, name))
@@ -0,0 +1,36 @@
+# app/core/ndjson.py
+from typing import AsyncIterator, Optional
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Split a byte stream into lines as it arrives (final line may lack "\\n").
+    A partial line is collected in a bytearray, so a long line costs time
+    linear in its length; past `max_line` bytes it raises LineTooLong.
+    """
+    pending = bytearray()
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                break
+            pending += chunk[start:end]
+            if max_line is not None and len(pending) > max_line:
+                raise LineTooLong(f"longer than {max_line} bytes")
+            yield bytes(pending)
+            pending.clear()
+            start = end + 1
+        pending += chunk[start:]
+        if max_line is not None and len(pending) > max_line:
+            raise LineTooLong(f"longer than {max_line} bytes")
+    if pending:
+        yield bytes(pending)
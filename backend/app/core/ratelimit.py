@@ -0,0 +1,258 @@
+# app/core/ratelimit.py
+"""
+Sliding-window-counter rate limiting.
+
+Each key keeps two counters: requests in the current fixed window and in
+the previous one. The previous window is weighted by how much of it still
+overlaps the sliding window, so a check is O(1) and a key costs the same
+few bytes however many requests it makes:
+
+    estimate = prev * (1 - elapsed / period) + curr
+
+Backends decide where counters live: process memory, a SQLite file
+shared by the workers on one host, or Redis.
+"""
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Limit:
+    requests: int
+    period: int  # seconds
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        """'100/60' -> 100 requests per 60 seconds."""
+        requests, _, period = spec.partition("/")
+        return cls(int(requests), int(period or 60))
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+def _decide(limit: Limit, now: float, window: int, curr: int, prev: int) -> Tuple[Decision, int]:
+    """Shared window math: returns the decision and the new `curr`."""
+    elapsed = now - window * limit.period
+    estimate = prev * (1 - elapsed / limit.period) + curr
+    excess = estimate + 1 - limit.requests
+    if excess > 0:
+        left = limit.period - elapsed
+        if prev and excess <= prev * left / limit.period:
+            # enough of the previous window slides out before this one ends
+            retry = excess / prev * limit.period
+        else:
+            # then this window has to start sliding out as well
+            retry = left + max(curr + 1 - limit.requests, 0) / max(curr, 1) * limit.period
+        return Decision(False, 0, retry), curr
+    remaining = int(limit.requests - estimate - 1)
+    return Decision(True, remaining, 0.0), curr + 1
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def hit(self, key: str, limit: Limit, now: Optional[float] = None) -> Decision:
+        """Count one request against `key` unless it is over `limit`."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process counters in an LRU-ordered dict. Keys untouched for two
+    periods can no longer affect a decision and are evicted from the cold
+    end as new requests arrive, so memory tracks active clients only.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> [window, curr, prev, last_seen, period]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def hit(self, key: str, limit: Limit, now: Optional[float] = None) -> Decision:
+        now = time.time() if now is None else now
+        window = int(now // limit.period)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = [window, 0, 0, now, limit.period]
+            self._entries[key] = entry
+        else:
+            self._entries.move_to_end(key)
+            if entry[0] != window:
+                entry[2] = entry[1] if entry[0] == window - 1 else 0
+                entry[1] = 0
+                entry[0] = window
+        entry[3] = now
+        decision, entry[1] = _decide(limit, now, window, entry[1], entry[2])
+        self._evict(now)
+        return decision
+
+    def _evict(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            key, oldest = next(iter(entries.items()))
+            if len(entries) <= self.max_keys and now - oldest[3] < 2 * oldest[4]:
+                return
+            del entries[key]
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Counters in a SQLite file shared by every worker on the host. Each hit
+    is one short BEGIN IMMEDIATE transaction; the file is scratch state,
+    so it runs with WAL and synchronous=OFF (no fsync per request). The
+    transaction runs in a thread (one connection per thread): waiting for
+    another worker's write lock must not stall the event loop.
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " key TEXT PRIMARY KEY, window INTEGER NOT NULL,"
+                " curr INTEGER NOT NULL, prev INTEGER NOT NULL,"
+                " expires REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    async def hit(self, key: str, limit: Limit, now: Optional[float] = None) -> Decision:
+        now = time.time() if now is None else now
+        return await asyncio.to_thread(self._hit, key, limit, now)
+
+    def _hit(self, key: str, limit: Limit, now: float) -> Decision:
+        window = int(now // limit.period)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window, curr, prev FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            curr = prev = 0
+            if row is not None:
+                if row[0] == window:
+                    curr, prev = row[1], row[2]
+                elif row[0] == window - 1:
+                    prev = row[1]
+            decision, curr = _decide(limit, now, window, curr, prev)
+            conn.execute(
+                "INSERT INTO rate_limits (key, window, curr, prev, expires) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET window = excluded.window, curr = excluded.curr,"
+                " prev = excluded.prev, expires = excluded.expires",
+                (key, window, curr, prev, now + 2 * limit.period),
+            )
+            self._hits += 1
+            if self._hits % self.SWEEP_EVERY == 0:
+                conn.execute("DELETE FROM rate_limits WHERE expires < ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return decision
+
+
+# KEYS: current window, previous window. ARGV: seconds into the current
+# window, period, requests. Same estimate as _decide; returns the counts it
+# saw so the caller can work out the rest of the Decision.
+_REDIS_HIT = """
+local curr = tonumber(redis.call('GET', KEYS[1]) or '0')
+local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+local elapsed, period = tonumber(ARGV[1]), tonumber(ARGV[2])
+if prev * (1 - elapsed / period) + curr + 1 <= tonumber(ARGV[3]) then
+    redis.call('INCR', KEYS[1])
+    redis.call('EXPIRE', KEYS[1], 2 * period)
+end
+return {curr, prev}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Counters in Redis (optional dependency: `redis`). One INCR per allowed
+    request on `key:window`, expiring after two periods. Read, decide and
+    increment run as one Lua script, so concurrent workers cannot all pass
+    the check on the same count.
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # imported lazily: only needed for this backend
+
+        self._redis = redis.from_url(url)
+        self._hit = self._redis.register_script(_REDIS_HIT)
+
+    async def hit(self, key: str, limit: Limit, now: Optional[float] = None) -> Decision:
+        now = time.time() if now is None else now
+        window = int(now // limit.period)
+        curr, prev = await self._hit(
+            keys=[f"rl:{key}:{window}", f"rl:{key}:{window - 1}"],
+            args=[repr(now - window * limit.period), limit.period, limit.requests],
+        )
+        decision, _ = _decide(limit, now, window, int(curr), int(prev))
+        return decision
+
+
+class RateLimiter:
+    """
+    Picks the limit for a request and asks the backend. `routes` maps
+    "METHOD /path-prefix" (method may be "*") to a "requests/period" spec;
+    the longest matching prefix wins, anything else gets `default`. Each
+    rule counts separately, so a tight write limit does not eat into the
+    read budget.
+    """
+
+    def __init__(self, backend: RateLimitBackend, default: str, routes: Dict[str, str]):
+        self.backend = backend
+        self.default = Limit.parse(default)
+        rules: List[Tuple[str, str, str, Limit]] = []
+        for rule, spec in routes.items():
+            method, _, prefix = rule.strip().partition(" ")
+            rules.append((rule, method.upper(), prefix.strip() or "/", Limit.parse(spec)))
+        # longest prefix first, exact methods before wildcards
+        self.rules = sorted(rules, key=lambda r: (-len(r[2]), r[1] == "*"))
+
+    def limit_for(self, method: str, path: str) -> Tuple[str, Limit]:
+        for name, rule_method, prefix, limit in self.rules:
+            if rule_method in ("*", method) and path.startswith(prefix):
+                return name, limit
+        return "default", self.default
+
+    async def check(self, client: str, method: str, path: str) -> Decision:
+        name, limit = self.limit_for(method, path)
+        return await self.backend.hit(f"{client}|{name}", limit)
+
+
+def build_rate_limit_backend(kind: str, sqlite_path: str, url: str) -> RateLimitBackend:
+    if kind == "memory":
+        return MemoryRateLimitBackend()
+    if kind == "sqlite":
+        return SQLiteRateLimitBackend(sqlite_path)
+    if kind == "redis":
+        return RedisRateLimitBackend(url)
+    raise ValueError(f"Unknown rate limit backend: {kind}")
+
+
+def retry_after_header(decision: Decision) -> str:
+    return str(max(1, math.ceil(decision.retry_after)))
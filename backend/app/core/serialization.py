@@ -0,0 +1,80 @@
+# app/core/serialization.py
+"""
+One serialization path for tasks: ORM row -> TodoResponse -> JSON bytes,
+in pydantic's Rust core, once per task. The bytes are then reused as-is
+for the HTTP response body, the broadcast event and the response cache,
+instead of from_orm().dict() + jsonable_encoder + json.dumps per consumer.
+"""
+from typing import Any, AsyncIterator, Iterable, List, Sequence
+
+import pydantic_core
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+from schemas.todo import TodoResponse
+
+TASK = TypeAdapter(TodoResponse)
+TASK_LIST = TypeAdapter(List[TodoResponse])
+
+
+def dump_task(todo: Any) -> bytes:
+    return TASK.dump_json(TASK.validate_python(todo, from_attributes=True))
+
+
+def dump_tasks(todos: Sequence[Any]) -> bytes:
+    """A JSON array of tasks in one call (for lists nobody needs per item)."""
+    return TASK_LIST.dump_json(TASK_LIST.validate_python(todos, from_attributes=True))
+
+
+def dump_each(todos: Iterable[Any]) -> List[bytes]:
+    """Per-task bytes, for output that is sliced into several documents."""
+    return [dump_task(todo) for todo in todos]
+
+
+def join_array(parts: Sequence[bytes]) -> bytes:
+    return b"[" + b",".join(parts) + b"]"
+
+
+async def ndjson_chunks(batches: AsyncIterator[Sequence[bytes]]) -> AsyncIterator[bytes]:
+    """One chunk per batch of serialized tasks, one task per line."""
+    async for parts in batches:
+        if parts:
+            yield b"\n".join(parts) + b"\n"
+
+
+async def array_chunks(batches: AsyncIterator[Sequence[bytes]]) -> AsyncIterator[bytes]:
+    """The same batches as one JSON array, sent piece by piece."""
+    opener = b"["
+    async for parts in batches:
+        if parts:
+            yield opener + b",".join(parts)
+            opener = b","
+    yield b"[]" if opener == b"[" else b"]"
+
+
+def dump_json(content: Any) -> bytes:
+    """Anything else (dicts, projections, models) via pydantic_core."""
+    return pydantic_core.to_json(content)
+
+
+def task_event(kind: str, task: bytes) -> str:
+    """'{"type":kind,"task":{...}}' around an already serialized task."""
+    return f'{{"type":"{kind}","task":{task.decode()}}}'
+
+
+def tasks_event(kind: str, tasks: Sequence[bytes]) -> str:
+    return f'{{"type":"{kind}","tasks":{join_array(tasks).decode()}}}'
+
+
+class JSONBytesResponse(Response):
+    """
+    JSON response that sends pre-serialized bytes untouched and renders
+    anything else with pydantic_core (datetimes, enums and models included).
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dump_json(content)
@@ -0,0 +1,129 @@
+# app/core/startup.py
+"""
+Cold start: how long the worker took to come up, the engine warm-up run
+in the lifespan, and the pre-built OpenAPI schema.
+
+Workers restart often and scale to zero, so startup is on the request
+path. The lifespan warms the pool and the hot statements (SQLAlchemy's
+compiled cache, asyncpg's prepared statements) before the first request
+rather than during it; /openapi.json is served from a file written at
+build time instead of being generated on the first /docs hit:
+
+    python -m core.startup openapi.json
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import FastAPI
+from sqlalchemy.orm import Session
+
+from core.serialization import dump_task
+from models.todo import TaskStatus, Todo
+from repositories.todo import TodoRepository
+
+logger = logging.getLogger(__name__)
+
+
+def process_age() -> Optional[float]:
+    """Seconds since this process started (Linux /proc), else None."""
+    try:
+        with open("/proc/self/stat") as f:
+            # fields after the parenthesised command name; starttime is the 20th
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+
+
+class StartupTimes:
+    def __init__(self):
+        self.import_seconds: Optional[float] = None
+        self.lifespan_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        # process start (interpreter included) to serving, when /proc says
+        self.ready_seconds: Optional[float] = None
+
+    def ready(self, lifespan_seconds: float) -> None:
+        self.lifespan_seconds = lifespan_seconds
+        self.ready_seconds = process_age()
+        logger.info(
+            "startup: import %.0fms, lifespan %.0fms (warm-up %.0fms), serving %s after process start",
+            (self.import_seconds or 0) * 1000, lifespan_seconds * 1000, (self.warmup_seconds or 0) * 1000,
+            f"{self.ready_seconds * 1000:.0f}ms" if self.ready_seconds is not None else "?",
+        )
+
+    def metrics(self) -> dict:
+        values = {
+            "import_seconds": self.import_seconds,
+            "lifespan_seconds": self.lifespan_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "ready_seconds": self.ready_seconds,
+        }
+        return {k: v for k, v in values.items() if v is not None}
+
+
+startup = StartupTimes()
+
+
+def _warm(db: Session) -> None:
+    TodoRepository.warm_up(db)
+    dump_task(Todo(id=0, title="", status=TaskStatus.TODO, created_at=datetime.now(timezone.utc)))
+
+
+async def warm_up(session_factory, connections: int = 1) -> float:
+    """
+    Open `connections` pooled connections side by side (running the
+    connect-time pragmas) and put the hot statements through them. A
+    failure is logged, never fatal: the first requests just pay instead.
+    """
+    async def one():
+        async with session_factory() as db:
+            await db.run_sync(_warm)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(one() for _ in range(max(1, connections))))
+    except Exception:
+        logger.warning("warm-up failed; continuing cold", exc_info=True)
+    return time.perf_counter() - start
+
+
+def use_precompiled_openapi(app: FastAPI, path: str) -> None:
+    """Serve the schema at `path` when it exists; otherwise generate it as usual."""
+    generate = app.openapi
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            try:
+                with open(path) as f:
+                    app.openapi_schema = json.load(f)
+            except FileNotFoundError:
+                return generate()
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+def build_openapi(app: FastAPI) -> dict:
+    """A freshly generated schema, whatever the app has cached or loaded."""
+    cached, app.openapi_schema = app.openapi_schema, None
+    try:
+        return FastAPI.openapi(app)
+    finally:
+        app.openapi_schema = cached
+
+
+if __name__ == "__main__":
+    from main import app
+
+    with open(sys.argv[1] if len(sys.argv) > 1 else "openapi.json", "w") as f:
+        json.dump(build_openapi(app), f, indent=2)
+        f.write("\n")
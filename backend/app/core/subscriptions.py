@@ -0,0 +1,210 @@
+# app/core/subscriptions.py
+"""
+Topic filters for /ws/tasks.
+
+A Subscription narrows a socket to the tasks that match every field it
+sets: status in `status`, assignee in `assignee`, id in `ids`; a field
+left empty matches anything, and an empty subscription is everything.
+
+SubscriptionIndex files each filtered socket under the values of its most
+selective field (ids, else assignee, else status), so routing an event is
+a few dict lookups per task instead of a test against every socket; the
+other fields are checked on those candidates only. Batch events reach a
+filtered socket trimmed to the tasks it asked for.
+
+Claims are the only update and always move a task out of todo, so an
+update also reaches sockets watching `todo` (the task left their column).
+The previous assignee is not in the event: a claim that reassigns a task
+does not reach the old assignee's subscribers.
+"""
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple, Union
+
+from models.todo import TaskStatus
+
+TODO = TaskStatus.TODO.value
+STATUSES = frozenset(s.value for s in TaskStatus)
+
+# event type -> (key holding the task(s), is it an update)
+TASK_EVENTS = {
+    "task_created": ("task", False),
+    "task_updated": ("task", True),
+    "tasks_created": ("tasks", False),
+    "tasks_updated": ("tasks", True),
+    # completed tasks moved to the archive, as they were
+    "tasks_archived": ("tasks", False),
+}
+
+
+def _values(raw: Union[None, str, Iterable[Any]]) -> List[Any]:
+    """A query string value ("a,b") or a JSON list, as a list."""
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        return [v.strip() for v in raw.split(",") if v.strip()]
+    if isinstance(raw, (list, tuple)):
+        return list(raw)
+    raise ValueError("filters must be a list or a comma-separated string")
+
+
+@dataclass(frozen=True)
+class Subscription:
+    status: FrozenSet[str] = frozenset()
+    assignee: FrozenSet[str] = frozenset()
+    ids: FrozenSet[int] = frozenset()
+
+    @classmethod
+    def parse(cls, status=None, assignee=None, ids=None, max_values: int = 1000) -> "Subscription":
+        """Validate client input; raises ValueError with a message for the client."""
+        statuses, assignees, id_values = _values(status), _values(assignee), _values(ids)
+        unknown = set(map(str, statuses)) - STATUSES
+        if unknown:
+            raise ValueError(f"unknown status: {', '.join(sorted(unknown))}")
+        if not all(isinstance(a, str) for a in assignees):
+            raise ValueError("assignee values must be strings")
+        try:
+            id_values = [int(i) for i in id_values]
+        except (TypeError, ValueError):
+            raise ValueError("ids must be integers") from None
+        if max(len(statuses), len(assignees), len(id_values)) > max_values:
+            raise ValueError(f"at most {max_values} values per filter")
+        return cls(frozenset(statuses), frozenset(assignees), frozenset(id_values))
+
+    @property
+    def everything(self) -> bool:
+        return not (self.status or self.assignee or self.ids)
+
+    def topics(self) -> List[Tuple[str, Hashable]]:
+        """Index keys for this subscription: its most selective field."""
+        if self.ids:
+            return [("id", i) for i in self.ids]
+        if self.assignee:
+            return [("assignee", a) for a in self.assignee]
+        return [("status", s) for s in self.status]
+
+    def matches(self, task: dict, updated: bool = False) -> bool:
+        if self.ids and task.get("id") not in self.ids:
+            return False
+        if self.assignee and task.get("assignee") not in self.assignee:
+            return False
+        if self.status and task.get("status") not in self.status:
+            return updated and TODO in self.status
+        return True
+
+    def describe(self) -> dict:
+        """JSON form, as echoed in snapshot headers."""
+        fields = {"status": sorted(self.status), "assignee": sorted(self.assignee), "ids": sorted(self.ids)}
+        return {k: v for k, v in fields.items() if v}
+
+
+EVERYTHING = Subscription()
+
+
+def event_tasks(event: dict) -> Optional[Tuple[str, List[dict], bool]]:
+    """(key, tasks, is update) for task events; None for any other event."""
+    spec = TASK_EVENTS.get(event.get("type"))
+    if spec is None:
+        return None
+    key, updated = spec
+    tasks = event.get(key)
+    if key == "task":
+        tasks = [tasks] if isinstance(tasks, dict) else None
+    if not isinstance(tasks, list):
+        return None
+    return key, tasks, updated
+
+
+def narrow(payload: str, event: dict, subscription: Subscription) -> Optional[str]:
+    """
+    `payload` as `subscription` should see it: unchanged when every task in
+    it matches (or it is not a task event), trimmed to the matching tasks
+    for a batch, None when nothing matches.
+    """
+    parsed = event_tasks(event)
+    if parsed is None or subscription.everything:
+        return payload
+    key, tasks, updated = parsed
+    matching = [t for t in tasks if subscription.matches(t, updated)]
+    if len(matching) == len(tasks):
+        return payload
+    if not matching or key == "task":
+        return None
+    return json.dumps({**event, "tasks": matching}, separators=(",", ":"))
+
+
+def narrow_all(payloads: Iterable[str], subscription: Subscription) -> List[str]:
+    """Filter stored events (a resync) the same way live ones are routed."""
+    if subscription.everything:
+        return list(payloads)
+    narrowed = (narrow(p, json.loads(p), subscription) for p in payloads)
+    return [p for p in narrowed if p is not None]
+
+
+class SubscriptionIndex:
+    """Filtered subscriptions by key (a socket), indexed by topic."""
+
+    def __init__(self):
+        self.subscriptions: Dict[Hashable, Subscription] = {}
+        self._topics: Dict[Tuple[str, Hashable], Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def get(self, key: Hashable) -> Subscription:
+        return self.subscriptions.get(key, EVERYTHING)
+
+    def set(self, key: Hashable, subscription: Subscription) -> None:
+        """Replace `key`'s subscription; EVERYTHING just unindexes it."""
+        self.discard(key)
+        if subscription.everything:
+            return
+        self.subscriptions[key] = subscription
+        for topic in subscription.topics():
+            self._topics.setdefault(topic, set()).add(key)
+
+    def discard(self, key: Hashable) -> None:
+        subscription = self.subscriptions.pop(key, None)
+        if subscription is None:
+            return
+        for topic in subscription.topics():
+            keys = self._topics.get(topic)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._topics[topic]
+
+    def candidates(self, tasks: List[dict], updated: bool) -> Set[Hashable]:
+        """Keys whose topic any of `tasks` touches (matches still to check)."""
+        found: Set[Hashable] = set()
+        topics = self._topics
+        for task in tasks:
+            for topic in (("id", task.get("id")), ("assignee", task.get("assignee")),
+                          ("status", task.get("status"))):
+                keys = topics.get(topic)
+                if keys:
+                    found |= keys
+        if updated and tasks:
+            found |= topics.get(("status", TODO), set())
+        return found
+
+    def route(self, payload: str) -> Dict[Hashable, str]:
+        """
+        Filtered keys that should get `payload`, each with the payload as
+        it should see it. Keys not in the index take every event as is.
+        """
+        event = json.loads(payload)
+        parsed = event_tasks(event)
+        if parsed is None:
+            return {key: payload for key in self.subscriptions}
+        _, tasks, updated = parsed
+        routed: Dict[Hashable, str] = {}
+        # sockets with the same filter share one narrowed payload
+        narrowed: Dict[Subscription, Optional[str]] = {}
+        for key in self.candidates(tasks, updated):
+            subscription = self.subscriptions[key]
+            if subscription not in narrowed:
+                narrowed[subscription] = narrow(payload, event, subscription)
+            if narrowed[subscription] is not None:
+                routed[key] = narrowed[subscription]
+        return routed
@@ -0,0 +1,42 @@
+# app/database/async_connection.py
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from core.config import settings
+from core.metrics import track_queries
+from database.tuning import apply_sqlite_pragmas, engine_options, engine_url, sqlite_pragmas
+
+# async drivers for the sync URLs we accept in settings.database_url
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite / asyncpg)."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = settings.async_database_url or to_async_url(settings.database_url)
+
+# Create async engine; pragmas hook the sync engine underneath it
+async_engine = create_async_engine(
+    engine_url(ASYNC_DATABASE_URL, settings), **engine_options(ASYNC_DATABASE_URL, settings)
+)
+apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas(settings))
+if settings.metrics_enabled:
+    track_queries(async_engine.sync_engine, settings.slow_query_ms)
+
+# expire_on_commit=False: committed objects are serialized after the
+# session closes, where lazy refreshes would need IO outside a greenlet
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
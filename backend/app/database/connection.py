@@ -1,23 +1,29 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from models.todo import Base
+import models.event  # noqa: F401  (registers task_events on Base.metadata)
+import models.archive  # noqa: F401  (registers todos_archive on Base.metadata)
 from core.config import settings
+from core.metrics import track_queries
+from database.migrations import upgrade_to_head
+from database.tuning import apply_sqlite_pragmas, engine_options, sqlite_pragmas
 
 # SQLite database URL
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-# Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Only for SQLite
-)
+# Create engine (pool/driver options and SQLite pragmas per the storage profile)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL, settings))
+apply_sqlite_pragmas(engine, sqlite_pragmas(settings))
+if settings.metrics_enabled:
+    track_queries(engine, settings.slow_query_ms)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create tables
+# Create or update tables through the Alembic migrations: the schema and
+# its alembic_version stamp match `alembic upgrade head` (create_all left
+# the database unstamped, so a later upgrade tried to create it again)
 def create_tables():
-    Base.metadata.create_all(bind=engine)
+    upgrade_to_head()
 
 # Dependency to get database session
 def get_db():
@@ -0,0 +1,20 @@
+# app/database/migrations.py
+"""
+Schema changes go through Alembic (alembic/versions), never create_all.
+`upgrade_to_head` is `alembic upgrade head` for code paths that cannot
+shell out, e.g. the lifespan with MIGRATE_ON_STARTUP=true.
+"""
+import os
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def upgrade_to_head() -> None:
+    # imported lazily: only needed when migrating, and not cheap to import
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    # keep the app's logging as it is (env.py would load alembic.ini's)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
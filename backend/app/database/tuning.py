@@ -0,0 +1,73 @@
+# app/database/tuning.py
+"""
+Storage profile: per-connection SQLite pragmas and Postgres pool options,
+both driven by core.config.Settings.
+
+With the "production" profile every SQLite connection runs in WAL mode
+(readers no longer block on a writer, a commit appends to the log), with
+synchronous=NORMAL (fsync at checkpoints rather than every commit; a
+power cut can lose the last commits but never corrupts the database),
+a busy timeout so writers queue instead of failing, and larger page and
+mmap caches. "legacy" leaves SQLite's defaults alone.
+"""
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+from core.config import Settings
+
+
+def sqlite_pragmas(settings: Settings) -> List[Tuple[str, Any]]:
+    if settings.storage_profile == "legacy":
+        return []
+    return [
+        ("journal_mode", settings.sqlite_journal_mode),
+        ("synchronous", settings.sqlite_synchronous),
+        ("busy_timeout", settings.sqlite_busy_timeout_ms),
+        ("mmap_size", settings.sqlite_mmap_size),
+        # negative: size in KiB rather than pages
+        ("cache_size", -settings.sqlite_cache_size_kib),
+        ("temp_store", "memory"),
+    ]
+
+
+def engine_options(url: str, settings: Settings) -> Dict[str, Any]:
+    """Keyword arguments for create_engine / create_async_engine."""
+    parsed = make_url(url)
+    options: Dict[str, Any] = {"query_cache_size": settings.db_statement_cache_size}
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.get_driver_name() == "pysqlite":
+            options["connect_args"] = {"check_same_thread": False}
+        return options
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    return options
+
+
+def engine_url(url: str, settings: Settings) -> str:
+    """asyncpg keeps its own prepared-statement cache, sized via the URL."""
+    parsed = make_url(url)
+    if parsed.get_driver_name() == "asyncpg" and "prepared_statement_cache_size" not in parsed.query:
+        parsed = parsed.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.db_prepared_statement_cache_size)}
+        )
+    return parsed.render_as_string(hide_password=False)
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: List[Tuple[str, Any]]) -> None:
+    """Run the pragmas on every new DBAPI connection of a (sync) engine."""
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
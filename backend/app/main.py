@@ -1,65 +1,122 @@
+import time
+
+# wall time of the imports below, reported at startup (core/startup.py)
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.exceptions import RequestValidationError
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
 from routers.ws_route import router_ws
 from routers.todo_routers import router
-import os
-import time
-from collections import defaultdict
+from routers.metrics_route import router_metrics
+from core.ConnectionManager import manager
+from core.config import settings
+from core.metrics import LoopLagMonitor, registry
+from core.middleware import MetricsMiddleware, SecurityMiddleware
+from core.ratelimit import RateLimiter, build_rate_limit_backend
+from core.startup import startup, use_precompiled_openapi, warm_up
+from database.async_connection import AsyncSessionLocal
+from database.migrations import upgrade_to_head
+from service.archive import Archiver
+from service.claim_queue import on_delivered as on_work_delivered, work_signal
+from service.task_cache import on_delivered, task_cache
+from service.task_stats import StatsPublisher, on_delivered as on_stats_delivered
 
+logger = logging.getLogger(__name__)
 current_env = os.getenv("ENV", "development")
-print(f"Current environment: {current_env}")
+logger.info("environment: %s", current_env)
+
+# every delivered event (from any worker) evicts the cache entries it affects
+manager.add_listener(on_delivered)
+# ...and stats deltas from the other workers update this one's counters
+manager.add_listener(on_stats_delivered)
+# ...and new tasks wake requests long-polling POST /tasks/claim-next
+manager.add_listener(on_work_delivered)
+stats_publisher = StatsPublisher(
+    # unstamped: counter updates must not push task events out of the
+    # resync window or fill the durable event log
+    manager.publish,
+    AsyncSessionLocal,
+    push_interval=settings.stats_push_interval,
+    reconcile_interval=settings.stats_reconcile_interval,
+)
+archiver = Archiver(
+    manager.broadcast,
+    AsyncSessionLocal,
+    after_days=settings.archive_after_days,
+    interval=settings.archive_interval,
+    batch_size=settings.archive_batch_size,
+    batch_pause=settings.archive_batch_pause,
+)
+
+# state kept elsewhere is read into /metrics at scrape time
+loop_lag = LoopLagMonitor(settings.loop_lag_interval)
+registry.collector("ws", "WebSocket fan-out state (ConnectionManager.metrics)", manager.metrics)
+registry.collector("backplane", "Cross-worker relay backlog and losses (Backplane.metrics)", manager.backplane.metrics)
+registry.collector("response_cache", "Response cache counters (ResponseCache.stats)", task_cache.stats)
+registry.collector("event_loop", "Most recent event loop lag sample", lambda: {"lag_seconds": loop_lag.last})
+registry.collector("claim_queue", "Requests long-polling claim-next (WorkSignal.metrics)", work_signal.metrics)
+registry.collector("archive", "Live table size and archiving progress (Archiver.metrics)", archiver.metrics)
+registry.collector("startup", "Cold start timings of this worker (core/startup.py)", startup.metrics)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    if settings.migrate_on_startup:
+        # schema changes only ever come from the Alembic migrations
+        await asyncio.to_thread(upgrade_to_head)
+    # join the broadcast backplane before serving, leave it on shutdown
+    await manager.start()
+    if settings.startup_warmup:
+        # pool and hot statements ready before the first request, not during it
+        startup.warmup_seconds = await warm_up(AsyncSessionLocal, settings.startup_warm_connections)
+    await stats_publisher.start()
+    if settings.archive_after_days > 0:
+        await archiver.start()
+    if settings.metrics_enabled:
+        loop_lag.start()
+    startup.ready(time.perf_counter() - started)
+    yield
+    await loop_lag.stop()
+    await archiver.stop()
+    await stats_publisher.stop()
+    await manager.stop()
 
 app = FastAPI(
     title="Todo App",
+    lifespan=lifespan,
     # Ensure Swagger UI is always available for debugging
     docs_url="/docs",
     redoc_url="/redoc",
     # Handle trailing slashes automatically - redirect /path/ to /path and vice versa
     redirect_slashes=True,
 )
+# /openapi.json from the schema written at build time, not built on first hit
+if settings.openapi_path:
+    use_precompiled_openapi(app, settings.openapi_path)
+
+# --- Rate Limiting + Security Headers (one pure-ASGI layer, core/middleware.py) ---
+# sliding-window counters per client IP and route rule (see core/ratelimit.py)
+rate_limiter = RateLimiter(
+    build_rate_limit_backend(
+        settings.rate_limit_backend,
+        sqlite_path=settings.rate_limit_path,
+        url=settings.rate_limit_url,
+    ),
+    default=settings.rate_limit,
+    routes=settings.rate_limit_routes,
+)
+app.add_middleware(SecurityMiddleware, limiter=rate_limiter)
 
-# --- Security Headers Middleware ---
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        response: Response = await call_next(request)
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["Referrer-Policy"] = "same-origin"
-        response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains; preload"
-        
-        # Modified CSP to allow Swagger UI to work correctly
-        if request.url.path in ["/docs", "/docs/", "/redoc", "/redoc/", "/openapi.json"]:
-            # Allow everything needed for Swagger UI and ReDoc
-            response.headers["Content-Security-Policy"] = "default-src 'self'; img-src 'self' data:; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'; connect-src 'self'; font-src 'self' data:;"
-        else:
-            # Strict CSP for regular API routes
-            response.headers["Content-Security-Policy"] = "default-src 'self'"
-        return response
-
-app.add_middleware(SecurityHeadersMiddleware)
-
-# --- Simple In-Memory Rate Limiting Middleware ---
-RATE_LIMIT = 100  # requests
-RATE_PERIOD = 60  # seconds
-client_requests = defaultdict(list)
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        client_ip = request.client.host
-        now = time.time()
-        window = now - RATE_PERIOD
-        # Remove old requests
-        client_requests[client_ip] = [t for t in client_requests[client_ip] if t > window]
-        if len(client_requests[client_ip]) >= RATE_LIMIT:
-            return JSONResponse(status_code=429, content={"detail": "Too Many Requests"})
-        client_requests[client_ip].append(now)
-        return await call_next(request)
-
-app.add_middleware(RateLimitMiddleware)
+# --- Request metrics (outside the limiter, so 429s are counted too) ---
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, profile_dir=settings.profile_dir if settings.debug else None)
 
 # CORS: Open for dev, restrict for prod
 ENV = os.getenv("ENV", "development")
@@ -70,6 +127,7 @@ if ENV == "production":
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
 else:
     app.add_middleware(
@@ -78,6 +136,7 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
 
 # mount REST endpoints at root level (task routes defined in the router)
@@ -86,6 +145,9 @@ app.include_router(router, prefix="/tasks")
 # mount WebSocket endpoint at /ws/tasks
 app.include_router(router_ws)
 
+# Prometheus scrape endpoint
+app.include_router(router_metrics)
+
 # Global error handler to avoid leaking stack traces
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
@@ -100,7 +162,12 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
 # Catch-all route handler for unknown endpoints - must be last
-@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"])
+# (kept out of the OpenAPI schema: a 404 fallback, not an operation)
+@app.api_route(
+    "/{path:path}",
+    methods=["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"],
+    include_in_schema=False,
+)
 async def catch_all(request: Request, path: str):
     # Handle search URLs with trailing slash specifically
     if request.url.path == "/tasks/search/" and "title" in request.query_params:
@@ -110,6 +177,8 @@ async def catch_all(request: Request, path: str):
     
     raise HTTPException(status_code=404, detail=f"Endpoint not found: {request.method} {request.url.path}")
 
+startup.import_seconds = time.perf_counter() - _import_started
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
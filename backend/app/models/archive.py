@@ -0,0 +1,24 @@
+# app/models/archive.py
+from sqlalchemy import Column, Integer, String, Enum, Text, DateTime, Index, func
+from models.todo import Base, TaskStatus
+
+class TodoArchive(Base):
+    """
+    Completed tasks moved out of `todos` (service/archive.py). Same
+    columns and ids as `todos`, plus when the row was moved.
+    """
+    __tablename__ = "todos_archive"
+
+    id          = Column(Integer, primary_key=True, autoincrement=False)
+    title       = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    assignee    = Column(String(100), nullable=True)
+    status      = Column(Enum(TaskStatus), nullable=False)
+    created_at  = Column(DateTime(timezone=True), nullable=False)
+    updated_at  = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # include_archived listings walk `id`, optionally for one assignee
+    __table_args__ = (
+        Index("ix_todos_archive_assignee_id", "assignee", "id"),
+    )
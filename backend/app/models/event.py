@@ -0,0 +1,11 @@
+# app/models/event.py
+from sqlalchemy import Column, Integer, Text, DateTime, func
+from models.todo import Base
+
+class TaskEvent(Base):
+    """Durable event log: `id` is the broadcast sequence number."""
+    __tablename__ = "task_events"
+
+    id         = Column(Integer, primary_key=True)
+    payload    = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,60 @@
+# app/models/search_index.py
+"""
+Title search index kept in sync by the database itself.
+
+SQLite gets an external-content FTS5 table plus triggers on `todos`;
+Postgres gets a pg_trgm GIN index that `ILIKE '%...%'` can use. The DDL
+hangs off the `todos` table events so `create_all` (tests, dev boot) and
+the Alembic revision produce the same schema.
+"""
+from sqlalchemy import DDL, Table, column, event, table
+
+FTS_TABLE = "todos_fts"
+
+# lightweight handle for queries; deliberately not part of Base.metadata
+todos_fts = table(FTS_TABLE, column("rowid"), column("title"), column("rank"))
+
+SQLITE_CREATE = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title,
+        content='todos',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS todos_fts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title) VALUES (new.id, new.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS todos_fts_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS todos_fts_au AFTER UPDATE OF title ON todos BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO {FTS_TABLE}(rowid, title) VALUES (new.id, new.title);
+    END""",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS todos_fts_au",
+    "DROP TRIGGER IF EXISTS todos_fts_ad",
+    "DROP TRIGGER IF EXISTS todos_fts_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+SQLITE_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_todos_title_trgm ON todos USING gin (title gin_trgm_ops)",
+]
+POSTGRES_DROP = ["DROP INDEX IF EXISTS ix_todos_title_trgm"]
+
+
+def attach_search_index(todos: Table) -> None:
+    """Create/drop the search index alongside `todos` in create_all/drop_all."""
+    for stmt in SQLITE_CREATE:
+        event.listen(todos, "after_create", DDL(stmt).execute_if(dialect="sqlite"))
+    for stmt in POSTGRES_CREATE:
+        event.listen(todos, "after_create", DDL(stmt).execute_if(dialect="postgresql"))
+    for stmt in SQLITE_DROP:
+        event.listen(todos, "before_drop", DDL(stmt).execute_if(dialect="sqlite"))
+    for stmt in POSTGRES_DROP:
+        event.listen(todos, "before_drop", DDL(stmt).execute_if(dialect="postgresql"))
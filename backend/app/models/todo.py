@@ -1,10 +1,16 @@
 # app/models/todo.py
-from sqlalchemy import Column, Integer, String, Enum, Text, DateTime, func
+from sqlalchemy import Column, Integer, String, Enum, Text, DateTime, Index, func, text
 from sqlalchemy.ext.declarative import declarative_base
 from enum import Enum as PyEnum
+from models.search_index import attach_search_index
 
 Base = declarative_base()
 
+# the claim queue's partial index covers only TODO rows. Queries must repeat
+# this predicate with the literal: a bound parameter cannot be matched
+# against a partial index (SQLite never, Postgres not in a generic plan)
+CLAIMABLE = "status = 'TODO'"
+
 class TaskStatus(PyEnum):
     TODO = "todo"
     INPROGRESS = "inprogress"
@@ -13,10 +19,28 @@ class TaskStatus(PyEnum):
 class Todo(Base):
     __tablename__ = "todos"
 
-    id          = Column(Integer, primary_key=True, index=True)
+    id          = Column(Integer, primary_key=True)
     title       = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     assignee    = Column(String(100), nullable=True)
     status      = Column(Enum(TaskStatus), default=TaskStatus.TODO, nullable=False)
     created_at  = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at  = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at  = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # keyset pagination walks `id`; the filtered listings need the filter
+    # column first so "status=todo after id N" stays an index range scan.
+    # The primary key is the only index on `id` itself.
+    __table_args__ = (
+        Index("ix_todos_status_id", "status", "id"),
+        Index("ix_todos_assignee_id", "assignee", "id"),
+        # "my tasks in status X", still in id order
+        Index("ix_todos_assignee_status_id", "assignee", "status", "id"),
+        # the claim queue: oldest TODO first, never touching claimed rows
+        Index(
+            "ix_todos_claimable", "created_at", "id",
+            sqlite_where=text(CLAIMABLE), postgresql_where=text(CLAIMABLE),
+        ),
+    )
+
+# keep the title search index in lock-step with the table
+attach_search_index(Todo.__table__)
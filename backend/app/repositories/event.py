@@ -0,0 +1,29 @@
+# app/repositories/event.py
+from typing import List, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from models.event import TaskEvent
+
+class EventRepository:
+    @staticmethod
+    def append(db: Session, payload: str) -> int:
+        event = TaskEvent(payload=payload)
+        db.add(event)
+        db.commit()
+        return event.id
+
+    @staticmethod
+    def recent(db: Session, limit: int) -> List[Tuple[int, str]]:
+        """The newest `limit` events, oldest first."""
+        stmt = select(TaskEvent.id, TaskEvent.payload).order_by(TaskEvent.id.desc()).limit(limit)
+        return [tuple(row) for row in reversed(db.execute(stmt).all())]
+
+    @staticmethod
+    def prune(db: Session, keep: int) -> int:
+        """Delete all but the newest `keep` events; returns rows deleted."""
+        newest = db.scalar(select(TaskEvent.id).order_by(TaskEvent.id.desc()).limit(1))
+        if newest is None:
+            return 0
+        result = db.execute(delete(TaskEvent).where(TaskEvent.id <= newest - keep))
+        db.commit()
+        return result.rowcount
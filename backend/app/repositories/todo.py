@@ -1,7 +1,85 @@
 # app/repositories/todo.py
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from models.todo import Todo, TaskStatus
+import heapq
+import re
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Iterator, Optional, List, Sequence, Set, Tuple
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.todo import CLAIMABLE, Todo, TaskStatus
+from models.archive import TodoArchive
+from models.search_index import todos_fts
+
+_SEARCH_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_prefix_query(text: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query: every word becomes a quoted prefix
+    term ("app" finds "apple"), all of which must match. Returns None when
+    there is nothing searchable, so user input never reaches the FTS parser.
+    """
+    terms = _SEARCH_TERM.findall(text)
+    if not terms:
+        return None
+    return " ".join(f'"{t}"*' for t in terms)
+
+def _filtered(stmt, model, after_id: Optional[int], status: Optional[TaskStatus], assignee: Optional[str]):
+    if after_id is not None:
+        stmt = stmt.where(model.id > after_id)
+    if status is not None:
+        stmt = stmt.where(model.status == status)
+    if assignee is not None:
+        stmt = stmt.where(model.assignee == assignee)
+    return stmt
+
+def _list_statement(
+    after_id: Optional[int] = None,
+    status: Optional[TaskStatus] = None,
+    assignee: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    model=Todo,
+):
+    if columns:
+        stmt = select(*(getattr(model, c) for c in columns))
+    else:
+        stmt = select(model)
+    stmt = _filtered(stmt, model, after_id, status, assignee).order_by(model.id)
+    return stmt if limit is None else stmt.limit(limit)
+
+def _claimable_ids(dialect: str, limit: int, skip_locked: bool = False):
+    """
+    Ids of the `limit` oldest TODO tasks, read off the ix_todos_claimable
+    partial index. SQLite's planner only prefers that index once ANALYZE
+    has run (until then it sorts every TODO row), so there it is named.
+    With `skip_locked`, rows another transaction has locked are passed
+    over (FOR UPDATE SKIP LOCKED); SQLite has one writer at a time and
+    needs no row locks.
+    """
+    if dialect == "sqlite":
+        return text(
+            "SELECT id FROM todos INDEXED BY ix_todos_claimable "
+            f"WHERE {CLAIMABLE} ORDER BY created_at, id LIMIT :claimable_limit"
+        ).bindparams(claimable_limit=limit).columns(Todo.id)
+    # aliased: inside an UPDATE of todos the subquery must not correlate
+    queued = aliased(Todo, name="queued")
+    stmt = select(queued.id).where(text(f"queued.{CLAIMABLE}"))
+    stmt = stmt.order_by(queued.created_at, queued.id).limit(limit)
+    return stmt.with_for_update(skip_locked=True) if skip_locked else stmt
+
+def _claim_statement(task_id, assignee: str, status: TaskStatus):
+    return (
+        update(Todo)
+        .where(Todo.id == task_id, Todo.status == TaskStatus.TODO)
+        .values(assignee=assignee, status=status)
+        .returning(Todo)
+    )
+
+def _claim_next_statement(dialect: str, assignee: str, status: TaskStatus):
+    """Pick and claim the oldest TODO task in one UPDATE ... RETURNING."""
+    next_id = _claimable_ids(dialect, 1, skip_locked=True).scalar_subquery()
+    return _claim_statement(next_id, assignee, status)
 
 class TodoRepository:
     @staticmethod
@@ -16,12 +94,188 @@ class TodoRepository:
         return todo
     
     @staticmethod
-    def search_by_title(db: Session, title: str) -> List[Todo]:
+    def list_page(
+        db: Session,
+        limit: int,
+        after_id: Optional[int] = None,
+        status: Optional[TaskStatus] = None,
+        assignee: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        include_archived: bool = False,
+    ) -> list:
+        """
+        One keyset page ordered by id. Returns ORM objects, or plain dicts
+        of just `columns` (skipping ORM hydration) when columns are given.
+        With `include_archived`, archived tasks (TodoArchive objects; they
+        keep their ids) are merged in by id: the same page is read off
+        each table's id index and the two are merged.
+        """
+        def page(model) -> list:
+            stmt = _list_statement(after_id, status, assignee, columns, limit, model)
+            if columns:
+                return [dict(row) for row in db.execute(stmt).mappings()]
+            return list(db.scalars(stmt))
+
+        rows = page(Todo)
+        if not include_archived or status not in (None, TaskStatus.COMPLETED):
+            return rows
+        key = (lambda row: row["id"]) if columns else (lambda row: row.id)
+        return list(heapq.merge(rows, page(TodoArchive), key=key))[:limit]
+
+    @staticmethod
+    def list_by_status(
+        db: Session, status: TaskStatus, limit: int, after_id: Optional[int] = None
+    ) -> List[Todo]:
+        """A keyset page of one status, a range scan of ix_todos_status_id."""
+        return TodoRepository.list_page(db, limit, after_id=after_id, status=status)
+
+    @staticmethod
+    def list_by_assignee(
+        db: Session,
+        assignee: str,
+        limit: int,
+        after_id: Optional[int] = None,
+        status: Optional[TaskStatus] = None,
+    ) -> List[Todo]:
+        """
+        A keyset page of one assignee's tasks ("my tasks"), optionally of one
+        status: ix_todos_assignee_id, or ix_todos_assignee_status_id.
+        """
+        return TodoRepository.list_page(db, limit, after_id=after_id, status=status, assignee=assignee)
+
+    @staticmethod
+    def next_claimable(db: Session, limit: int = 1) -> List[Todo]:
+        """
+        The oldest TODO tasks, oldest first (created_at, then id). Reads
+        only the claim queue index, however many tasks are claimed or done.
+        """
+        ids = _claimable_ids(db.get_bind().dialect.name, limit)
+        stmt = select(Todo).where(Todo.id.in_(ids)).order_by(Todo.created_at, Todo.id)
+        return list(db.scalars(stmt))
+
+    @staticmethod
+    def iter_batches(
+        db: Session,
+        batch_size: int,
+        status: Optional[TaskStatus] = None,
+        assignee: Optional[str] = None,
+    ) -> Iterator[List[Todo]]:
+        """
+        Every matching task in id order, `batch_size` rows at a time, from
+        one query whose rows are fetched as they are consumed (yield_per:
+        a server-side cursor on Postgres, stepped fetches on SQLite). Only
+        the current batch is held in memory.
+        """
+        stmt = _list_statement(status=status, assignee=assignee)
+        result = db.scalars(stmt.execution_options(yield_per=batch_size))
+        for batch in result.partitions():
+            yield batch
+
+    @staticmethod
+    def search_by_title(
+        db: Session,
+        title: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        include_archived: bool = False,
+    ) -> list:
+        """
+        Returns Todo rows matching `title`, best match first.
+
+        SQLite: prefix match on title words via the FTS5 index, ranked by
+        bm25. Postgres: case-insensitive substring match served by the
+        pg_trgm index, ranked by similarity. Other dialects fall back to a
+        plain ILIKE scan.
+
+        With `include_archived`, archived matches (TodoArchive objects)
+        follow the live ones, looked up only when the live results run out
+        before the page does.
+        """
+        if include_archived:
+            wanted = None if limit is None else offset + limit
+            rows = TodoRepository.search_by_title(db, title, limit=wanted)
+            if wanted is None or len(rows) < wanted:
+                rows += TodoRepository.search_archive(db, title, None if wanted is None else wanted - len(rows))
+            return rows[offset:] if limit is None else rows[offset:offset + limit]
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            query = fts_prefix_query(title)
+            if query is None:
+                return []
+            stmt = (
+                select(Todo)
+                .join(todos_fts, todos_fts.c.rowid == Todo.id)
+                .where(todos_fts.c.title.op("MATCH")(query))
+                .order_by(todos_fts.c.rank, Todo.id)
+            )
+        else:
+            stmt = select(Todo).where(Todo.title.ilike(f"%{title}%"))
+            if dialect == "postgresql":
+                stmt = stmt.order_by(func.similarity(Todo.title, title).desc(), Todo.id)
+            else:
+                stmt = stmt.order_by(Todo.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset:
+            stmt = stmt.offset(offset)
+        return list(db.scalars(stmt))
+
+    @staticmethod
+    def search_archive(db: Session, title: str, limit: Optional[int] = None) -> List[TodoArchive]:
+        """
+        Archived tasks whose title contains every word of `title`, newest
+        first. The archive has no search index: this is a scan, paid only
+        by callers that ask for archived results.
+        """
+        terms = _SEARCH_TERM.findall(title)
+        if not terms:
+            return []
+        stmt = (
+            select(TodoArchive)
+            .where(*(TodoArchive.title.icontains(term, autoescape=True) for term in terms))
+            .order_by(TodoArchive.id.desc())
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return list(db.scalars(stmt))
+
+    @staticmethod
+    def get_archived(db: Session, task_id: int) -> Optional[TodoArchive]:
+        return db.get(TodoArchive, task_id)
+
+    @staticmethod
+    def archive_completed(db: Session, cutoff: datetime, limit: int, after_id: int = 0) -> List[dict]:
         """
-        Returns all Todo rows whose title contains the `title` substring,
-        case-insensitive.
+        Move up to `limit` completed tasks last changed before `cutoff`
+        (ids above `after_id`, in id order) into todos_archive, in one
+        transaction; returns the moved rows. The DELETE ... RETURNING
+        comes first, so two archivers never move the same row: Postgres
+        skips rows another one has locked, on SQLite the second waits
+        for the write lock and finds them gone. The newest task always
+        stays, as SQLite would hand its id out again.
         """
-        return db.query(Todo).filter(Todo.title.ilike(f"%{title}%")).all()
+        done, newest = aliased(Todo, name="done"), aliased(Todo, name="newest")
+        ids = (
+            select(done.id)
+            .where(
+                done.status == TaskStatus.COMPLETED,
+                done.id > after_id,
+                func.coalesce(done.updated_at, done.created_at) < cutoff,
+                done.id < select(func.max(newest.id)).scalar_subquery(),
+            )
+            .order_by(done.id)
+            .limit(limit)
+        )
+        if db.get_bind().dialect.name != "sqlite":
+            ids = ids.with_for_update(skip_locked=True)
+        todos = Todo.__table__
+        stmt = delete(todos).where(todos.c.id.in_(ids), todos.c.status == TaskStatus.COMPLETED)
+        rows = sorted((dict(row) for row in db.execute(stmt.returning(*todos.c)).mappings()),
+                      key=lambda row: row["id"])
+        if rows:
+            db.execute(insert(TodoArchive.__table__), rows)
+        db.commit()
+        return rows
 
     @staticmethod
     def update_assignee_and_status(
@@ -36,4 +290,176 @@ class TodoRepository:
         todo.assignee = assignee
         todo.status   = status
         # updated_at will be auto‐set by SQLAlchemy on commit
-        return TodoRepository.save(db, todo)
\ No newline at end of file
+        return TodoRepository.save(db, todo)
+
+    @staticmethod
+    def insert_many(db: Session, rows: Sequence[dict]) -> List[Todo]:
+        """
+        Insert `rows` (column dicts) in one transaction and return the new
+        Todos in input order. One multi-row INSERT ... RETURNING per few
+        hundred rows instead of a round trip and a commit per row.
+        """
+        if not rows:
+            return []
+        stmt = insert(Todo).returning(Todo, sort_by_parameter_order=True)
+        todos = list(db.scalars(stmt, rows))
+        db.commit()
+        return todos
+
+    @staticmethod
+    def claim(db: Session, task_id: int, assignee: str, status: TaskStatus) -> Optional[Todo]:
+        """
+        Claim a task only if it is still TODO: one conditional UPDATE ...
+        RETURNING, so concurrent claimers cannot both win. None when the
+        task is missing or no longer TODO.
+        """
+        todo = db.scalars(_claim_statement(task_id, assignee, status)).one_or_none()
+        db.commit()
+        return todo
+
+    @staticmethod
+    def claim_next(db: Session, assignee: str, status: TaskStatus) -> Optional[Todo]:
+        """
+        Claim the oldest TODO task, whichever it is; None when there is
+        none. Picking and claiming is one statement, so concurrent callers
+        each get a different task: on Postgres a task being claimed is
+        locked and skipped by the others, on SQLite writers take turns.
+        """
+        dialect = db.get_bind().dialect.name
+        todo = db.scalars(_claim_next_statement(dialect, assignee, status)).one_or_none()
+        db.commit()
+        return todo
+
+    @staticmethod
+    def claim_many(
+        db: Session, claims: Sequence[Tuple[int, str, TaskStatus]]
+    ) -> List[Optional[Todo]]:
+        """
+        Claim each (task_id, assignee, status) in one transaction. Every
+        UPDATE only matches a task that is still TODO, so a claim can never
+        overwrite another; the result holds None where nothing matched.
+        """
+        claimed = [
+            db.scalars(_claim_statement(task_id, assignee, status)).one_or_none()
+            for task_id, assignee, status in claims
+        ]
+        db.commit()
+        return claimed
+
+    @staticmethod
+    def get_many(db: Session, ids: Iterable[int]) -> List[Todo]:
+        """The tasks among `ids` that exist, in id order."""
+        return list(db.scalars(select(Todo).where(Todo.id.in_(list(ids))).order_by(Todo.id)))
+
+    @staticmethod
+    def existing_ids(db: Session, ids: Iterable[int]) -> Set[int]:
+        return set(db.scalars(select(Todo.id).where(Todo.id.in_(list(ids)))))
+
+    @staticmethod
+    def warm_up(db: Session) -> None:
+        """
+        Run each hot statement once so it is compiled (and prepared, on
+        asyncpg) before real traffic. Touches no rows: id 0 never exists
+        and the claim UPDATE is rolled back.
+        """
+        TodoRepository.list_page(db, 1)
+        TodoRepository.list_page(db, 1, status=TaskStatus.TODO)
+        TodoRepository.next_claimable(db)
+        TodoRepository.get_by_id(db, 0)
+        TodoRepository.existing_ids(db, [0])
+        TodoRepository.search_by_title(db, "warmup", limit=1)
+        db.execute(_claim_statement(0, "", TaskStatus.INPROGRESS))
+        db.rollback()
+
+    @staticmethod
+    def count_by_status_and_assignee(db: Session) -> List[Tuple[TaskStatus, Optional[str], int]]:
+        stmt = select(Todo.status, Todo.assignee, func.count()).group_by(Todo.status, Todo.assignee)
+        return [tuple(row) for row in db.execute(stmt)]
+
+class AsyncTodoRepository:
+    """
+    AsyncSession front for TodoRepository. Each call runs the sync query
+    code through `AsyncSession.run_sync`, so the SQL lives in one place and
+    the IO goes through the async driver without blocking the event loop.
+    """
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, task_id: int) -> Optional[Todo]:
+        return await db.run_sync(TodoRepository.get_by_id, task_id)
+
+    @staticmethod
+    async def save(db: AsyncSession, todo: Todo) -> Todo:
+        return await db.run_sync(TodoRepository.save, todo)
+
+    @staticmethod
+    async def list_page(db: AsyncSession, limit: int, **filters) -> list:
+        return await db.run_sync(TodoRepository.list_page, limit, **filters)
+
+    @staticmethod
+    async def list_by_status(db: AsyncSession, status: TaskStatus, limit: int, **paging) -> List[Todo]:
+        return await db.run_sync(TodoRepository.list_by_status, status, limit, **paging)
+
+    @staticmethod
+    async def list_by_assignee(db: AsyncSession, assignee: str, limit: int, **filters) -> List[Todo]:
+        return await db.run_sync(TodoRepository.list_by_assignee, assignee, limit, **filters)
+
+    @staticmethod
+    async def next_claimable(db: AsyncSession, limit: int = 1) -> List[Todo]:
+        return await db.run_sync(TodoRepository.next_claimable, limit)
+
+    @staticmethod
+    async def iter_batches(
+        db: AsyncSession,
+        batch_size: int,
+        status: Optional[TaskStatus] = None,
+        assignee: Optional[str] = None,
+    ) -> AsyncIterator[List[Todo]]:
+        # a generator cannot cross run_sync, so this one streams natively
+        stmt = _list_statement(status=status, assignee=assignee)
+        result = await db.stream_scalars(stmt.execution_options(yield_per=batch_size))
+        async for batch in result.partitions():
+            yield batch
+
+    @staticmethod
+    async def search_by_title(db: AsyncSession, title: str, **paging) -> list:
+        return await db.run_sync(TodoRepository.search_by_title, title, **paging)
+
+    @staticmethod
+    async def get_archived(db: AsyncSession, task_id: int) -> Optional[TodoArchive]:
+        return await db.run_sync(TodoRepository.get_archived, task_id)
+
+    @staticmethod
+    async def archive_completed(db: AsyncSession, cutoff: datetime, limit: int, after_id: int = 0) -> List[dict]:
+        return await db.run_sync(TodoRepository.archive_completed, cutoff, limit, after_id)
+
+    @staticmethod
+    async def update_assignee_and_status(
+        db: AsyncSession, task_id: int, assignee: str, status: TaskStatus
+    ) -> Optional[Todo]:
+        return await db.run_sync(
+            TodoRepository.update_assignee_and_status, task_id, assignee, status
+        )
+
+    @staticmethod
+    async def insert_many(db: AsyncSession, rows: Sequence[dict]) -> List[Todo]:
+        return await db.run_sync(TodoRepository.insert_many, rows)
+
+    @staticmethod
+    async def claim(
+        db: AsyncSession, task_id: int, assignee: str, status: TaskStatus
+    ) -> Optional[Todo]:
+        return await db.run_sync(TodoRepository.claim, task_id, assignee, status)
+
+    @staticmethod
+    async def claim_next(db: AsyncSession, assignee: str, status: TaskStatus) -> Optional[Todo]:
+        return await db.run_sync(TodoRepository.claim_next, assignee, status)
+
+    @staticmethod
+    async def claim_many(
+        db: AsyncSession, claims: Sequence[Tuple[int, str, TaskStatus]]
+    ) -> List[Optional[Todo]]:
+        return await db.run_sync(TodoRepository.claim_many, claims)
+
+    @staticmethod
+    async def existing_ids(db: AsyncSession, ids: Iterable[int]) -> Set[int]:
+        return await db.run_sync(TodoRepository.existing_ids, ids)
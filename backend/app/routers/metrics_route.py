@@ -0,0 +1,10 @@
+# app/routers/metrics_route.py
+from fastapi import APIRouter, Response
+
+from core.metrics import CONTENT_TYPE, registry
+
+router_metrics = APIRouter()
+
+@router_metrics.get("/metrics", tags=["metrics"], summary="Prometheus metrics")
+async def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -1,63 +1,318 @@
 # app/routers/todo_router.py
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from typing import Any, List, Literal, Optional, Sequence, Tuple, Type
+from fastapi import APIRouter, Body, Depends, HTTPException, status, BackgroundTasks, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from schemas.todo import TodoCreate, TodoClaim, TodoResponse
-from service.todo_service import TodoService
-from database.connection import get_db
+from models.todo import TaskStatus
+from schemas.todo import (
+    BulkItemError,
+    TodoBulkClaim,
+    TodoBulkClaimResult,
+    TodoBulkCreateResult,
+    TodoClaim,
+    TodoCreate,
+    TaskStatsResponse,
+    TodoResponse,
+    TodoUploadResult,
+)
+from service.todo_service import AsyncTodoService, TaskConflictError
+from database.async_connection import get_async_db
 from core.ConnectionManager import manager
-from fastapi.encoders import jsonable_encoder
+from core.cache import CacheEntry, etag_matches
+from core.config import settings
+from core.ndjson import NDJSON_MEDIA_TYPE, LineTooLong, iter_lines
+from core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from core.serialization import (
+    JSONBytesResponse,
+    array_chunks,
+    dump_each,
+    dump_json,
+    dump_task,
+    join_array,
+    ndjson_chunks,
+    task_event,
+    tasks_event,
+)
+from service.claim_queue import claim_next
+from service.task_cache import CachedTaskService, apply_write, task_cache
+from service.task_stats import task_stats
 
 router = APIRouter(prefix="", tags=["tasks"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PROJECTABLE_FIELDS = frozenset(TodoResponse.model_fields)
+
+def cached_response(request: Request, entry: CacheEntry) -> Response:
+    """Serve cached bytes, or 304 when the client already has them."""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if entry.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = entry.next_cursor
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return JSONBytesResponse(entry.body, headers=headers)
+
+def validate_items(
+    items: Sequence[Any], model: Type[BaseModel]
+) -> Tuple[List[Tuple[int, BaseModel]], List[BulkItemError]]:
+    """Validate each item on its own so one bad row does not sink the batch."""
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(413, f"At most {settings.bulk_max_items} items per request")
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, model.model_validate(item)))
+        except ValidationError as exc:
+            item_id = item.get("id") if isinstance(item, dict) else None
+            errors.append(BulkItemError(
+                index=index,
+                id=item_id if isinstance(item_id, int) else None,
+                detail=exc.errors(include_url=False, include_context=False),
+            ))
+    return valid, errors
+
+def batch_events(kind: str, tasks: Sequence[bytes]) -> List[str]:
+    """One coalesced event per `bulk_batch_size` already serialized tasks."""
+    size = settings.bulk_batch_size
+    return [tasks_event(kind, tasks[i:i + size]) for i in range(0, len(tasks), size)]
+
 @router.get("/", response_model=List[TodoResponse])
-def list_tasks(db: Session = Depends(get_db)):
-    return TodoService.get_all_tasks(db)
+async def list_tasks(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    assignee: Optional[str] = Query(None, max_length=100),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of task fields"),
+    include_archived: bool = Query(False, description="Merge in archived (completed) tasks"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    selected = None
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = set(selected) - PROJECTABLE_FIELDS
+        if unknown:
+            raise HTTPException(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+    try:
+        entry = await CachedTaskService.list_tasks(
+            db, limit, cursor=cursor, status=task_status, assignee=assignee, fields=selected,
+            include_archived=include_archived,
+        )
+    except InvalidCursor:
+        raise HTTPException(400, "Invalid cursor")
+    return cached_response(request, entry)
 
 @router.post("/", response_model=TodoResponse, status_code=201)
 async def create_task(
     payload: TodoCreate,
     background: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
-    todo = TodoService.create_task(db, payload)
-    event = {
-        "type": "task_created",
-        "task": TodoResponse.from_orm(todo).dict()
-    }
-    # convert enums, datetimes, etc → plain JSON
-    serializable_event = jsonable_encoder(event)
-    background.add_task(manager.broadcast, serializable_event)
-    return todo
+    db: AsyncSession = Depends(get_async_db)
+):
+    todo = await AsyncTodoService.create_task(db, payload)
+    # serialized once: the same bytes are the response and the event
+    body = dump_task(todo)
+    # evict local cache entries now; other workers do on delivery
+    apply_write("task_created", [todo])
+    background.add_task(manager.broadcast, task_event("task_created", body))
+    return JSONBytesResponse(body, status_code=201)
 
 @router.put("/{task_id}/claim", response_model=TodoResponse)
 async def claim_task(
     task_id: int,
     payload: TodoClaim,
     background: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    todo = TodoService.claim_task(db, task_id, payload)
+    try:
+        todo = await AsyncTodoService.claim_task(db, task_id, payload)
+    except TaskConflictError as exc:
+        raise HTTPException(409, str(exc))
     if not todo:
-        raise HTTPException(404, "Not found or already claimed")
-    event = {
-        "type": "task_updated",
-        "task": TodoResponse.from_orm(todo).dict()
-    }
-    serializable_event = jsonable_encoder(event)
-    background.add_task(manager.broadcast, serializable_event)
-    return todo
+        raise HTTPException(404, "Not found")
+    body = dump_task(todo)
+    apply_write("task_updated", [todo])
+    background.add_task(manager.broadcast, task_event("task_updated", body))
+    return JSONBytesResponse(body)
+
+@router.post(
+    "/claim-next",
+    response_model=TodoResponse,
+    responses={204: {"description": "No TODO task appeared within `wait` seconds"}},
+)
+async def claim_next_task(
+    payload: TodoClaim,
+    background: BackgroundTasks,
+    # the upper bound is checked below, not declared here: the pre-built
+    # openapi.json must not depend on this worker's settings
+    wait: float = Query(0, ge=0, description="Seconds to wait for a task when none is "
+                                             "claimable, at most CLAIM_WAIT_MAX"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Claim the oldest TODO task for `assignee`, whichever it is: workers
+    need not list tasks and race for the same id. 204 when there is none.
+    """
+    if wait > settings.claim_wait_max:
+        raise HTTPException(422, f"wait may be at most {settings.claim_wait_max} seconds")
+    todo = await claim_next(db, payload, wait=wait, poll_interval=settings.claim_poll_interval)
+    if todo is None:
+        return Response(status_code=204)
+    body = dump_task(todo)
+    apply_write("task_updated", [todo])
+    background.add_task(manager.broadcast, task_event("task_updated", body))
+    return JSONBytesResponse(body)
+
+@router.post("/bulk", response_model=TodoBulkCreateResult)
+async def create_tasks_bulk(
+    background: BackgroundTasks,
+    items: List[Any] = Body(..., description="TodoCreate objects"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create many tasks in one transaction; invalid items are reported, not fatal."""
+    valid, errors = validate_items(items, TodoCreate)
+    todos = await AsyncTodoService.create_tasks(db, [item for _, item in valid]) if valid else []
+    tasks = dump_each(todos)
+    apply_write("task_created", todos)
+    for event in batch_events("tasks_created", tasks):
+        background.add_task(manager.broadcast, event)
+    return JSONBytesResponse(
+        b'{"created":' + join_array(tasks) + b',"errors":' + dump_json(errors) + b"}"
+    )
+
+@router.post(
+    "/bulk/ndjson",
+    response_model=TodoUploadResult,
+    openapi_extra={"requestBody": {"content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}}}},
+)
+async def upload_tasks_ndjson(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Streaming import: one TodoCreate JSON object per line, written in
+    transactions of `bulk_batch_size` rows as the body arrives. A line over
+    `bulk_max_line_bytes`, or more than `bulk_upload_max_items` lines, ends
+    the upload with a 413; the tasks before that point stay created.
+    """
+    ids: List[int] = []
+    errors: List[BulkItemError] = []
+    errors_truncated = False
+    batch: List[TodoCreate] = []
+
+    async def flush():
+        todos = await AsyncTodoService.create_tasks(db, batch)
+        ids.extend(t.id for t in todos)
+        batch.clear()
+        apply_write("task_created", todos)
+        for event in batch_events("tasks_created", dump_each(todos)):
+            # published as we go: an import can run for a while
+            await manager.broadcast(event)
+
+    async def reject(reason: str):
+        if batch:
+            await flush()
+        raise HTTPException(413, f"{reason}; the {len(ids)} tasks before it were created")
+
+    index = -1
+    try:
+        async for line in iter_lines(request.stream(), max_line=settings.bulk_max_line_bytes):
+            index += 1
+            if index >= settings.bulk_upload_max_items:
+                await reject(f"At most {settings.bulk_upload_max_items} lines per upload")
+            if not line.strip():
+                continue
+            try:
+                batch.append(TodoCreate.model_validate_json(line))
+            except ValidationError as exc:
+                if len(errors) < settings.bulk_max_errors:
+                    errors.append(BulkItemError(
+                        index=index, detail=exc.errors(include_url=False, include_context=False)
+                    ))
+                else:
+                    errors_truncated = True
+                continue
+            if len(batch) >= settings.bulk_batch_size:
+                await flush()
+    except LineTooLong as exc:
+        await reject(f"Line {index + 2} is {exc}")
+    if batch:
+        await flush()
+    return {"created": len(ids), "ids": ids, "errors": errors, "errors_truncated": errors_truncated}
+
+@router.put("/claim/bulk", response_model=TodoBulkClaimResult)
+async def claim_tasks_bulk(
+    background: BackgroundTasks,
+    claims: List[Any] = Body(..., description="TodoBulkClaim objects: id, assignee, status"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Claim many tasks in one transaction. Claims of missing or already
+    claimed tasks are reported per item; the rest still apply.
+    """
+    valid, errors = validate_items(claims, TodoBulkClaim)
+    claimed = []
+    if valid:
+        claimed, failures = await AsyncTodoService.claim_tasks(db, [claim for _, claim in valid])
+        errors += [BulkItemError(index=valid[i][0], id=task_id, detail=reason) for i, task_id, reason in failures]
+    tasks = dump_each(claimed)
+    apply_write("task_updated", claimed)
+    for event in batch_events("tasks_updated", tasks):
+        background.add_task(manager.broadcast, event)
+    errors.sort(key=lambda e: e.index)
+    return JSONBytesResponse(
+        b'{"claimed":' + join_array(tasks) + b',"errors":' + dump_json(errors) + b"}"
+    )
 
 @router.get("/search", response_model=List[TodoResponse], summary="Search tasks by title")
 @router.get("/search/", response_model=List[TodoResponse], summary="Search tasks by title (with trailing slash)")
-def search_tasks(
-    title: str,
-    db: Session = Depends(get_db),
+async def search_tasks(
+    request: Request,
+    title: str = Query(..., max_length=255),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    include_archived: bool = Query(False, description="Archived matches follow the live ones"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    try:
-        results = TodoService.search_tasks_by_title(db, title)
-        return results
-    except Exception as e:
-        # Return empty list on error instead of propagating the exception
-        return []
\ No newline at end of file
+    entry = await CachedTaskService.search_tasks_by_title(
+        db, title, limit=limit, offset=offset, include_archived=include_archived
+    )
+    return cached_response(request, entry)
+
+@router.get(
+    "/export",
+    summary="Stream every task as NDJSON or a chunked JSON array",
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, "application/json": {}}}},
+)
+async def export_tasks(
+    format: Literal["ndjson", "json"] = Query("ndjson"),
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    assignee: Optional[str] = Query(None, max_length=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    The whole (filtered) table in one response, read through a streaming
+    cursor and sent `stream_batch_size` tasks at a time, so memory stays
+    flat however many rows there are. Reads one consistent snapshot.
+    """
+    batches = AsyncTodoService.stream_tasks(
+        db, settings.stream_batch_size, status=task_status, assignee=assignee
+    )
+    serialized = (dump_each(batch) async for batch in batches)
+    if format == "json":
+        return StreamingResponse(array_chunks(serialized), media_type="application/json")
+    return StreamingResponse(ndjson_chunks(serialized), media_type=NDJSON_MEDIA_TYPE)
+
+@router.get("/stats", response_model=TaskStatsResponse, summary="Task counts per status and assignee")
+async def task_counts():
+    """Served from in-memory counters: constant time however large the table."""
+    return task_stats.snapshot()
+
+@router.get("/cache/stats", summary="Response cache hit/miss/eviction counters")
+async def cache_stats():
+    return task_cache.stats()
+
+# declared last so it never shadows /search, /export or the stats routes
+@router.get("/{task_id}", response_model=TodoResponse)
+async def get_task(request: Request, task_id: int, db: AsyncSession = Depends(get_async_db)):
+    entry = await CachedTaskService.get_task(db, task_id)
+    if entry is None:
+        raise HTTPException(404, "Not found")
+    return cached_response(request, entry)
\ No newline at end of file
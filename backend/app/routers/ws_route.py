@@ -1,33 +1,190 @@
 # app/routers/ws_router.py
-from fastapi import APIRouter, WebSocket, Depends
-from sqlalchemy.orm import Session
-from fastapi.encoders import jsonable_encoder
+import itertools
+import json
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, WebSocket
 
-from database.connection import get_db
-from schemas.todo import TodoResponse
-from service.todo_service import TodoService
-from core.ConnectionManager import manager
+from core.config import settings
+from core.serialization import dump_tasks
+from core.subscriptions import EVERYTHING, Subscription, narrow_all
+from database.async_connection import AsyncSessionLocal
+from models.todo import TaskStatus
+from service.task_cache import CachedTaskService
+from service.todo_service import AsyncTodoService
+from core.ConnectionManager import encode_message, manager
 
 router_ws = APIRouter()
 
+# close code for a query-string filter that does not parse ("policy violation")
+INVALID_FILTER_CLOSE_CODE = 1008
+
+# snapshots/resyncs sent in a row before a socket whose buffer keeps
+# overflowing while they are written is dropped as a slow consumer
+CATCH_UP_ATTEMPTS = 3
+
+async def send_resync(ws: WebSocket, since: int, missed: List[str]) -> int:
+    """Header frame, then the missed events exactly as they were broadcast."""
+    seq = manager.events.last_seq
+    await ws.send_json({
+        "type": "resync",
+        "epoch": manager.events.epoch,
+        "since": since,
+        "seq": seq,
+        "count": len(missed),
+    })
+    for payload in missed:
+        await ws.send_text(payload)
+    return seq
+
+async def catch_up(
+    ws: WebSocket, subscription: Subscription, since: Optional[int] = None, epoch: Optional[str] = None
+) -> bool:
+    """
+    Bring a paused socket up to date: only the events after `since` when
+    the replay buffer still has them, otherwise a paged snapshot. Events
+    that overflow its buffer meanwhile are not dropped; the socket is
+    caught up again from the seq just sent. Returns False (and evicts the
+    socket) when it never catches up.
+    """
+    for _ in range(CATCH_UP_ATTEMPTS):
+        manager.restart(ws)
+        missed = manager.events.since(since, epoch) if since is not None else None
+        if missed is not None:
+            since = await send_resync(ws, since, narrow_all(missed, subscription))
+        else:
+            since = await send_snapshot(ws, subscription)
+        if not manager.lagging(ws):
+            return True
+        epoch = manager.events.epoch
+    manager.evict(ws)
+    return False
+
+async def snapshot_pages(subscription: Subscription) -> AsyncIterator[bytes]:
+    """
+    Serialized task pages covering `subscription`. An ids filter is one
+    lookup; otherwise one keyset walk per (status, assignee) pair it
+    names, through the response cache like GET /tasks.
+    """
+    if subscription.ids:
+        async with AsyncSessionLocal() as db:
+            todos = await AsyncTodoService.get_tasks(db, sorted(subscription.ids))
+        yield dump_tasks([
+            t for t in todos
+            if subscription.matches({"id": t.id, "status": t.status.value, "assignee": t.assignee})
+        ])
+        return
+    statuses = sorted(subscription.status) or [None]
+    assignees = sorted(subscription.assignee) or [None]
+    for status_value, assignee in itertools.product(statuses, assignees):
+        cursor = None
+        while True:
+            # a short-lived session per page, never held across sends; pages
+            # come from the response cache when nothing has invalidated them
+            async with AsyncSessionLocal() as db:
+                entry = await CachedTaskService.list_tasks(
+                    db, settings.snapshot_page_size, cursor=cursor,
+                    status=TaskStatus(status_value) if status_value else None, assignee=assignee,
+                )
+            yield entry.body
+            cursor = entry.next_cursor
+            if cursor is None:
+                break
+
+async def send_snapshot(ws: WebSocket, subscription: Subscription = EVERYTHING) -> int:
+    """
+    Full state in pages: a `snapshot` frame carrying the seq it is current
+    as of (returned), then `snapshot_page` frames until `more` is false.
+    Events after that seq follow once the snapshot is out; apply them by
+    task id. A filtered snapshot holds only the subscribed tasks and
+    echoes the filter back as `filter`.
+    """
+    seq = manager.events.last_seq
+    frame = {"type": "snapshot", "epoch": manager.events.epoch, "seq": seq}
+    if not subscription.everything:
+        frame["filter"] = subscription.describe()
+    body = None
+    # one page of lookahead, so the frame before the last knows more=false
+    async for page in snapshot_pages(subscription):
+        if page == b"[]":
+            continue
+        if body is not None:
+            await send_page(ws, frame, body, more=True)
+            frame = {"type": "snapshot_page"}
+        body = page
+    await send_page(ws, frame, body or b"[]", more=False)
+    return seq
+
+async def send_page(ws: WebSocket, frame: dict, body: bytes, more: bool):
+    # splice the serialized page in as `tasks` instead of re-serializing it
+    frame = {**frame, "more": more}
+    await ws.send_text(f'{encode_message(frame)[:-1]},"tasks":{body.decode()}}}')
+
+def parse_subscription(message: dict) -> Subscription:
+    return Subscription.parse(
+        message.get("status"), message.get("assignee"), message.get("ids"),
+        max_values=settings.ws_subscription_max_values,
+    )
+
+async def handle_message(ws: WebSocket, text: str):
+    """
+    `{"type": "subscribe", "status": [...], "assignee": [...], "ids": [...]}`
+    replaces the socket's filter and answers with a snapshot of it; an
+    empty subscribe goes back to every task. Anything else gets an error.
+    """
+    try:
+        message = json.loads(text)
+        if not isinstance(message, dict) or message.get("type") != "subscribe":
+            raise ValueError("expected a subscribe message")
+        subscription = parse_subscription(message)
+    except ValueError as exc:
+        async with manager.hold(ws):
+            await ws.send_json({"type": "error", "detail": str(exc)})
+        return
+    # the writer pauses meanwhile; events routed under the new filter
+    # queue up behind the snapshot, as on connect
+    async with manager.hold(ws):
+        manager.subscribe(ws, subscription)
+        await catch_up(ws, subscription)
+
 @router_ws.websocket("/ws/tasks")
-async def ws_tasks(ws: WebSocket, db: Session = Depends(get_db)):
-    # 1) accept & track
-    await manager.connect(ws)
-
-    # 2) send initial snapshot
-    todos = TodoService.get_all_tasks(db)
-    snapshot = {
-        "type": "snapshot",
-        "tasks": [TodoResponse.from_orm(t).dict() for t in todos]
-    }
-    serializable = jsonable_encoder(snapshot)
-    await ws.send_json(serializable)
-
-    # 3) then just keep the connection open
+async def ws_tasks(
+    ws: WebSocket,
+    since: Optional[int] = None,
+    epoch: Optional[str] = None,
+    status: Optional[str] = None,
+    assignee: Optional[str] = None,
+    ids: Optional[str] = None,
+):
+    # 0) an initial filter may come in the query string (comma-separated),
+    #    so the first snapshot or resync is already narrowed
+    try:
+        subscription = parse_subscription({"status": status, "assignee": assignee, "ids": ids})
+    except ValueError:
+        await ws.close(code=INVALID_FILTER_CLOSE_CODE)
+        return
+
+    # 1) accept & track; broadcasts are buffered until the client has caught up
+    await manager.connect(ws, paused=True, subscription=subscription)
+
+    # 2) catch up: only the missed events when the replay buffer still has
+    #    them, otherwise a paged snapshot
+    try:
+        if not await catch_up(ws, subscription, since, epoch):
+            return
+    except Exception:
+        manager.disconnect(ws)
+        return
+    manager.release(ws)
+
+    # 3) then serve subscription changes until the client goes away
     try:
         while True:
-            # ignore incoming—this socket is read-only from the client side
-            await ws.receive_text()
+            await handle_message(ws, await ws.receive_text())
     except Exception:
-        manager.disconnect(ws)
\ No newline at end of file
+        manager.disconnect(ws)
+
+
+@router_ws.get("/ws/metrics", tags=["websocket"])
+async def ws_metrics():
+    """Fan-out health: socket count, outbound queue depth, drops."""
+    return manager.metrics()
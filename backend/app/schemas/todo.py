@@ -1,6 +1,6 @@
 # app/schemas/todo.py
 from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from models.todo import TaskStatus
 
@@ -22,4 +22,35 @@ class TodoResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class TodoBulkClaim(TodoClaim):
+    id: int
+
+class BulkItemError(BaseModel):
+    index: int  # position in the request (line number - 1 for NDJSON)
+    id: Optional[int] = None
+    detail: Any
+
+class TodoBulkCreateResult(BaseModel):
+    created: List[TodoResponse]
+    errors: List[BulkItemError]
+
+class TodoBulkClaimResult(BaseModel):
+    claimed: List[TodoResponse]
+    errors: List[BulkItemError]
+
+class TodoUploadResult(BaseModel):
+    created: int
+    ids: List[int]
+    errors: List[BulkItemError]
+    # more lines failed than bulk_max_errors; only the first are listed
+    errors_truncated: bool = False
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    # claimed tasks (inprogress / completed) per assignee
+    by_assignee: Dict[str, Dict[str, int]]
+    # unix time of the last GROUP BY reconciliation
+    reconciled_at: Optional[float] = None
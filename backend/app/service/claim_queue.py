@@ -0,0 +1,116 @@
+# app/service/claim_queue.py
+"""
+Long-polling for POST /tasks/claim-next?wait=N: hold a worker's request
+until a task it can claim appears, instead of having it poll.
+
+Waiters queue in arrival order. Every task_created / tasks_created event
+this worker delivers (its own writes and, through the backplane, every
+other worker's) wakes as many of the longest-waiting requests as tasks
+were created, and those retry the claim. Waking one waiter per task
+rather than all of them keeps a burst of idle workers from turning one
+new task into a burst of failed UPDATEs. A waiter that still finds
+nothing (another worker got there first) queues again at the back; one
+that leaves with a wake-up it did not use passes it on.
+
+Waiters also retry every `claim_poll_interval` seconds, which bounds the
+wait when an event never arrives (e.g. tasks written outside the API, or
+several workers on the memory backplane).
+"""
+import asyncio
+import json
+from collections import deque
+from typing import Deque, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.todo import Todo
+from schemas.todo import TodoClaim
+from service.todo_service import AsyncTodoService
+
+CREATED_EVENTS = ('"type":"task_created"', '"type":"tasks_created"')
+
+
+class WorkSignal:
+    def __init__(self):
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.wakeups = 0
+
+    def ticket(self) -> asyncio.Future:
+        """
+        Queue up before looking for work, so a task created between the
+        look and the wait still wakes this waiter.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return waiter
+
+    def release(self, waiter: asyncio.Future) -> None:
+        """Leave the queue; a wake-up the waiter did not use goes to the next."""
+        if waiter.done():
+            self.notify()
+            return
+        waiter.cancel()
+        self._waiters.remove(waiter)
+
+    def notify(self, n: int = 1) -> None:
+        """Wake the `n` longest-waiting requests."""
+        while n > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.wakeups += 1
+                n -= 1
+
+    @staticmethod
+    async def wait(waiter: asyncio.Future, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def metrics(self) -> dict:
+        return {"waiting": len(self._waiters), "wakeups": self.wakeups}
+
+
+work_signal = WorkSignal()
+
+
+def on_delivered(payload: str) -> None:
+    """ConnectionManager listener: new tasks wake that many waiters."""
+    if not any(marker in payload for marker in CREATED_EVENTS):
+        return
+    event = json.loads(payload)
+    if event.get("type") == "tasks_created":
+        work_signal.notify(len(event.get("tasks") or ()))
+    elif event.get("type") == "task_created":
+        work_signal.notify()
+
+
+async def claim_next(
+    db: AsyncSession,
+    data: TodoClaim,
+    wait: float = 0.0,
+    poll_interval: float = 1.0,
+    signal: WorkSignal = work_signal,
+) -> Optional[Todo]:
+    """Claim the oldest TODO task, waiting up to `wait` seconds for one."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    waiter = None
+    try:
+        while True:
+            if wait > 0 and waiter is None:
+                waiter = signal.ticket()
+            todo = await AsyncTodoService.claim_next(db, data)
+            remaining = deadline - loop.time()
+            if todo is not None or remaining <= 0:
+                return todo
+            if not waiter.done():
+                await signal.wait(waiter, min(remaining, poll_interval))
+            if waiter.done():
+                # woken: the next attempt uses the wake-up, so queue again;
+                # on a poll timeout the waiter keeps its place
+                waiter = None
+    finally:
+        if waiter is not None:
+            signal.release(waiter)
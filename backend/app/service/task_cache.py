@@ -0,0 +1,193 @@
+# app/service/task_cache.py
+"""
+Read-through caching for task listings, search and lookups by id.
+
+Responses are cached serialized, keyed by the query. Each entry records
+what it was built from, and the task_created / task_updated events that
+every write already broadcasts evict exactly the entries they touch:
+
+- a list page covers ids (after, last] under its status/assignee
+  filters; a new task (highest id so far) only lands on last pages, a
+  claim only touches pages whose range holds the task's id
+- search results are ranked, so any new task may enter any of them; a
+  claim evicts the results that contain the task
+- a task by id is evicted when that task changes
+
+Bulk writes broadcast one tasks_created / tasks_updated event per batch,
+applied task by task; so does the archiver (tasks_archived, evicting like
+an update). Stats events change no task and are ignored;
+events of any other type clear the whole cache. Entries also expire
+after `cache_ttl` seconds, which bounds staleness should an event never
+arrive (e.g. writes on a worker without a shared backplane).
+"""
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import CacheEntry, ResponseCache
+from core.config import settings
+from core.pagination import decode_cursor
+from core.serialization import dump_json, dump_task, dump_tasks
+from models.todo import TaskStatus
+from repositories.todo import AsyncTodoRepository
+from service.todo_service import AsyncTodoService
+
+
+@dataclass(frozen=True)
+class ListScope:
+    status: Optional[str]
+    assignee: Optional[str]
+    after: int
+    last: Optional[int]  # None: last page, open-ended
+
+    def affected_by(self, kind: str, task: dict) -> bool:
+        if kind == "task_created":
+            return self.last is None and self._may_hold(task)
+        in_range = task["id"] > self.after and (self.last is None or task["id"] <= self.last)
+        # claims move a task out of todo into its new status; the previous
+        # assignee is not in the event, so any assignee filter may be hit
+        return in_range and self.status in (None, TaskStatus.TODO.value, task["status"])
+
+    def _may_hold(self, task: dict) -> bool:
+        return (self.status in (None, task["status"])
+                and self.assignee in (None, task["assignee"]))
+
+
+@dataclass(frozen=True)
+class SearchScope:
+    ids: frozenset
+
+    def affected_by(self, kind: str, task: dict) -> bool:
+        return kind == "task_created" or task["id"] in self.ids
+
+
+@dataclass(frozen=True)
+class TaskScope:
+    id: int
+
+    def affected_by(self, kind: str, task: dict) -> bool:
+        return kind != "task_created" and task["id"] == self.id
+
+
+TASK_EVENTS = ("task_created", "task_updated")
+# coalesced bulk events carry a list of tasks under "tasks"; archived tasks
+# leave the live listings much as an update out of their status would
+BATCH_EVENTS = {
+    "tasks_created": "task_created",
+    "tasks_updated": "task_updated",
+    "tasks_archived": "task_updated",
+}
+# counters only (service/task_stats.py): nothing cached depends on them
+NEUTRAL_EVENTS = ("stats", "stats_delta")
+
+task_cache = ResponseCache(
+    max_bytes=settings.cache_max_bytes,
+    ttl=settings.cache_ttl,
+    enabled=settings.cache_enabled,
+)
+
+
+def apply_event(event: dict, cache: ResponseCache = task_cache) -> int:
+    """Evict what a broadcast event makes stale; returns the number evicted."""
+    kind = event.get("type")
+    if kind in BATCH_EVENTS and isinstance(event.get("tasks"), list):
+        kind, tasks = BATCH_EVENTS[kind], event["tasks"]
+    elif kind in TASK_EVENTS and isinstance(event.get("task"), dict):
+        tasks = [event["task"]]
+    elif kind in NEUTRAL_EVENTS:
+        return 0
+    else:
+        before = len(cache)
+        cache.clear()
+        return before
+    return _invalidate(kind, tasks, cache)
+
+
+def apply_write(kind: str, todos: Sequence[Any], cache: ResponseCache = task_cache) -> int:
+    """Same as apply_event, straight from the written ORM rows."""
+    tasks = [{"id": t.id, "status": t.status.value, "assignee": t.assignee} for t in todos]
+    return _invalidate(kind, tasks, cache)
+
+
+def _invalidate(kind: str, tasks: List[dict], cache: ResponseCache) -> int:
+    return cache.invalidate(lambda scope: any(scope.affected_by(kind, t) for t in tasks))
+
+
+def on_delivered(payload: str) -> None:
+    """ConnectionManager listener: invalidate on events from every worker."""
+    apply_event(json.loads(payload))
+
+
+class CachedTaskService:
+    """
+    Read paths of AsyncTodoService behind `task_cache`. Results come back
+    as CacheEntry (body bytes, ETag, next cursor) whether or not they hit.
+    """
+
+    @staticmethod
+    async def list_tasks(
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+        assignee: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        include_archived: bool = False,
+        cache: ResponseCache = task_cache,
+    ) -> CacheEntry:
+        status_value = status.value if status else None
+        key = ("list", limit, cursor, status_value, assignee, tuple(fields or ()), include_archived)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        version = cache.version
+        rows, next_cursor = await AsyncTodoService.list_tasks(
+            db, limit, cursor=cursor, status=status, assignee=assignee, fields=fields,
+            include_archived=include_archived,
+        )
+        if fields:
+            body = dump_json(rows)
+            last = rows[-1]["id"] if rows else None
+        else:
+            body = dump_tasks(rows)
+            last = rows[-1].id if rows else None
+        scope = ListScope(
+            status_value, assignee, decode_cursor(cursor) or 0, last if next_cursor else None
+        )
+        return cache.put(key, body, next_cursor, scope, version)
+
+    @staticmethod
+    async def search_tasks_by_title(
+        db: AsyncSession, title: str, limit: int, offset: int = 0,
+        include_archived: bool = False,
+        cache: ResponseCache = task_cache,
+    ) -> CacheEntry:
+        key = ("search", title, limit, offset, include_archived)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        version = cache.version
+        todos = await AsyncTodoService.search_tasks_by_title(
+            db, title, limit=limit, offset=offset, include_archived=include_archived
+        )
+        scope = SearchScope(frozenset(t.id for t in todos))
+        return cache.put(key, dump_tasks(todos), None, scope, version)
+
+    @staticmethod
+    async def get_task(
+        db: AsyncSession, task_id: int, cache: ResponseCache = task_cache
+    ) -> Optional[CacheEntry]:
+        key = ("task", task_id)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        version = cache.version
+        todo = await AsyncTodoRepository.get_by_id(db, task_id)
+        if todo is None:
+            # an archived task is still found by id
+            todo = await AsyncTodoRepository.get_archived(db, task_id)
+        if todo is None:
+            return None
+        return cache.put(key, dump_task(todo), None, TaskScope(task_id), version)
@@ -0,0 +1,225 @@
+# app/service/task_stats.py
+"""
+Board counters: tasks per status and claimed work per assignee, kept in
+memory so GET /tasks/stats never touches the table.
+
+TodoService bumps the counters as it writes (a create adds a TODO; a
+claim moves one TODO into the claimed status under the new assignee).
+Assignee workloads count claimed tasks only (inprogress / completed):
+the atomic claim does not read the row first, so a TODO task's previous
+assignee is unknown at claim time, and unclaimed work is nobody's load.
+The counts cover the live `todos` table: archived tasks
+(service/archive.py) leave them, as they leave the board.
+
+Each worker's changes are coalesced and published every
+`stats_push_interval` as one `stats_delta` event, which browsers apply
+and the other workers fold into their own counters. Stats events carry
+no seq (ConnectionManager.publish): they are not replayed on resync,
+where the client refetches GET /tasks/stats instead. Every
+`stats_reconcile_interval` a GROUP BY replaces the counters with the
+database's truth (catching writes that bypass the service), and a full
+`stats` event goes out if that changed anything.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from models.todo import TaskStatus, Todo
+from repositories.todo import TodoRepository
+
+logger = logging.getLogger(__name__)
+
+# tells this worker's own deltas apart once the backplane echoes them back
+WORKER_ID = uuid.uuid4().hex[:12]
+STATS_EVENTS = ('"type":"stats"', '"type":"stats_delta"')
+
+TODO = TaskStatus.TODO.value
+
+
+class TaskStats:
+    def __init__(self):
+        self.by_status: Counter = Counter()
+        self.by_assignee: Dict[str, Counter] = {}
+        self.reconciled_at: Optional[float] = None
+        # changes made by this worker since the last take_delta()
+        self._pending_status: Counter = Counter()
+        self._pending_assignee: Dict[str, Counter] = {}
+
+    def created(self, todos: Iterable[Todo]) -> None:
+        for todo in todos:
+            self._add(todo.status.value, None, 1)
+
+    def claimed(self, todos: Iterable[Todo]) -> None:
+        for todo in todos:
+            self._add(TODO, None, -1)
+            self._add(todo.status.value, todo.assignee, 1)
+
+    def archived(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            self._add(TaskStatus(row["status"]).value, row["assignee"], -1)
+
+    def _add(self, status: str, assignee: Optional[str], n: int) -> None:
+        _bump(self.by_status, self.by_assignee, status, assignee, n)
+        _bump(self._pending_status, self._pending_assignee, status, assignee, n)
+
+    def take_delta(self) -> Optional[dict]:
+        """This worker's unpublished changes as a `stats_delta` body, or None."""
+        status = {k: v for k, v in self._pending_status.items() if v}
+        assignee = {
+            name: {k: v for k, v in counts.items() if v}
+            for name, counts in self._pending_assignee.items() if any(counts.values())
+        }
+        self._pending_status, self._pending_assignee = Counter(), {}
+        if not status and not assignee:
+            return None
+        return {"by_status": status, "by_assignee": assignee}
+
+    def apply_delta(self, by_status: Dict[str, int], by_assignee: Dict[str, Dict[str, int]]) -> None:
+        """Fold in another worker's changes (never re-published)."""
+        _merge(self.by_status, self.by_assignee, by_status, by_assignee)
+
+    def replace(self, by_status: Dict[str, int], by_assignee: Dict[str, Dict[str, int]]) -> bool:
+        """Reset to the given counts; True if anything differed."""
+        by_status, by_assignee = _merge(Counter(), {}, by_status, by_assignee)
+        changed = (by_status, by_assignee) != (self.by_status, self.by_assignee)
+        self.by_status, self.by_assignee = by_status, by_assignee
+        self.reconciled_at = time.time()
+        return changed
+
+    def snapshot(self) -> dict:
+        return {
+            "total": sum(self.by_status.values()),
+            "by_status": {s.value: self.by_status.get(s.value, 0) for s in TaskStatus},
+            "by_assignee": {name: dict(counts) for name, counts in sorted(self.by_assignee.items())},
+            "reconciled_at": self.reconciled_at,
+        }
+
+
+def _bump(by_status: Counter, by_assignee: Dict[str, Counter], status: str,
+          assignee: Optional[str], n: int) -> None:
+    by_status[status] += n
+    if not by_status[status]:
+        del by_status[status]
+    if assignee is None or status == TODO:
+        return
+    counts = by_assignee.setdefault(assignee, Counter())
+    counts[status] += n
+    if not counts[status]:
+        del counts[status]
+        if not counts:
+            del by_assignee[assignee]
+
+
+def _merge(by_status: Counter, by_assignee: Dict[str, Counter],
+           status_counts: Dict[str, int], assignee_counts: Dict[str, Dict[str, int]]):
+    for status, n in status_counts.items():
+        _bump(by_status, by_assignee, status, None, n)
+    for name, counts in assignee_counts.items():
+        for status, n in counts.items():
+            _bump(Counter(), by_assignee, status, name, n)
+    return by_status, by_assignee
+
+
+def counts_from_rows(rows: Iterable[Tuple[TaskStatus, Optional[str], int]]):
+    """(status, assignee, count) GROUP BY rows -> (by_status, by_assignee)."""
+    by_status: Counter = Counter()
+    by_assignee: Dict[str, Counter] = {}
+    for status, assignee, count in rows:
+        _bump(by_status, by_assignee, TaskStatus(status).value, assignee, count)
+    return by_status, by_assignee
+
+
+task_stats = TaskStats()
+
+
+def apply_stats_event(event: dict, stats: TaskStats = task_stats) -> None:
+    if event.get("type") == "stats":
+        stats.replace(event["by_status"], event["by_assignee"])
+    elif event.get("type") == "stats_delta" and event.get("worker") != WORKER_ID:
+        stats.apply_delta(event["by_status"], event["by_assignee"])
+
+
+def on_delivered(payload: str) -> None:
+    """ConnectionManager listener: pick up other workers' stats events."""
+    if any(marker in payload for marker in STATS_EVENTS):
+        apply_stats_event(json.loads(payload))
+
+
+class StatsPublisher:
+    """
+    Background loop: publish coalesced deltas every `push_interval` and
+    reconcile against the database every `reconcile_interval`.
+    """
+
+    def __init__(
+        self,
+        broadcast: Callable[[dict], Awaitable[None]],
+        session_factory,
+        stats: TaskStats = task_stats,
+        push_interval: float = 0.5,
+        reconcile_interval: float = 60.0,
+    ):
+        self.broadcast = broadcast
+        self.session_factory = session_factory
+        self.stats = stats
+        self.push_interval = push_interval
+        self.reconcile_interval = reconcile_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Keep the counters current. The first reconcile loads them in the
+        background: a full-table GROUP BY must not hold up startup, and
+        until it lands `reconciled_at` is None.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self) -> None:
+        delta = self.stats.take_delta()
+        if delta is not None:
+            await self.broadcast({"type": "stats_delta", "worker": WORKER_ID, **delta})
+
+    async def reconcile(self, publish: bool = True) -> None:
+        async with self.session_factory() as db:
+            rows = await db.run_sync(TodoRepository.count_by_status_and_assignee)
+        changed = self.stats.replace(*counts_from_rows(rows))
+        # deltas still pending are already in the counts; the other
+        # workers have not seen them yet
+        await self.publish()
+        if changed and publish:
+            await self.broadcast({
+                "type": "stats",
+                "by_status": dict(self.stats.by_status),
+                "by_assignee": {name: dict(c) for name, c in self.stats.by_assignee.items()},
+            })
+
+    async def _run(self) -> None:
+        try:
+            await self.reconcile(publish=False)
+        except Exception:
+            logger.exception("initial stats reconcile failed")
+        next_reconcile = time.monotonic() + self.reconcile_interval
+        while True:
+            await asyncio.sleep(self.push_interval)
+            try:
+                if time.monotonic() >= next_reconcile:
+                    next_reconcile = time.monotonic() + self.reconcile_interval
+                    await self.reconcile()
+                else:
+                    await self.publish()
+            except Exception:
+                logger.exception("stats publish failed")
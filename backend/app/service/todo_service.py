@@ -1,34 +1,190 @@
-from typing import Optional, List
+from typing import AsyncIterator, Iterator, Optional, List, Sequence, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.todo import TaskStatus, Todo
-from repositories.todo import TodoRepository
-from schemas.todo import TodoCreate, TodoClaim
+from repositories.todo import AsyncTodoRepository, TodoRepository
+from schemas.todo import TodoBulkClaim, TodoCreate, TodoClaim
+from core.pagination import encode_cursor, decode_cursor
+from service.task_stats import task_stats
+
+CLAIM_CONFLICT = "Only TODO tasks can be claimed"
+
+
+class TaskConflictError(ValueError):
+    """The task exists but is no longer TODO (someone else claimed it)."""
+
 
 class TodoService:
     @staticmethod
     def create_task(db: Session, data: TodoCreate) -> Todo:
         todo = Todo(**data.dict(), status=TaskStatus.TODO)
-        return TodoRepository.save(db, todo)
+        todo = TodoRepository.save(db, todo)
+        task_stats.created([todo])
+        return todo
 
     @staticmethod
     def claim_task(db: Session, task_id: int, data: TodoClaim) -> Optional[Todo]:
-        todo = TodoRepository.get_by_id(db, task_id)
-        if not todo:
-            return None
-        if todo.status != TaskStatus.TODO:
-            raise ValueError("Only TODO tasks can be claimed")
-        todo.assignee = data.assignee
-        todo.status   = data.status
-        return TodoRepository.save(db, todo)
+        """
+        Claim atomically; None if the task does not exist, TaskConflictError
+        if it is no longer TODO. Only a losing claim pays for a second query.
+        """
+        todo = TodoRepository.claim(db, task_id, data.assignee, data.status)
+        if todo is not None:
+            task_stats.claimed([todo])
+            return todo
+        if TodoRepository.existing_ids(db, [task_id]):
+            raise TaskConflictError(CLAIM_CONFLICT)
+        return None
     
+    @staticmethod
+    def claim_next(db: Session, data: TodoClaim) -> Optional[Todo]:
+        """Claim the oldest TODO task for `data.assignee`; None if there is none."""
+        todo = TodoRepository.claim_next(db, data.assignee, data.status)
+        if todo is not None:
+            task_stats.claimed([todo])
+        return todo
+
+    @staticmethod
+    def create_tasks(db: Session, items: Sequence[TodoCreate]) -> List[Todo]:
+        """Create a batch of tasks in one transaction."""
+        rows = [{**item.model_dump(), "status": TaskStatus.TODO} for item in items]
+        todos = TodoRepository.insert_many(db, rows)
+        task_stats.created(todos)
+        return todos
+
+    @staticmethod
+    def claim_tasks(
+        db: Session, claims: Sequence[TodoBulkClaim]
+    ) -> Tuple[List[Todo], List[Tuple[int, int, str]]]:
+        """
+        Claim a batch in one transaction. Returns the claimed tasks and
+        (index, task_id, reason) for each claim that did not apply.
+        """
+        results = TodoRepository.claim_many(
+            db, [(c.id, c.assignee, c.status) for c in claims]
+        )
+        missed = [i for i, todo in enumerate(results) if todo is None]
+        existing = TodoRepository.existing_ids(db, {claims[i].id for i in missed}) if missed else set()
+        failures = [
+            (i, claims[i].id, CLAIM_CONFLICT if claims[i].id in existing else "Not found")
+            for i in missed
+        ]
+        claimed = [todo for todo in results if todo is not None]
+        task_stats.claimed(claimed)
+        return claimed, failures
+
+    @staticmethod
+    def get_tasks(db: Session, ids: Sequence[int]) -> List[Todo]:
+        """The tasks among `ids` that exist, in id order."""
+        return TodoRepository.get_many(db, ids)
+
     @staticmethod
     def get_all_tasks(db: Session) -> List[Todo]:
         """Return every Todo in the database."""
         return db.query(Todo).all()
+
+    @staticmethod
+    def stream_tasks(
+        db: Session,
+        batch_size: int,
+        status: Optional[TaskStatus] = None,
+        assignee: Optional[str] = None,
+    ) -> Iterator[List[Todo]]:
+        """All matching tasks in id order, in batches, never all in memory."""
+        return TodoRepository.iter_batches(db, batch_size, status=status, assignee=assignee)
+
+    @staticmethod
+    def list_tasks(
+        db: Session,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+        assignee: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        include_archived: bool = False,
+    ) -> Tuple[list, Optional[str]]:
+        """
+        One page of tasks plus the cursor for the next page (None on the
+        last page). Raises InvalidCursor for cursors we did not issue.
+        """
+        columns = None
+        if fields:
+            # the cursor is built from `id`, so it is always projected
+            columns = ["id"] + [f for f in fields if f != "id"]
+        rows = TodoRepository.list_page(
+            db,
+            limit + 1,
+            after_id=decode_cursor(cursor),
+            status=status,
+            assignee=assignee,
+            columns=columns,
+            include_archived=include_archived,
+        )
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        last_id = last["id"] if columns else last.id
+        return rows, encode_cursor(last_id)
     
     @staticmethod
-    def search_tasks_by_title(db: Session, title: str) -> List[Todo]:
+    def search_tasks_by_title(
+        db: Session, title: str, limit: Optional[int] = None, offset: int = 0,
+        include_archived: bool = False,
+    ) -> list:
         """
-        Business-level search; you can add permissions/pagination here.
+        Business-level search; ranked, paginated with limit/offset.
         """
-        return TodoRepository.search_by_title(db, title)
\ No newline at end of file
+        return TodoRepository.search_by_title(
+            db, title, limit=limit, offset=offset, include_archived=include_archived
+        )
+
+
+class AsyncTodoService:
+    """
+    Async twin of TodoService for the routers. Each business operation runs
+    as one `run_sync` hop on the AsyncSession, so commits and refreshes go
+    through the async driver instead of blocking the event loop.
+    """
+
+    @staticmethod
+    async def create_task(db: AsyncSession, data: TodoCreate) -> Todo:
+        return await db.run_sync(TodoService.create_task, data)
+
+    @staticmethod
+    async def claim_task(db: AsyncSession, task_id: int, data: TodoClaim) -> Optional[Todo]:
+        return await db.run_sync(TodoService.claim_task, task_id, data)
+
+    @staticmethod
+    async def claim_next(db: AsyncSession, data: TodoClaim) -> Optional[Todo]:
+        return await db.run_sync(TodoService.claim_next, data)
+
+    @staticmethod
+    async def create_tasks(db: AsyncSession, items: Sequence[TodoCreate]) -> List[Todo]:
+        return await db.run_sync(TodoService.create_tasks, items)
+
+    @staticmethod
+    async def claim_tasks(
+        db: AsyncSession, claims: Sequence[TodoBulkClaim]
+    ) -> Tuple[List[Todo], List[Tuple[int, int, str]]]:
+        return await db.run_sync(TodoService.claim_tasks, claims)
+
+    @staticmethod
+    async def get_tasks(db: AsyncSession, ids: Sequence[int]) -> List[Todo]:
+        return await db.run_sync(TodoService.get_tasks, ids)
+
+    @staticmethod
+    async def get_all_tasks(db: AsyncSession) -> List[Todo]:
+        return await db.run_sync(TodoService.get_all_tasks)
+
+    @staticmethod
+    def stream_tasks(db: AsyncSession, batch_size: int, **filters) -> AsyncIterator[List[Todo]]:
+        return AsyncTodoRepository.iter_batches(db, batch_size, **filters)
+
+    @staticmethod
+    async def list_tasks(db: AsyncSession, limit: int, **options) -> Tuple[list, Optional[str]]:
+        return await db.run_sync(TodoService.list_tasks, limit, **options)
+
+    @staticmethod
+    async def search_tasks_by_title(db: AsyncSession, title: str, **paging) -> list:
+        return await db.run_sync(TodoService.search_tasks_by_title, title, **paging)
@@ -0,0 +1,117 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from core.cache import ResponseCache
+from core.subscriptions import Subscription, narrow
+from models.archive import TodoArchive
+from models.todo import Base, TaskStatus, Todo
+from repositories.todo import AsyncTodoRepository
+from service.archive import Archiver
+from service.task_cache import CachedTaskService, ListScope, apply_event
+from service.task_stats import TaskStats
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+OLD = NOW - timedelta(days=40)
+
+@pytest_asyncio.fixture
+async def Session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+async def seed(Session, specs):
+    """(title, status, assignee, last changed) -> ids in order."""
+    async with Session() as db:
+        todos = [Todo(title=title, status=status, assignee=assignee, created_at=changed)
+                 for title, status, assignee, changed in specs]
+        db.add_all(todos)
+        await db.commit()
+        return [t.id for t in todos]
+
+BOARD = [
+    ("ship old release", TaskStatus.COMPLETED, "ann", OLD),
+    ("old todo", TaskStatus.TODO, None, OLD),
+    ("fresh release", TaskStatus.COMPLETED, "bob", NOW),
+    ("review old release", TaskStatus.COMPLETED, "bob", OLD),
+    ("newest", TaskStatus.COMPLETED, "ann", OLD),
+]
+
+async def discard(event):
+    pass
+
+@pytest.mark.asyncio
+async def test_archiver_moves_old_completed_tasks_in_batches(Session):
+    ids = await seed(Session, BOARD)
+    stats = TaskStats()
+    stats.replace({"completed": 4, "todo": 1}, {"ann": {"completed": 2}, "bob": {"completed": 2}})
+    events = []
+
+    async def broadcast(event):
+        events.append(event)
+
+    archiver = Archiver(broadcast, Session, after_days=30, stats=stats, batch_size=1, batch_pause=0)
+    assert await archiver.run_once(now=NOW) == 2
+    # one event per batch; young, open and newest tasks stay
+    assert [[t["id"] for t in e["tasks"]] for e in events] == [[ids[0]], [ids[3]]]
+    assert events[0]["tasks"][0] == {"id": ids[0], "status": "completed", "assignee": "ann"}
+    async with Session() as db:
+        assert sorted(await db.scalars(select(Todo.id))) == [ids[1], ids[2], ids[4]]
+        archived = (await db.scalars(select(TodoArchive).order_by(TodoArchive.id))).all()
+        assert [(a.id, a.title) for a in archived] == [(ids[0], "ship old release"), (ids[3], "review old release")]
+    assert stats.snapshot()["by_status"]["completed"] == 2
+    assert stats.snapshot()["by_assignee"] == {"ann": {"completed": 1}, "bob": {"completed": 1}}
+    assert archiver.metrics()["hot_rows"] == 3 and archiver.metrics()["moved_rows"] == 2
+    assert await archiver.run_once(now=NOW) == 0
+
+@pytest.mark.asyncio
+async def test_reads_include_archived_tasks_on_request(Session):
+    ids = await seed(Session, BOARD)
+    await Archiver(discard, Session, after_days=30, batch_pause=0).run_once(now=NOW)
+    async with Session() as db:
+        page = await AsyncTodoRepository.list_page(db, 10)
+        assert [t.id for t in page] == [ids[1], ids[2], ids[4]]
+        page = await AsyncTodoRepository.list_page(db, 3, include_archived=True)
+        assert [t.id for t in page] == ids[:3]
+        rows = await AsyncTodoRepository.list_page(db, 10, after_id=ids[0], assignee="bob",
+                                                   columns=["id", "title"], include_archived=True)
+        assert rows == [{"id": ids[2], "title": "fresh release"}, {"id": ids[3], "title": "review old release"}]
+        # archived tasks are all completed
+        assert len(await AsyncTodoRepository.list_page(db, 10, status=TaskStatus.TODO, include_archived=True)) == 1
+
+        assert [t.id for t in await AsyncTodoRepository.search_by_title(db, "release")] == [ids[2]]
+        found = await AsyncTodoRepository.search_by_title(db, "release", include_archived=True)
+        # live matches first, then archived ones, newest first
+        assert [t.id for t in found] == [ids[2], ids[3], ids[0]]
+        page = await AsyncTodoRepository.search_by_title(db, "release", limit=1, offset=1, include_archived=True)
+        assert [t.id for t in page] == [ids[3]]
+
+        entry = await CachedTaskService.get_task(db, ids[0], cache=ResponseCache())
+        assert json.loads(entry.body)["title"] == "ship old release"
+
+        # archived rows come back as what they are, so a later write in the
+        # same session cannot mistake them for todos rows
+        assert [type(t) for t in found] == [Todo, TodoArchive, TodoArchive]
+        found[1].title = "renamed in the archive"
+        found[0].title = "renamed live"
+        await db.commit()
+        assert (await db.get(TodoArchive, ids[3])).title == "renamed in the archive"
+
+def test_archived_tasks_evict_cached_pages_and_reach_matching_subscribers():
+    cache = ResponseCache()
+    cache.put("page", b"[]", None, ListScope(None, None, 0, 10), cache.version)
+    cache.put("later", b"[]", None, ListScope(None, None, 10, 20), cache.version)
+    event = {"type": "tasks_archived", "tasks": [{"id": 4, "status": "completed", "assignee": "ann"}]}
+    assert apply_event(event, cache) == 1
+    assert cache.get("page") is None and cache.get("later") is not None
+
+    payload = json.dumps(event)
+    assert narrow(payload, event, Subscription.parse(assignee=["ann"])) == payload
+    assert narrow(payload, event, Subscription.parse(assignee=["bob"])) is None
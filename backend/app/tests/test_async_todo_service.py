@@ -0,0 +1,50 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from models.todo import Base, TaskStatus
+from schemas.todo import TodoCreate, TodoClaim
+from repositories.todo import AsyncTodoRepository
+from service.todo_service import AsyncTodoService
+from database.async_connection import to_async_url
+
+@pytest_asyncio.fixture
+async def db_session():
+    # one shared in-memory connection so every session sees the schema
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as session:
+        yield session
+    await engine.dispose()
+
+def test_to_async_url_maps_drivers():
+    assert to_async_url("sqlite:///./todos.db") == "sqlite+aiosqlite:///./todos.db"
+    assert to_async_url("postgresql://u:p@db/todos") == "postgresql+asyncpg://u:p@db/todos"
+    assert to_async_url("postgresql+asyncpg://u:p@db/todos") == "postgresql+asyncpg://u:p@db/todos"
+
+@pytest.mark.asyncio
+async def test_create_and_claim_round_trip(db_session):
+    todo = await AsyncTodoService.create_task(db_session, TodoCreate(title="AsyncTest"))
+    assert todo.id is not None and todo.status == TaskStatus.TODO
+
+    claimed = await AsyncTodoService.claim_task(db_session, todo.id, TodoClaim(assignee="eve"))
+    # attributes stay readable after commit without a lazy refresh
+    assert claimed.assignee == "eve"
+    assert claimed.status == TaskStatus.INPROGRESS
+
+    fetched = await AsyncTodoRepository.get_by_id(db_session, todo.id)
+    assert fetched.assignee == "eve"
+
+@pytest.mark.asyncio
+async def test_list_and_search(db_session):
+    for title in ("alpha build", "beta build", "gamma"):
+        await AsyncTodoService.create_task(db_session, TodoCreate(title=title))
+
+    page, cursor = await AsyncTodoService.list_tasks(db_session, 2)
+    assert len(page) == 2 and cursor is not None
+
+    results = await AsyncTodoService.search_tasks_by_title(db_session, "build", limit=10)
+    assert {t.title for t in results} == {"alpha build", "beta build"}
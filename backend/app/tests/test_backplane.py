@@ -0,0 +1,174 @@
+import asyncio
+import os
+import socket
+
+import pytest
+
+from core.backplane import BrokerBackplane, InProcessBackplane, LocalBroker, UnixSocketBackplane
+from core.ConnectionManager import ConnectionManager
+from core.config import Settings
+from core.events import EventLog
+from tests.test_connection_manager import FakeWebSocket, drain
+from tests.test_events import ListStore
+
+def collector():
+    received = []
+
+    async def handler(payload: str):
+        received.append(payload)
+
+    return received, handler
+
+async def settle():
+    for _ in range(20):
+        await asyncio.sleep(0.005)
+
+@pytest.mark.asyncio
+async def test_in_process_delivers_back_to_publisher():
+    received, handler = collector()
+    bp = InProcessBackplane()
+    bp.attach(handler)
+    await bp.publish('{"n":1}')
+    assert received == ['{"n":1}']
+
+@pytest.mark.asyncio
+async def test_unix_sockets_reach_every_peer(tmp_path):
+    peers = [UnixSocketBackplane(str(tmp_path)) for _ in range(3)]
+    inboxes = []
+    for bp in peers:
+        received, handler = collector()
+        bp.attach(handler)
+        inboxes.append(received)
+        await bp.start()
+
+    await peers[0].publish('{"n":1}')
+    await settle()
+    assert inboxes == [['{"n":1}']] * 3
+
+    for bp in peers:
+        await bp.stop()
+    assert os.listdir(tmp_path) == []
+
+@pytest.mark.asyncio
+async def test_unix_socket_forgets_dead_peers(tmp_path):
+    # a socket file left behind by a crashed worker
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale.bind(str(tmp_path / "999-dead.sock"))
+    stale.close()
+
+    bp = UnixSocketBackplane(str(tmp_path))
+    received, handler = collector()
+    bp.attach(handler)
+    await bp.start()
+    await bp.publish("{}")
+    assert received == ["{}"]
+    assert os.listdir(tmp_path) == [os.path.basename(bp.path)]
+    await bp.stop()
+
+@pytest.mark.asyncio
+async def test_broker_backplane_links_managers():
+    broker, store = LocalBroker(), ListStore()
+    worker_a = ConnectionManager(backplane=BrokerBackplane(broker), events=EventLog(store=store))
+    worker_b = ConnectionManager(backplane=BrokerBackplane(broker), events=EventLog(store=store))
+    await worker_a.start()
+    await worker_b.start()
+    ws_a, ws_b = FakeWebSocket(), FakeWebSocket()
+    await worker_a.connect(ws_a)
+    await worker_b.connect(ws_b)
+
+    await worker_a.broadcast({"type": "task_created"})
+    await drain()
+    assert ws_a.sent == ws_b.sent == ['{"seq":1,"type":"task_created"}']
+
+    await worker_a.stop()
+    await worker_b.stop()
+
+@pytest.mark.asyncio
+async def test_workers_on_one_broker_share_seqs():
+    # per-worker counters would number B's event 1 and A's ring would
+    # never replay it; without a durable log the manager refuses to start
+    with pytest.raises(ValueError, match="durable event log"):
+        ConnectionManager(backplane=BrokerBackplane(LocalBroker()))
+    with pytest.raises(ValueError, match="needs event_log='database'"):
+        Settings(backplane="unix")
+    assert Settings(backplane="unix", event_log="database").backplane == "unix"
+
+    broker, store = LocalBroker(), ListStore()
+    worker_a = ConnectionManager(backplane=BrokerBackplane(broker), events=EventLog(store=store))
+    worker_b = ConnectionManager(backplane=BrokerBackplane(broker), events=EventLog(store=store))
+    await worker_a.start()
+    await worker_b.start()
+    for n in range(3):
+        await worker_a.broadcast({"type": "task_created", "n": n})
+    await worker_b.broadcast({"type": "task_created", "n": 3})
+    await drain()
+
+    assert worker_a.events.since(3, worker_a.events.epoch) == ['{"seq":4,"type":"task_created","n":3}']
+    assert worker_b.events.since(0, worker_b.events.epoch) == worker_a.events.since(0, worker_a.events.epoch)
+    await worker_a.stop()
+    await worker_b.stop()
+
+@pytest.mark.asyncio
+async def test_unix_socket_fragments_large_events(tmp_path):
+    sender, receiver = UnixSocketBackplane(str(tmp_path), max_datagram=1024), UnixSocketBackplane(str(tmp_path))
+    received, handler = collector()
+    receiver.attach(handler)
+    sender.attach(collector()[1])
+    await sender.start()
+    await receiver.start()
+
+    payload = '{"title":"%s"}' % ("x" * 10_000)
+    await sender.publish(payload)
+    await settle()
+    assert received == [payload]
+    assert sender.metrics()["fragmented_events"] == 1
+
+    await sender.stop()
+    await receiver.stop()
+
+@pytest.mark.asyncio
+async def test_unix_socket_backlogs_a_full_peer_instead_of_dropping(tmp_path):
+    # a peer that is not reading: its buffer fills after a handful of datagrams
+    sink = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sink.bind(str(tmp_path / "1-sink.sock"))
+    bp = UnixSocketBackplane(str(tmp_path))
+    bp.attach(collector()[1])
+    await bp.start()
+
+    for n in range(200):
+        await bp.publish('{"n":%d}' % n)
+    assert bp.metrics()["dropped_events"] == 0
+    assert bp.metrics()["peers_backlogged"] == 1
+
+    sink.setblocking(False)
+    seen = []
+    for _ in range(200):
+        try:
+            while True:
+                seen.append(sink.recv(1024).decode())
+        except BlockingIOError:
+            pass
+        if len(seen) == 200:
+            break
+        await asyncio.sleep(0.005)
+    assert seen == ['{"n":%d}' % n for n in range(200)]
+    assert bp.metrics()["backlog_bytes"] == 0
+
+    await bp.stop()
+    sink.close()
+
+@pytest.mark.asyncio
+async def test_unix_socket_drops_past_max_backlog(tmp_path):
+    sink = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sink.bind(str(tmp_path / "1-sink.sock"))
+    bp = UnixSocketBackplane(str(tmp_path), max_backlog=100)
+    bp.attach(collector()[1])
+    await bp.start()
+
+    for n in range(200):
+        await bp.publish('{"n":%d}' % n)
+    assert bp.metrics()["dropped_events"] > 0
+    assert bp.metrics()["backlog_bytes"] <= 100
+
+    await bp.stop()
+    sink.close()
@@ -0,0 +1,78 @@
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.todo import Base, TaskStatus
+from repositories.todo import TodoRepository
+from schemas.todo import TodoClaim, TodoCreate
+from service.todo_service import TaskConflictError, TodoService
+
+CLAIMERS = 16
+TASKS = 20
+
+def test_parallel_claimers_get_exactly_one_winner_per_task(tmp_path):
+    # a file database so every thread has its own connection, like workers
+    engine = create_engine(f"sqlite:///{tmp_path / 'claims.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        ids = [t.id for t in TodoService.create_tasks(db, [TodoCreate(title=f"race {n}") for n in range(TASKS)])]
+
+    wins = {task_id: [] for task_id in ids}
+    conflicts = []
+    start = threading.Barrier(CLAIMERS)
+
+    def claimer(n: int):
+        start.wait()
+        with Session() as db:
+            for task_id in ids:
+                try:
+                    todo = TodoService.claim_task(db, task_id, TodoClaim(assignee=f"worker{n}"))
+                    wins[task_id].append(todo.assignee)
+                except TaskConflictError:
+                    conflicts.append(task_id)
+
+    threads = [threading.Thread(target=claimer, args=(n,)) for n in range(CLAIMERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(len(winners) == 1 for winners in wins.values())
+    assert len(conflicts) == TASKS * (CLAIMERS - 1)
+    with Session() as db:
+        for task_id, winners in wins.items():
+            stored = TodoRepository.get_by_id(db, task_id)
+            # the stored assignee is the winner's: no lost update
+            assert stored.assignee == winners[0]
+            assert stored.status == TaskStatus.INPROGRESS
+    engine.dispose()
+
+def test_parallel_claim_next_hands_out_each_task_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        ids = [t.id for t in TodoService.create_tasks(db, [TodoCreate(title=f"job {n}") for n in range(TASKS)])]
+
+    claimed = []
+    start = threading.Barrier(CLAIMERS)
+
+    def worker(n: int):
+        start.wait()
+        with Session() as db:
+            while (todo := TodoService.claim_next(db, TodoClaim(assignee=f"worker{n}"))) is not None:
+                claimed.append((todo.id, todo.assignee))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(CLAIMERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(task_id for task_id, _ in claimed) == ids
+    with Session() as db:
+        for task_id, assignee in claimed:
+            assert TodoRepository.get_by_id(db, task_id).assignee == assignee
+    engine.dispose()
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from models.todo import Base, TaskStatus
+from schemas.todo import TodoClaim, TodoCreate
+from service.claim_queue import WorkSignal, claim_next, on_delivered, work_signal
+from service.todo_service import AsyncTodoService
+
+@pytest_asyncio.fixture
+async def db_session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as session:
+        yield session
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_claim_next_takes_the_oldest_todo(db_session):
+    first = await AsyncTodoService.create_task(db_session, TodoCreate(title="first"))
+    await AsyncTodoService.create_task(db_session, TodoCreate(title="second"))
+
+    todo = await claim_next(db_session, TodoClaim(assignee="w1"))
+    assert (todo.id, todo.assignee, todo.status) == (first.id, "w1", TaskStatus.INPROGRESS)
+    assert (await claim_next(db_session, TodoClaim(assignee="w2"))).title == "second"
+    assert await claim_next(db_session, TodoClaim(assignee="w3")) is None
+
+@pytest.mark.asyncio
+async def test_long_poll_wakes_when_a_task_is_created(db_session):
+    waiting = asyncio.create_task(claim_next(db_session, TodoClaim(assignee="w1"), wait=5, poll_interval=5))
+    await asyncio.sleep(0.05)
+    assert work_signal.metrics()["waiting"] == 1
+
+    todo = await AsyncTodoService.create_task(db_session, TodoCreate(title="fresh"))
+    on_delivered(json.dumps({"type": "task_created", "task": {"id": todo.id}}, separators=(",", ":")))
+    claimed = await asyncio.wait_for(waiting, 1)
+    assert (claimed.id, claimed.assignee) == (todo.id, "w1")
+    assert work_signal.metrics()["waiting"] == 0
+
+@pytest.mark.asyncio
+async def test_long_poll_gives_up_after_wait(db_session):
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    assert await claim_next(db_session, TodoClaim(assignee="w1"), wait=0.2, poll_interval=0.05) is None
+    assert 0.2 <= loop.time() - start < 1
+    assert work_signal.metrics()["waiting"] == 0
+
+@pytest.mark.asyncio
+async def test_signal_wakes_longest_waiting_one_per_task():
+    signal = WorkSignal()
+    waiters = [signal.ticket() for _ in range(4)]
+    signal.notify(2)
+    assert [w.done() for w in waiters] == [True, True, False, False]
+
+    # a wake-up that is not used moves on to the next waiter
+    signal.release(waiters[0])
+    assert waiters[2].done() and not waiters[3].done()
+    signal.release(waiters[3])
+    assert signal.metrics() == {"waiting": 0, "wakeups": 3}
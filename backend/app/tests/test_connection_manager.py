@@ -0,0 +1,197 @@
+import asyncio
+import json
+
+import pytest
+
+import routers.ws_route as ws_route
+from core.ConnectionManager import ConnectionManager, DISCONNECT, SLOW_CONSUMER_CLOSE_CODE
+from core.subscriptions import EVERYTHING
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def send_json(self, data: dict):
+        await self.send_text(json.dumps(data, separators=(",", ":")))
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_broadcast_serializes_once_and_reaches_everyone(monkeypatch):
+    mgr = ConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for ws in sockets:
+        await mgr.connect(ws)
+
+    calls = []
+    real_dumps = json.dumps
+    monkeypatch.setattr(json, "dumps", lambda *a, **k: calls.append(1) or real_dumps(*a, **k))
+    await mgr.broadcast({"type": "task_created", "task": {"id": 1}})
+    await drain()
+
+    assert len(calls) == 1
+    assert all(json.loads(ws.sent[0])["task"]["id"] == 1 for ws in sockets)
+    assert mgr.metrics()["messages_sent"] == 3
+
+@pytest.mark.asyncio
+async def test_slow_socket_does_not_delay_others():
+    mgr = ConnectionManager(send_timeout=1.0)
+    slow, fast = FakeWebSocket(delay=0.5), FakeWebSocket()
+    await mgr.connect(slow)
+    await mgr.connect(fast)
+
+    await mgr.broadcast({"n": 1})
+    await drain()
+    assert fast.sent == ['{"seq":1,"n":1}']
+    assert slow.sent == []
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_oldest():
+    mgr = ConnectionManager(queue_size=2)
+    ws = FakeWebSocket()
+    ws.gate.clear()  # stalled consumer
+    await mgr.connect(ws)
+    await drain()  # writer picks up nothing yet
+
+    for n in range(5):
+        await mgr.broadcast({"n": n})
+    metrics = mgr.metrics()
+    assert metrics["messages_dropped"] >= 2
+    assert metrics["queue_depth_max"] == 2
+
+    ws.gate.set()
+    await drain()
+    # the newest events survive
+    assert json.loads(ws.sent[-1])["n"] == 4
+
+@pytest.mark.asyncio
+async def test_frame_after_a_drop_carries_prev():
+    mgr = ConnectionManager(queue_size=2)
+    ws = FakeWebSocket()
+    ws.gate.clear()
+    await mgr.connect(ws)
+    await mgr.broadcast({"n": 0})
+    await drain()  # the writer is stuck sending seq 1
+
+    for n in range(1, 5):
+        await mgr.broadcast({"n": n})
+    ws.gate.set()
+    await drain()
+    # seqs 2 and 3 were dropped; the next frame says so
+    assert ws.sent == ['{"seq":1,"n":0}', '{"prev":3,"seq":4,"n":3}', '{"seq":5,"n":4}']
+
+@pytest.mark.asyncio
+async def test_paused_socket_overflow_is_resynced_not_dropped(monkeypatch):
+    mgr = ConnectionManager(queue_size=2)
+    monkeypatch.setattr(ws_route, "manager", mgr)
+    ws = FakeWebSocket()
+    await mgr.connect(ws, paused=True)
+
+    async def slow_snapshot(ws, subscription):
+        seq = mgr.events.last_seq
+        for n in range(5):  # a write burst while the snapshot is going out
+            await mgr.broadcast({"n": n})
+        await ws.send_json({"type": "snapshot", "seq": seq})
+        return seq
+
+    monkeypatch.setattr(ws_route, "send_snapshot", slow_snapshot)
+    assert await ws_route.catch_up(ws, EVERYTHING)
+    await mgr.broadcast({"n": 5})
+    mgr.release(ws)
+    await drain()
+
+    frames = [json.loads(m) for m in ws.sent]
+    assert frames[:2] == [
+        {"type": "snapshot", "seq": 0},
+        {"type": "resync", "epoch": mgr.events.epoch, "since": 0, "seq": 5, "count": 5},
+    ]
+    assert [f["n"] for f in frames[2:]] == [0, 1, 2, 3, 4, 5]
+    assert mgr.metrics()["overflow_resyncs"] == 1
+    assert mgr.metrics()["messages_dropped"] == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_disconnect_policy_evicts():
+    mgr = ConnectionManager(queue_size=1, policy=DISCONNECT)
+    ws = FakeWebSocket()
+    ws.gate.clear()
+    await mgr.connect(ws)
+    await drain()
+
+    for n in range(3):
+        await mgr.broadcast({"n": n})
+    await drain()
+    assert ws not in mgr.active
+    assert ws.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert mgr.metrics()["slow_consumer_disconnects"] == 1
+
+@pytest.mark.asyncio
+async def test_send_timeout_evicts_socket():
+    mgr = ConnectionManager(send_timeout=0.01)
+    ws = FakeWebSocket(delay=1.0)
+    await mgr.connect(ws)
+    await mgr.broadcast({"n": 1})
+    await asyncio.sleep(0.05)
+    assert ws not in mgr.active
+    assert mgr.metrics()["send_timeouts"] == 1
+
+@pytest.mark.asyncio
+async def test_paused_socket_buffers_until_released():
+    mgr = ConnectionManager()
+    ws = FakeWebSocket()
+    await mgr.connect(ws, paused=True)
+    await mgr.broadcast({"n": 1})
+    await drain()
+    assert ws.sent == []
+
+    mgr.release(ws)
+    await drain()
+    assert [json.loads(m)["seq"] for m in ws.sent] == [1]
+
+@pytest.mark.asyncio
+async def test_batch_window_coalesces_and_merges_per_task():
+    from core.subscriptions import Subscription
+
+    mgr = ConnectionManager(batch_window=0.02, batch_max=3)
+    everyone, ann = FakeWebSocket(), FakeWebSocket()
+    await mgr.connect(everyone)
+    await mgr.connect(ann, subscription=Subscription.parse(assignee="ann"))
+
+    await mgr.broadcast({"type": "task_created", "task": {"id": 1, "assignee": None, "status": "todo"}})
+    await mgr.broadcast({"type": "task_updated", "task": {"id": 1, "assignee": "ann", "status": "inprogress"}})
+    await drain()
+    assert everyone.sent == []  # held by the window
+    await asyncio.sleep(0.05)
+
+    # created and claimed within one window: one create with the claimed state,
+    # and a lone event goes out unwrapped
+    merged = {"seq": 2, "type": "task_created", "task": {"id": 1, "assignee": "ann", "status": "inprogress"}}
+    assert [json.loads(m) for m in everyone.sent] == [merged]
+    assert [json.loads(m) for m in ann.sent] == [merged]
+
+    # batch_max flushes without waiting for the window
+    for n in range(2, 5):
+        await mgr.broadcast({"type": "task_created", "task": {"id": n, "assignee": "bob", "status": "todo"}})
+    await drain()
+    frame = json.loads(everyone.sent[-1])
+    assert frame["type"] == "batch" and frame["seq"] == 5
+    assert [e["task"]["id"] for e in frame["events"]] == [2, 3, 4]
+    assert len(ann.sent) == 1  # nothing for ann in that batch
+    assert mgr.metrics()["batches_sent"] == 2 and mgr.metrics()["events_merged"] == 1
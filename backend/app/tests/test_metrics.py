@@ -0,0 +1,52 @@
+import logging
+
+from sqlalchemy import create_engine, text
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from core.metrics import Histogram, Registry, QUERY_LATENCY, SLOW_QUERIES, track_queries
+from core.middleware import MetricsMiddleware
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("req_seconds", "latency", buckets=(0.1, 1.0), labels=("route",))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, "/tasks")
+    registry.collector("ws", "fan-out", lambda: {"connections": 3, "mode": "memory"})
+    lines = registry.render().splitlines()
+    assert 'req_seconds_bucket{route="/tasks",le="0.1"} 1' in lines
+    assert 'req_seconds_bucket{route="/tasks",le="1"} 2' in lines
+    assert 'req_seconds_bucket{route="/tasks",le="+Inf"} 3' in lines
+    assert 'req_seconds_count{route="/tasks"} 3' in lines
+    # non-numeric collector values are skipped
+    assert "ws_connections 3" in lines and not any(l.startswith("ws_mode") for l in lines)
+
+def test_requests_are_labelled_by_route_template(tmp_path):
+    async def task(request):
+        return PlainTextResponse("ok", status_code=201 if request.method == "POST" else 200)
+
+    latency = Histogram("t", "t", labels=("method", "route", "status"))
+    app = Starlette(routes=[Route("/tasks/{task_id}/claim", task, methods=["GET", "POST"])])
+    app.add_middleware(MetricsMiddleware, histogram=latency, profile_dir=str(tmp_path))
+    client = TestClient(app)
+    client.get("/tasks/7/claim")
+    client.post("/tasks/8/claim")
+    client.get("/elsewhere")
+    assert latency.count("GET", "/tasks/{task_id}/claim", "200") == 1
+    assert latency.count("POST", "/tasks/{task_id}/claim", "201") == 1
+    assert latency.count("GET", "unmatched", "404") == 1
+
+    profiled = client.get("/tasks/9/claim", headers={"X-Profile": "1"})
+    assert (tmp_path / profiled.headers["x-profile"]).exists()
+
+def test_slow_queries_are_timed_and_logged(caplog):
+    engine = create_engine("sqlite://")
+    track_queries(engine, slow_query_ms=0)
+    before, slow_before = QUERY_LATENCY.count(), SLOW_QUERIES.values.get((), 0)
+    with caplog.at_level(logging.WARNING, logger="core.metrics"), engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert QUERY_LATENCY.count() == before + 1
+    assert SLOW_QUERIES.values[()] == slow_before + 1
+    assert "slow query" in caplog.text and "SELECT 1" in caplog.text
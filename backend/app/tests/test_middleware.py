@@ -0,0 +1,39 @@
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from core.middleware import SecurityMiddleware
+from core.ratelimit import MemoryRateLimitBackend, RateLimiter
+
+def make_client(default="100/60", routes=None):
+    async def ok(request):
+        return PlainTextResponse("ok", headers={"x-app": "1"})
+
+    app = Starlette(routes=[Route("/tasks", ok, methods=["GET", "POST"]), Route("/docs", ok)])
+    limiter = RateLimiter(MemoryRateLimitBackend(), default=default, routes=routes or {})
+    app.add_middleware(SecurityMiddleware, limiter=limiter)
+    return TestClient(app)
+
+def test_security_headers_are_added_without_dropping_app_headers():
+    response = make_client().get("/tasks")
+    assert response.status_code == 200
+    assert response.headers["x-app"] == "1"
+    assert response.headers["x-frame-options"] == "DENY"
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["content-security-policy"] == "default-src 'self'"
+
+def test_docs_get_the_relaxed_csp():
+    response = make_client().get("/docs")
+    assert "'unsafe-inline'" in response.headers["content-security-policy"]
+
+def test_over_limit_is_rejected_before_the_app():
+    client = make_client(routes={"POST /tasks": "1/60"})
+    assert client.post("/tasks").status_code == 200
+    response = client.post("/tasks")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too Many Requests"}
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.headers["x-frame-options"] == "DENY"
+    # reads have their own budget
+    assert client.get("/tasks").status_code == 200
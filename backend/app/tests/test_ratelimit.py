@@ -0,0 +1,96 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from core.ratelimit import (
+    Limit,
+    MemoryRateLimitBackend,
+    RateLimiter,
+    SQLiteRateLimitBackend,
+)
+
+LIMIT = Limit(requests=3, period=10)
+
+async def hits(backend, key, now, n=1):
+    return [(await backend.hit(key, LIMIT, now=now)).allowed for _ in range(n)]
+
+@pytest.mark.asyncio
+async def test_memory_backend_allows_up_to_limit_then_denies():
+    backend = MemoryRateLimitBackend()
+    assert await hits(backend, "a", 100.0, 4) == [True, True, True, False]
+    denied = await backend.hit("a", LIMIT, now=100.0)
+    assert denied.retry_after > 0
+    # other keys are independent
+    assert await hits(backend, "b", 100.0) == [True]
+
+@pytest.mark.asyncio
+async def test_previous_window_is_weighted_by_overlap():
+    backend = MemoryRateLimitBackend()
+    await hits(backend, "a", 100.0, 3)  # window [100, 110) full
+    # 20% into the next window 80% of the previous one still counts: 2.4
+    assert await hits(backend, "a", 112.0, 2) == [False, False]
+    # 80% in only 0.6 counts, so two more fit
+    assert await hits(backend, "a", 118.0, 3) == [True, True, False]
+    # a window with nothing before it starts fresh
+    assert await hits(backend, "a", 200.0, 3) == [True, True, True]
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_idle_keys():
+    backend = MemoryRateLimitBackend()
+    for n in range(100):
+        await backend.hit(f"ip{n}", LIMIT, now=100.0)
+    assert len(backend) == 100
+    # two periods later none of them can matter any more
+    await backend.hit("late", LIMIT, now=125.0)
+    assert len(backend) == 1
+
+@pytest.mark.asyncio
+async def test_memory_backend_caps_key_count():
+    backend = MemoryRateLimitBackend(max_keys=10)
+    for n in range(50):
+        await backend.hit(f"ip{n}", LIMIT, now=100.0)
+    assert len(backend) == 10
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "rl.db")
+    worker_a, worker_b = SQLiteRateLimitBackend(path), SQLiteRateLimitBackend(path)
+    assert await hits(worker_a, "a", 100.0, 2) == [True, True]
+    assert await hits(worker_b, "a", 100.0, 2) == [True, False]
+    assert await hits(worker_a, "a", 112.0) == [False]
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_waits_for_the_lock_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "rl.db")
+    backend = SQLiteRateLimitBackend(path)
+    await hits(backend, "a", 100.0)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # another worker holds the write lock
+    try:
+        pending = asyncio.create_task(backend.hit("a", LIMIT, now=100.0))
+        ticks = 0
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert ticks == 10 and not pending.done()
+    finally:
+        other.execute("COMMIT")
+        other.close()
+    assert (await pending).allowed
+
+@pytest.mark.asyncio
+async def test_route_rules_pick_longest_prefix_and_count_separately():
+    limiter = RateLimiter(
+        MemoryRateLimitBackend(),
+        default="5/60",
+        routes={"POST /tasks": "1/60", "* /tasks/search": "2/60"},
+    )
+    assert limiter.limit_for("GET", "/tasks/search")[1] == Limit(2, 60)
+    assert limiter.limit_for("POST", "/tasks/")[1] == Limit(1, 60)
+    assert limiter.limit_for("GET", "/tasks/")[1] == Limit(5, 60)
+
+    assert (await limiter.check("1.2.3.4", "POST", "/tasks/")).allowed
+    assert not (await limiter.check("1.2.3.4", "POST", "/tasks/")).allowed
+    # the exhausted write rule leaves the read budget alone
+    assert (await limiter.check("1.2.3.4", "GET", "/tasks/")).allowed
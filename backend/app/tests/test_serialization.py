@@ -0,0 +1,124 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.testclient import TestClient
+
+import routers.todo_routers as todo_routers
+from core.ConnectionManager import ConnectionManager
+from core.config import settings
+from core.events import seq_of, stamp
+from core.ndjson import LineTooLong, iter_lines
+from core.serialization import (
+    JSONBytesResponse,
+    array_chunks,
+    dump_each,
+    dump_task,
+    dump_tasks,
+    join_array,
+    ndjson_chunks,
+    task_event,
+    tasks_event,
+)
+from database.async_connection import get_async_db
+from models.todo import Base, TaskStatus, Todo
+from schemas.todo import TodoResponse
+
+def make_todo(n: int) -> Todo:
+    return Todo(id=n, title=f"Tâsk {n}", description=None, assignee="bob",
+                status=TaskStatus.INPROGRESS, created_at=datetime(2026, 10, 17, 9, 30, n),
+                updated_at=None)
+
+def test_bytes_match_the_old_encoder_output():
+    todo = make_todo(1)
+    old = jsonable_encoder(TodoResponse.model_validate(todo))
+    assert json.loads(dump_task(todo)) == old
+    assert json.loads(dump_tasks([todo, make_todo(2)])) == [old, jsonable_encoder(TodoResponse.model_validate(make_todo(2)))]
+    assert dump_tasks([make_todo(1), make_todo(2)]) == join_array(dump_each([make_todo(1), make_todo(2)]))
+
+def test_events_wrap_the_same_bytes_and_stay_stampable():
+    body = dump_task(make_todo(3))
+    event = task_event("task_created", body)
+    assert body.decode() in event
+    stamped = stamp(7, event)
+    assert seq_of(stamped) == 7
+    assert json.loads(stamped)["task"]["id"] == 3
+    batch = json.loads(tasks_event("tasks_updated", [body, dump_task(make_todo(4))]))
+    assert [t["id"] for t in batch["tasks"]] == [3, 4]
+
+def test_response_sends_bytes_untouched():
+    body = dump_task(make_todo(5))
+    assert JSONBytesResponse(body).body == body
+    assert JSONBytesResponse({"status": TaskStatus.TODO}).body == b'{"status":"todo"}'
+
+async def _batches(*batches):
+    for batch in batches:
+        yield batch
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+@pytest.mark.asyncio
+async def test_streamed_chunks_form_valid_documents():
+    parts = dump_each([make_todo(n) for n in range(1, 6)])
+    batches = (parts[:2], [], parts[2:])
+    assert await _collect(array_chunks(_batches(*batches))) == join_array(parts)
+    assert await _collect(array_chunks(_batches())) == b"[]"
+    lines = (await _collect(ndjson_chunks(_batches(*batches)))).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3, 4, 5]
+
+@pytest.mark.asyncio
+async def test_iter_lines_splits_across_chunks_and_bounds_line_length():
+    async def chunks(*parts):
+        for part in parts:
+            yield part
+
+    assert [line async for line in iter_lines(chunks(b"a\nb", b"c\n", b"", b"d"))] == [b"a", b"bc", b"d"]
+    assert [line async for line in iter_lines(chunks(b"1234\n", b"12"), max_line=4)] == [b"1234", b"12"]
+    with pytest.raises(LineTooLong):
+        # no newline ever comes: stops as soon as the line outgrows the cap
+        async for _ in iter_lines(chunks(*[b"x" * 3] * 1000), max_line=8):
+            pass
+
+async def _create_schema(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+def test_ndjson_upload_is_bounded(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'upload.db'}")
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def db():
+        async with Session() as session:
+            yield session
+
+    for name, value in {"bulk_batch_size": 2, "bulk_max_errors": 1,
+                        "bulk_upload_max_items": 5, "bulk_max_line_bytes": 64}.items():
+        monkeypatch.setattr(settings, name, value)
+    monkeypatch.setattr(todo_routers, "manager", ConnectionManager())
+    monkeypatch.setattr(todo_routers, "apply_write", lambda kind, todos: None)
+    app = FastAPI()
+    app.include_router(todo_routers.router, prefix="/tasks")
+    app.dependency_overrides[get_async_db] = db
+
+    with TestClient(app) as client:
+        client.portal.call(_create_schema, engine)
+        upload = client.post("/tasks/bulk/ndjson", content=b'{"title":"a"}\n{}\n{}\n{"title":"b"}')
+        assert upload.json()["created"] == 2
+        assert [e["index"] for e in upload.json()["errors"]] == [1]
+        assert upload.json()["errors_truncated"] is True
+
+        too_long = client.post("/tasks/bulk/ndjson",
+                               content=b'{"title":"c"}\n{"title":"' + b"x" * 100 + b'"}\n')
+        assert too_long.status_code == 413
+        assert too_long.json()["detail"].startswith("Line 2 is longer than 64 bytes")
+
+        too_many = client.post("/tasks/bulk/ndjson", content=b'{"title":"d"}\n' * 6)
+        assert too_many.status_code == 413
+        # what came before the limit stays created
+        assert "the 5 tasks before it were created" in too_many.json()["detail"]
+        client.portal.call(engine.dispose)
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, inspect, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.testclient import TestClient
+
+import routers.todo_routers as todo_routers
+from core.config import settings
+from core.startup import build_openapi, warm_up
+from database.async_connection import get_async_db
+from database.migrations import upgrade_to_head
+from models.todo import Base, TaskStatus, Todo
+
+def test_precompiled_openapi_is_current():
+    from main import app
+
+    with open(settings.openapi_path) as f:
+        shipped = json.load(f)
+    assert shipped == build_openapi(app), "stale openapi.json: run `python -m core.startup openapi.json`"
+    assert app.openapi() == shipped
+
+def test_precompiled_openapi_holds_no_settings(monkeypatch):
+    with open(settings.openapi_path) as f:
+        shipped = json.load(f)
+    wait = next(p for p in shipped["paths"]["/tasks/claim-next"]["post"]["parameters"] if p["name"] == "wait")
+    assert "maximum" not in wait["schema"]
+
+    # the bound is applied per request, from the settings in force
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(settings, "claim_wait_max", 1.0)
+    bare = FastAPI()
+    bare.include_router(todo_routers.router, prefix="/tasks")
+    bare.dependency_overrides[get_async_db] = no_db
+    response = TestClient(bare).post("/tasks/claim-next?wait=2", json={"assignee": "w1"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "wait may be at most 1.0 seconds"
+
+@pytest.mark.asyncio
+async def test_warm_up_compiles_hot_statements_and_writes_nothing(tmp_path):
+    url = f"sqlite:///{tmp_path / 'warm.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Todo), [{"title": "a", "status": TaskStatus.TODO}])
+    engine.dispose()
+
+    async_engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+    Session = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+    assert await warm_up(Session, connections=2) > 0
+    assert len(async_engine.sync_engine._compiled_cache) >= 5
+    async with Session() as db:
+        todo = (await db.scalars(select(Todo))).one()
+    assert (todo.status, todo.assignee) == (TaskStatus.TODO, None)
+    await async_engine.dispose()
+
+def test_migrations_build_the_schema(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setattr(settings, "database_url", url)
+    upgrade_to_head()
+    engine = create_engine(url)
+    tables = set(inspect(engine).get_table_names())
+    assert {"todos", "task_events", "alembic_version"} <= tables
+    migrated = {ix["name"] for ix in inspect(engine).get_indexes("todos")}
+    engine.dispose()
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'modelled.db'}")
+    Base.metadata.create_all(engine)
+    assert migrated == {ix["name"] for ix in inspect(engine).get_indexes("todos")}
+    engine.dispose()
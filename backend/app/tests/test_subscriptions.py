@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.testclient import TestClient
+
+import routers.ws_route as ws_route
+from core.ConnectionManager import ConnectionManager
+from core.subscriptions import Subscription, narrow_all
+from models.todo import Base, TaskStatus, Todo
+from service.task_cache import task_cache
+from tests.test_connection_manager import FakeWebSocket, drain
+
+def task(id, assignee=None, status="todo"):
+    return {"id": id, "title": f"t{id}", "assignee": assignee, "status": status}
+
+@pytest.mark.asyncio
+async def test_events_reach_only_matching_subscribers():
+    mgr = ConnectionManager()
+    everyone, ann, todo, watched = (FakeWebSocket() for _ in range(4))
+    await mgr.connect(everyone)
+    await mgr.connect(ann, subscription=Subscription.parse(assignee="ann"))
+    await mgr.connect(todo, subscription=Subscription.parse(status=["todo"]))
+    await mgr.connect(watched, subscription=Subscription.parse(ids=[5]))
+
+    await mgr.broadcast({"type": "task_created", "task": task(1, "ann")})
+    # a claim moves task 5 out of todo: the todo column hears about it
+    await mgr.broadcast({"type": "task_updated", "task": task(5, "bob", "inprogress")})
+    await mgr.broadcast({"type": "tasks_created", "tasks": [task(6, "ann"), task(7, "bob")]})
+    await mgr.broadcast({"type": "stats_delta", "by_status": {"todo": 1}, "by_assignee": {}})
+    await drain()
+
+    def seen(ws):
+        events = [json.loads(m) for m in ws.sent]
+        return [(e["type"], [t["id"] for t in e.get("tasks") or [e.get("task") or {}] if t]) for e in events]
+
+    assert seen(everyone) == [("task_created", [1]), ("task_updated", [5]),
+                              ("tasks_created", [6, 7]), ("stats_delta", [])]
+    assert seen(ann) == [("task_created", [1]), ("tasks_created", [6]), ("stats_delta", [])]
+    assert seen(todo) == [("task_created", [1]), ("task_updated", [5]),
+                          ("tasks_created", [6, 7]), ("stats_delta", [])]
+    assert seen(watched) == [("task_updated", [5]), ("stats_delta", [])]
+    # trimmed batches keep their seq, so resync positions stay valid
+    assert json.loads(ann.sent[1])["seq"] == 3
+
+    mgr.subscribe(ann, Subscription())
+    mgr.disconnect(watched)
+    assert mgr.metrics()["filtered_connections"] == 1
+    await mgr.broadcast({"type": "task_created", "task": task(8, "bob")})
+    await drain()
+    assert json.loads(ann.sent[-1])["task"]["id"] == 8
+
+def test_subscription_parsing_and_resync_narrowing():
+    assert Subscription.parse("todo,completed", "ann", "3,4").describe() == {
+        "status": ["completed", "todo"], "assignee": ["ann"], "ids": [3, 4]}
+    for bad in ({"status": "doing"}, {"ids": "x"}, {"assignee": [1]}, {"ids": list(range(3))}):
+        with pytest.raises(ValueError):
+            Subscription.parse(**bad, max_values=2)
+
+    missed = [json.dumps({"seq": 1, "type": "task_created", "task": task(1, "ann")}),
+              json.dumps({"seq": 2, "type": "task_created", "task": task(2, "bob")})]
+    assert [json.loads(p)["seq"] for p in narrow_all(missed, Subscription.parse(assignee="bob"))] == [2]
+
+def test_filtered_snapshot_and_subscribe_message(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'ws.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Todo), [
+            {"title": "a", "assignee": "ann", "status": TaskStatus.TODO},
+            {"title": "b", "assignee": "bob", "status": TaskStatus.INPROGRESS},
+            {"title": "c", "assignee": "ann", "status": TaskStatus.COMPLETED},
+        ])
+    engine.dispose()
+    async_engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+    monkeypatch.setattr(ws_route, "AsyncSessionLocal",
+                        async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False))
+    monkeypatch.setattr(ws_route, "manager", ConnectionManager())
+    task_cache.clear()
+    app = FastAPI()
+    app.include_router(ws_route.router_ws)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/tasks?assignee=ann") as ws:
+            snapshot = ws.receive_json()
+            assert snapshot["filter"] == {"assignee": ["ann"]}
+            assert [t["title"] for t in snapshot["tasks"]] == ["a", "c"]
+            assert snapshot["more"] is False
+
+            ws.send_text(json.dumps({"type": "subscribe", "status": ["inprogress", "completed"]}))
+            pages = [ws.receive_json()]
+            while pages[-1]["more"]:
+                pages.append(ws.receive_json())
+            assert sorted(t["title"] for p in pages for t in p["tasks"]) == ["b", "c"]
+
+            ws.send_text(json.dumps({"type": "subscribe", "ids": [1, 99]}))
+            assert [t["title"] for t in ws.receive_json()["tasks"]] == ["a"]
+
+            ws.send_text("nonsense")
+            assert ws.receive_json()["type"] == "error"
+    task_cache.clear()
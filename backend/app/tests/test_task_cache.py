@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from core.cache import ENTRY_OVERHEAD, ResponseCache, etag_matches
+from models.todo import TaskStatus
+from schemas.todo import TodoClaim, TodoCreate, TodoResponse
+from service.task_cache import CachedTaskService, ListScope, SearchScope, TaskScope, apply_event
+from service.todo_service import AsyncTodoService
+from tests.test_async_todo_service import db_session  # noqa: F401  (fixture)
+
+def event(kind, todo):
+    return jsonable_encoder({"type": kind, "task": TodoResponse.model_validate(todo)})
+
+def test_lru_respects_byte_bound():
+    cache = ResponseCache(max_bytes=3 * (10 + ENTRY_OVERHEAD))
+    for n in range(5):
+        cache.put(n, b"x" * 10, None, None, cache.version)
+    assert len(cache) == 3
+    assert cache.get(0) is None and cache.get(4) is not None
+    assert cache.stats()["evictions"] == 2
+
+def test_expired_entries_miss():
+    cache = ResponseCache(ttl=0)
+    cache.put("k", b"[]", None, None, cache.version)
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_put_after_racing_invalidation_is_dropped():
+    cache = ResponseCache()
+    version = cache.version
+    cache.invalidate(lambda scope: True)  # an event lands while we query
+    cache.put("k", b"[]", None, None, version)
+    assert cache.get("k") is None
+
+def test_etag_matching():
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"abc", W/"def"', 'W/"def"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"abc"', 'W/"abd"')
+    assert not etag_matches(None, 'W/"abc"')
+
+def test_scopes_evict_precisely():
+    created = {"id": 50, "status": "todo", "assignee": "bob"}
+    claimed = {"id": 5, "status": "inprogress", "assignee": "eve"}
+    first_page, last_page = ListScope(None, None, 0, 10), ListScope(None, None, 10, None)
+    assert not first_page.affected_by("task_created", created)
+    assert last_page.affected_by("task_created", created)
+    assert not ListScope(None, "alice", 10, None).affected_by("task_created", created)
+    assert first_page.affected_by("task_updated", claimed)
+    assert not last_page.affected_by("task_updated", claimed)
+    assert not ListScope("completed", None, 0, 10).affected_by("task_updated", claimed)
+    assert SearchScope(frozenset({1})).affected_by("task_created", created)
+    assert not SearchScope(frozenset({1})).affected_by("task_updated", claimed)
+    assert TaskScope(5).affected_by("task_updated", claimed)
+    assert not TaskScope(6).affected_by("task_updated", claimed)
+
+def test_unknown_events_clear_everything():
+    cache = ResponseCache()
+    cache.put("k", b"[]", None, TaskScope(1), cache.version)
+    assert apply_event({"type": "something_new"}, cache) == 1
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_list_is_served_from_cache_until_an_event_touches_it(db_session):
+    cache = ResponseCache()
+    for n in range(3):
+        await AsyncTodoService.create_task(db_session, TodoCreate(title=f"T{n}"))
+
+    first = await CachedTaskService.list_tasks(db_session, 2, cache=cache)
+    last = await CachedTaskService.list_tasks(db_session, 2, cursor=first.next_cursor, cache=cache)
+    assert await CachedTaskService.list_tasks(db_session, 2, cache=cache) is first
+    assert cache.stats()["hits"] == 1
+
+    todo = await AsyncTodoService.create_task(db_session, TodoCreate(title="T3"))
+    apply_event(event("task_created", todo), cache)
+    # only the open-ended last page could hold the new task
+    assert await CachedTaskService.list_tasks(db_session, 2, cache=cache) is first
+    fresh = await CachedTaskService.list_tasks(db_session, 2, cursor=first.next_cursor, cache=cache)
+    assert fresh is not last
+    assert [t["title"] for t in json.loads(fresh.body)] == ["T2", "T3"]
+    assert fresh.etag != last.etag
+
+@pytest.mark.asyncio
+async def test_by_id_and_search_follow_claims(db_session):
+    cache = ResponseCache()
+    todo = await AsyncTodoService.create_task(db_session, TodoCreate(title="Cache me"))
+    by_id = await CachedTaskService.get_task(db_session, todo.id, cache=cache)
+    found = await CachedTaskService.search_tasks_by_title(db_session, "Cache", limit=10, cache=cache)
+    assert json.loads(by_id.body)["status"] == "todo"
+
+    claimed = await AsyncTodoService.claim_task(db_session, todo.id, TodoClaim(assignee="eve"))
+    assert apply_event(event("task_updated", claimed), cache) == 2
+
+    by_id = await CachedTaskService.get_task(db_session, todo.id, cache=cache)
+    assert json.loads(by_id.body)["status"] == TaskStatus.INPROGRESS.value
+    found_again = await CachedTaskService.search_tasks_by_title(db_session, "Cache", limit=10, cache=cache)
+    assert found_again is not found
+    assert await CachedTaskService.get_task(db_session, 10_000, cache=cache) is None
+
+def test_batch_events_apply_per_task():
+    cache = ResponseCache()
+    cache.put("a", b"[]", None, TaskScope(1), cache.version)
+    cache.put("b", b"[]", None, TaskScope(2), cache.version)
+    cache.put("c", b"[]", None, TaskScope(3), cache.version)
+    tasks = [{"id": n, "status": "inprogress", "assignee": "x"} for n in (1, 3)]
+    assert apply_event({"type": "tasks_updated", "tasks": tasks}, cache) == 2
+    assert cache.get("b") is not None
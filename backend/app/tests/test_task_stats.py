@@ -0,0 +1,99 @@
+import json
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import service.todo_service as todo_service
+from core.cache import ResponseCache
+from models.todo import Base, TaskStatus, Todo
+from schemas.todo import TodoBulkClaim, TodoClaim, TodoCreate
+from service.task_cache import TaskScope, apply_event
+from core.ConnectionManager import ConnectionManager
+from service.task_stats import WORKER_ID, StatsPublisher, TaskStats, apply_stats_event
+from service.todo_service import AsyncTodoService
+from tests.test_connection_manager import FakeWebSocket, drain
+
+@pytest.fixture
+def stats(monkeypatch):
+    """Fresh counters for the service to bump, whatever other tests did."""
+    stats = TaskStats()
+    monkeypatch.setattr(todo_service, "task_stats", stats)
+    return stats
+
+@pytest.mark.asyncio
+async def test_service_writes_keep_counters_and_deltas_current(stats):
+    def counts():
+        snapshot = stats.snapshot()
+        return snapshot["by_status"], snapshot["by_assignee"]
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    sent = []
+
+    async def broadcast(event):
+        sent.append(event)
+
+    publisher = StatsPublisher(broadcast, Session, stats=stats)
+    await publisher.reconcile(publish=False)
+    assert sent == []
+    assert counts() == ({"todo": 0, "inprogress": 0, "completed": 0}, {})
+
+    async with Session() as db:
+        a = await AsyncTodoService.create_task(db, TodoCreate(title="a", assignee="pre"))
+        b, c = await AsyncTodoService.create_tasks(db, [TodoCreate(title="b"), TodoCreate(title="c")])
+        await AsyncTodoService.claim_task(db, a.id, TodoClaim(assignee="ann"))
+        await AsyncTodoService.claim_tasks(db, [TodoBulkClaim(id=b.id, assignee="ann", status="completed"),
+                                                TodoBulkClaim(id=a.id, assignee="bob")])
+    assert counts() == ({"todo": 1, "inprogress": 1, "completed": 1},
+                        {"ann": {"inprogress": 1, "completed": 1}})
+
+    await publisher.publish()
+    assert sent == [{"type": "stats_delta", "worker": WORKER_ID,
+                     "by_status": {"todo": 1, "inprogress": 1, "completed": 1},
+                     "by_assignee": {"ann": {"inprogress": 1, "completed": 1}}}]
+    await publisher.publish()
+    assert len(sent) == 1  # nothing new, nothing sent
+
+    # a write behind the service's back is caught by the next GROUP BY
+    async with Session() as db:
+        await db.execute(update(Todo).where(Todo.id == c.id).values(status=TaskStatus.COMPLETED, assignee="cy"))
+        await db.commit()
+    await publisher.reconcile()
+    assert counts()[1]["cy"] == {"completed": 1}
+    assert sent[-1]["type"] == "stats" and sent[-1]["by_status"] == {"inprogress": 1, "completed": 2}
+    await engine.dispose()
+
+def test_other_workers_deltas_apply_once():
+    stats = TaskStats()
+    stats.replace({"todo": 3}, {})
+    delta = {"type": "stats_delta", "by_status": {"todo": -1, "inprogress": 1}, "by_assignee": {"zed": {"inprogress": 1}}}
+    apply_stats_event({**delta, "worker": WORKER_ID}, stats)  # our own echo: already counted
+    assert stats.by_status == {"todo": 3}
+    apply_stats_event({**delta, "worker": "elsewhere"}, stats)
+    assert stats.snapshot()["by_status"] == {"todo": 2, "inprogress": 1, "completed": 0}
+    assert stats.snapshot()["by_assignee"] == {"zed": {"inprogress": 1}}
+    assert stats.take_delta() is None  # applied deltas are never re-published
+
+def test_stats_events_leave_the_response_cache_alone():
+    cache = ResponseCache()
+    cache.put("a", b"[]", None, TaskScope(1), cache.version)
+    assert apply_event({"type": "stats_delta", "by_status": {}, "by_assignee": {}}, cache) == 0
+    assert cache.get("a") is not None
+
+@pytest.mark.asyncio
+async def test_stats_are_published_without_a_seq():
+    mgr = ConnectionManager()
+    ws = FakeWebSocket()
+    await mgr.connect(ws)
+    await mgr.broadcast({"type": "task_created", "task": {"id": 1}})
+    await mgr.publish({"type": "stats_delta", "by_status": {"todo": 1}, "by_assignee": {}})
+    await drain()
+
+    assert [json.loads(m).get("seq") for m in ws.sent] == [1, None]
+    # the replay buffer holds task events only
+    assert mgr.events.since(0, mgr.events.epoch) == [ws.sent[0]]
+    assert mgr.events.last_seq == 1
@@ -1,5 +1,7 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from models.todo import Base
@@ -61,4 +63,108 @@ def test_update_assignee_and_status_nonexistent(db_session):
     # updating a missing ID returns None
     assert TodoRepository.update_assignee_and_status(
         db_session, task_id=1234, assignee="x", status=TaskStatus.TODO
-    ) is None
\ No newline at end of file
+    ) is None
+
+def test_list_page_keyset_and_filters(db_session):
+    db_session.query(Todo).delete()
+    db_session.commit()
+    saved = [
+        TodoRepository.save(db_session, Todo(title=f"Page{i}", assignee="carol" if i % 2 else None, status=TaskStatus.TODO))
+        for i in range(5)
+    ]
+
+    first = TodoRepository.list_page(db_session, limit=2)
+    assert [t.id for t in first] == [saved[0].id, saved[1].id]
+    rest = TodoRepository.list_page(db_session, limit=10, after_id=first[-1].id)
+    assert [t.id for t in rest] == [t.id for t in saved[2:]]
+
+    mine = TodoRepository.list_page(db_session, limit=10, assignee="carol")
+    assert [t.id for t in mine] == [saved[1].id, saved[3].id]
+
+def test_list_page_projection_returns_dicts(db_session):
+    rows = TodoRepository.list_page(db_session, limit=1, columns=["id", "title"])
+    assert rows and set(rows[0]) == {"id", "title"}
+
+def test_search_by_title_prefix_rank_and_paging(db_session):
+    db_session.query(Todo).delete()
+    db_session.commit()
+    TodoRepository.save(db_session, Todo(title="deploy the release notes", status=TaskStatus.TODO))
+    TodoRepository.save(db_session, Todo(title="release", status=TaskStatus.TODO))
+    TodoRepository.save(db_session, Todo(title="unrelated chore", status=TaskStatus.TODO))
+
+    # prefix match, shorter (denser) title ranks first
+    results = TodoRepository.search_by_title(db_session, "rel")
+    assert [t.title for t in results] == ["release", "deploy the release notes"]
+
+    page = TodoRepository.search_by_title(db_session, "rel", limit=1, offset=1)
+    assert [t.title for t in page] == ["deploy the release notes"]
+
+    # every word must match
+    assert TodoRepository.search_by_title(db_session, "release deploy")[0].title.startswith("deploy")
+
+def test_search_index_follows_title_updates(db_session):
+    t = TodoRepository.save(db_session, Todo(title="old name", status=TaskStatus.TODO))
+    t.title = "fresh name"
+    TodoRepository.save(db_session, t)
+    assert TodoRepository.search_by_title(db_session, "old") == []
+    assert [r.id for r in TodoRepository.search_by_title(db_session, "fresh")] == [t.id]
+
+def test_search_ignores_fts_syntax(db_session):
+    assert TodoRepository.search_by_title(db_session, '"*') == []
+    assert TodoRepository.search_by_title(db_session, 'name" OR title:*') == []
+
+def test_iter_batches_streams_in_id_order(db_session):
+    db_session.query(Todo).delete()
+    db_session.commit()
+    for i in range(7):
+        TodoRepository.save(db_session, Todo(title=f"stream {i}", assignee="ann" if i % 2 else None,
+                                             status=TaskStatus.TODO))
+    batches = list(TodoRepository.iter_batches(db_session, 3))
+    assert [len(b) for b in batches] == [3, 3, 1]
+    ids = [t.id for b in batches for t in b]
+    assert ids == sorted(ids)
+    assert [len(b) for b in TodoRepository.iter_batches(db_session, 3, assignee="ann")] == [3]
+
+def test_next_claimable_is_oldest_todo_first(db_session):
+    db_session.query(Todo).delete()
+    db_session.commit()
+    now = datetime.now(timezone.utc)
+    newer = TodoRepository.save(db_session, Todo(title="newer", status=TaskStatus.TODO, created_at=now))
+    taken = TodoRepository.save(db_session, Todo(title="taken", status=TaskStatus.INPROGRESS, assignee="bo",
+                                                 created_at=now - timedelta(hours=2)))
+    older = TodoRepository.save(db_session, Todo(title="older", status=TaskStatus.TODO,
+                                                 created_at=now - timedelta(hours=1)))
+    assert [t.id for t in TodoRepository.next_claimable(db_session, 5)] == [older.id, newer.id]
+    assert [t.id for t in TodoRepository.next_claimable(db_session)] == [older.id]
+    assert taken.id not in {t.id for t in TodoRepository.next_claimable(db_session, 5)}
+
+def query_plan(session, call) -> str:
+    """EXPLAIN QUERY PLAN of the last statement `call` executes."""
+    executed = []
+    engine = session.get_bind()
+    listener = lambda conn, cursor, statement, params, context, many: executed.append((statement, params))
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    statement, params = executed[-1]
+    rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params)
+    return "\n".join(row[3] for row in rows)
+
+@pytest.mark.parametrize("call, index", [
+    (lambda db: TodoRepository.list_by_status(db, TaskStatus.TODO, 10, after_id=3), "ix_todos_status_id"),
+    (lambda db: TodoRepository.list_by_assignee(db, "bo", 10), "ix_todos_assignee_id"),
+    (lambda db: TodoRepository.list_by_assignee(db, "bo", 10, status=TaskStatus.INPROGRESS),
+     "ix_todos_assignee_status_id"),
+])
+def test_listings_are_index_range_scans(db_session, call, index):
+    plan = query_plan(db_session, lambda: call(db_session))
+    assert f"INDEX {index} (" in plan, plan
+    # rows come off the index in id order: no sort, no table scan
+    assert "TEMP B-TREE" not in plan and "SCAN todos" not in plan, plan
+
+def test_next_claimable_reads_the_claim_queue_index(db_session):
+    plan = query_plan(db_session, lambda: TodoRepository.next_claimable(db_session, 10))
+    assert "SCAN todos USING INDEX ix_todos_claimable" in plan, plan
+    assert "ix_todos_status_id" not in plan, plan
@@ -3,8 +3,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from models.todo import Base, TaskStatus
-from schemas.todo import TodoCreate, TodoClaim
-from services.todo_service import TodoService
+from schemas.todo import TodoBulkClaim, TodoCreate, TodoClaim
+from core.pagination import InvalidCursor
+from service.todo_service import TodoService
 
 @pytest.fixture(scope="module")
 def db_session():
@@ -61,4 +62,47 @@ def test_claim_task_invalid_state_raises(db_session):
     db_session.commit()
 
     with pytest.raises(ValueError):
-        TodoService.claim_task(db_session, todo.id, TodoClaim(assignee="alice"))
\ No newline at end of file
+        TodoService.claim_task(db_session, todo.id, TodoClaim(assignee="alice"))
+
+def test_list_tasks_follows_cursor_to_the_end(db_session):
+    db_session.query(Base.metadata.tables['todos']).delete()
+    db_session.commit()
+    for i in range(5):
+        TodoService.create_task(db_session, TodoCreate(title=f"Paged{i}", description="", assignee=None))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = TodoService.list_tasks(db_session, limit=2, cursor=cursor)
+        seen.extend(t.title for t in page)
+        if cursor is None:
+            break
+    assert seen == [f"Paged{i}" for i in range(5)]
+
+def test_list_tasks_projection_always_includes_id(db_session):
+    page, _ = TodoService.list_tasks(db_session, limit=3, fields=["title"])
+    assert all(set(row) == {"id", "title"} for row in page)
+
+def test_list_tasks_rejects_garbage_cursor(db_session):
+    with pytest.raises(InvalidCursor):
+        TodoService.list_tasks(db_session, limit=2, cursor="not-a-cursor")
+
+def test_create_tasks_returns_rows_in_input_order(db_session):
+    todos = TodoService.create_tasks(db_session, [TodoCreate(title=f"Bulk{n}") for n in range(5)])
+    assert [t.title for t in todos] == [f"Bulk{n}" for n in range(5)]
+    assert all(t.id and t.status == TaskStatus.TODO and t.created_at for t in todos)
+    assert todos == sorted(todos, key=lambda t: t.id)
+
+def test_claim_tasks_reports_each_failure(db_session):
+    first, second = TodoService.create_tasks(db_session, [TodoCreate(title="C1"), TodoCreate(title="C2")])
+    claimed, failures = TodoService.claim_tasks(db_session, [
+        TodoBulkClaim(id=first.id, assignee="ann"),
+        TodoBulkClaim(id=first.id, assignee="bob"),  # lost to the claim above
+        TodoBulkClaim(id=999_999, assignee="cy"),
+        TodoBulkClaim(id=second.id, assignee="dee", status=TaskStatus.COMPLETED),
+    ])
+    assert [(t.id, t.assignee) for t in claimed] == [(first.id, "ann"), (second.id, "dee")]
+    assert claimed[1].status == TaskStatus.COMPLETED
+    assert failures == [
+        (1, first.id, "Only TODO tasks can be claimed"),
+        (2, 999_999, "Not found"),
+    ]
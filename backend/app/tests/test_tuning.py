@@ -0,0 +1,36 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, text
+
+from core.config import Settings
+from database.tuning import apply_sqlite_pragmas, engine_options, engine_url, sqlite_pragmas
+
+def test_production_profile_sets_pragmas_on_every_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(engine, sqlite_pragmas(Settings(sqlite_busy_timeout_ms=1234)))
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -64 * 1024
+    engine.dispose()
+
+def test_pragma_values_are_validated():
+    # they are interpolated into PRAGMA statements on every connection
+    with pytest.raises(ValidationError):
+        Settings(sqlite_journal_mode="wal; DROP TABLE todos")
+    with pytest.raises(ValidationError):
+        Settings(sqlite_synchronous="normall")
+
+def test_legacy_profile_keeps_sqlite_defaults():
+    assert sqlite_pragmas(Settings(storage_profile="legacy")) == []
+
+def test_pool_options_only_for_server_databases():
+    settings = Settings(db_pool_size=7, db_prepared_statement_cache_size=0)
+    sqlite = engine_options("sqlite:///./todos.db", settings)
+    assert "pool_size" not in sqlite and sqlite["connect_args"] == {"check_same_thread": False}
+    postgres = engine_options("postgresql+asyncpg://u:p@db/todos", settings)
+    assert postgres["pool_size"] == 7 and postgres["pool_pre_ping"] is True
+    assert engine_url("postgresql+asyncpg://u:p@db/todos", settings).endswith(
+        "?prepared_statement_cache_size=0"
+    )
@@ -40,12 +40,35 @@ function App() {
           case 'snapshot':
             setTasks(msg.tasks);
             break;
+          case 'snapshot_page':
+            setTasks(prev => {
+              const seen = new Set(prev.map(t => t.id));
+              return [...prev, ...msg.tasks.filter(t => !seen.has(t.id))];
+            });
+            break;
           case 'task_created':
-            setTasks(prev => [msg.task, ...prev]);
+            // may already be present when it landed in a snapshot page
+            setTasks(prev => [msg.task, ...prev.filter(t => t.id !== msg.task.id)]);
             break;
           case 'task_updated':
             setTasks(prev => prev.map(t => t.id === msg.task.id ? msg.task : t));
             break;
+          case 'tasks_created': {
+            const added = new Set(msg.tasks.map(t => t.id));
+            // newest first, like single creates
+            setTasks(prev => [...[...msg.tasks].reverse(), ...prev.filter(t => !added.has(t.id))]);
+            break;
+          }
+          case 'tasks_updated': {
+            const updated = new Map(msg.tasks.map(t => [t.id, t]));
+            setTasks(prev => prev.map(t => updated.get(t.id) ?? t));
+            break;
+          }
+          case 'tasks_archived': {
+            const archived = new Set(msg.tasks.map(t => t.id));
+            setTasks(prev => prev.filter(t => !archived.has(t.id)));
+            break;
+          }
         }
       } catch (err) {
         console.error('Error handling WebSocket message:', err);
@@ -1,4 +1,9 @@
-import type { WebSocketMessageData } from '../types/websocket';
+import type { TaskSubscription, WebSocketMessageData } from '../types/websocket';
+
+const MESSAGE_TYPES = [
+  'snapshot', 'snapshot_page', 'resync', 'task_created', 'task_updated',
+  'tasks_created', 'tasks_updated', 'tasks_archived', 'stats', 'stats_delta', 'error', 'batch',
+];
 
 export class WebSocketService {
   private static instance: WebSocketService;
@@ -9,6 +14,11 @@ export class WebSocketService {
   private isConnected: boolean = false;
   private reconnectAttempts: number = 0;
   private maxReconnectAttempts: number = 10;
+  // Position in the server's event stream, sent on reconnect to resync
+  private epoch: string | null = null;
+  private lastSeq: number | null = null;
+  // Current topic filter, re-sent in the URL on every reconnect
+  private subscription: TaskSubscription = {};
 
   private constructor() {
     this.connect();
@@ -29,7 +39,18 @@ export class WebSocketService {
     }
 
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const WS_URL = `${protocol}//${window.location.host}/ws/tasks`;
+    const params = new URLSearchParams();
+    if (this.epoch !== null && this.lastSeq !== null) {
+      params.set('since', String(this.lastSeq));
+      params.set('epoch', this.epoch);
+    }
+    for (const [key, values] of Object.entries(this.subscription)) {
+      if (values && values.length) {
+        params.set(key, values.join(','));
+      }
+    }
+    const query = params.toString();
+    const WS_URL = `${protocol}//${window.location.host}/ws/tasks${query ? `?${query}` : ''}`;
     
     try {
       this.ws = new WebSocket(WS_URL);
@@ -65,6 +86,10 @@ export class WebSocketService {
     };
 
     this.ws.onmessage = (event) => {
+      // closing for a resync: later frames must not move lastSeq past the gap
+      if (this.ws?.readyState !== WebSocket.OPEN) {
+        return;
+      }
       try {
         const data = JSON.parse(event.data);
         
@@ -75,19 +100,49 @@ export class WebSocketService {
         }
         
         // Type check for recognized message types
-        if (!['snapshot', 'task_created', 'task_updated'].includes(data.type)) {
+        if (!MESSAGE_TYPES.includes(data.type)) {
           console.warn('Unknown WebSocket message type:', data.type);
           return;
         }
+
+        // events were dropped since the last one we saw: reconnect with
+        // `since` and let the server replay them. (Seqs are not contiguous
+        // per socket: filters, merged batches and cross-worker ordering skip
+        // numbers, so the server marks real gaps instead.)
+        if (typeof data.prev === 'number' && this.lastSeq !== null && data.prev > this.lastSeq) {
+          console.warn(`WebSocket missed events after seq ${this.lastSeq}, resyncing`);
+          this.ws?.close();
+          return;
+        }
+
+        if (data.type === 'snapshot' || data.type === 'resync') {
+          this.epoch = data.epoch;
+          this.lastSeq = data.seq;
+        } else if (typeof data.seq === 'number') {
+          // events the snapshot already covered may follow it
+          this.lastSeq = Math.max(this.lastSeq ?? 0, data.seq);
+        }
         
         console.log('📨 WebSocket message:', data);
-        this.messageHandlers.forEach(handler => handler(data as WebSocketMessageData));
+        // a batch frame carries several events; handlers see them one by one
+        const events: WebSocketMessageData[] = data.type === 'batch' ? data.events : [data];
+        events.forEach(message => {
+          this.messageHandlers.forEach(handler => handler(message));
+        });
       } catch (error) {
         console.error('Failed to parse WebSocket message:', error);
       }
     };
   }
 
+  // Narrow the stream to matching tasks ({} for all); a snapshot of them follows
+  public subscribe(subscription: TaskSubscription) {
+    this.subscription = subscription;
+    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      this.ws.send(JSON.stringify({ type: 'subscribe', ...subscription }));
+    }
+  }
+
   private scheduleReconnect() {
     if (!this.reconnectTimer) {
       this.reconnectAttempts++;
@@ -1,17 +1,61 @@
 import { Task } from './task';
 
 // Define the message types
-export type WebSocketMessageType = 'snapshot' | 'task_created' | 'task_updated';
+export type WebSocketMessageType =
+  | 'snapshot'
+  | 'snapshot_page'
+  | 'resync'
+  | 'task_created'
+  | 'task_updated'
+  | 'tasks_created'
+  | 'tasks_updated'
+  | 'tasks_archived'
+  | 'stats'
+  | 'stats_delta'
+  | 'error'
+  | 'batch';
 
 // Base interface for all WebSocket messages
 export interface WebSocketMessage {
   type: WebSocketMessageType;
+  // Sequence number carried by broadcast events
+  seq?: number;
+  // Set on the first frame after the server dropped events for this
+  // socket (its queue overflowed): the newest seq dropped
+  prev?: number;
 }
 
-// Snapshot message containing all tasks
+// Topic filter for /ws/tasks; a task must match every field that is set
+export interface TaskSubscription {
+  status?: string[];
+  assignee?: string[];
+  ids?: number[];
+}
+
+// First page of a full snapshot; more pages follow while `more` is true.
+// Also the answer to a subscribe message, covering just the new filter.
 export interface SnapshotMessage extends WebSocketMessage {
   type: 'snapshot';
+  epoch: string;
+  seq: number;
   tasks: Task[];
+  more: boolean;
+  filter?: TaskSubscription;
+}
+
+// Subsequent snapshot page
+export interface SnapshotPageMessage extends WebSocketMessage {
+  type: 'snapshot_page';
+  tasks: Task[];
+  more: boolean;
+}
+
+// Sent on reconnect instead of a snapshot; `count` missed events follow
+export interface ResyncMessage extends WebSocketMessage {
+  type: 'resync';
+  epoch: string;
+  since: number;
+  count: number;
 }
 
 // Message for a single task creation
@@ -26,8 +70,64 @@ export interface TaskUpdatedMessage extends WebSocketMessage {
   task: Task;
 }
 
+// One event per batch of a bulk create
+export interface TasksCreatedMessage extends WebSocketMessage {
+  type: 'tasks_created';
+  tasks: Task[];
+}
+
+// One event per batch of a bulk claim
+export interface TasksUpdatedMessage extends WebSocketMessage {
+  type: 'tasks_updated';
+  tasks: Task[];
+}
+
+// Completed tasks moved to the archive; they leave the board
+export interface TasksArchivedMessage extends WebSocketMessage {
+  type: 'tasks_archived';
+  tasks: Pick<Task, 'id' | 'status' | 'assignee'>[];
+}
+
+// Per-status counts and per-assignee counts by status
+export interface StatsCounts {
+  by_status: Record<string, number>;
+  by_assignee: Record<string, Record<string, number>>;
+}
+
+// Full counts after reconciliation found drift; replaces local counts
+export interface StatsMessage extends WebSocketMessage, StatsCounts {
+  type: 'stats';
+}
+
+// Coalesced count changes from one worker; added to local counts
+export interface StatsDeltaMessage extends WebSocketMessage, StatsCounts {
+  type: 'stats_delta';
+  worker: string;
+}
+
+// A client message the server could not use (e.g. a bad subscribe)
+export interface ErrorMessage extends WebSocketMessage {
+  type: 'error';
+  detail: string;
+}
+
+// Events coalesced by the server's batch window, oldest first; `seq` is
+// the last one's. The WebSocket service unwraps these before handlers run.
+export interface BatchMessage extends WebSocketMessage {
+  type: 'batch';
+  events: WebSocketMessageData[];
+}
+
 // Union type of all possible message formats
 export type WebSocketMessageData = 
   | SnapshotMessage
+  | SnapshotPageMessage
+  | ResyncMessage
   | TaskCreatedMessage
-  | TaskUpdatedMessage;
+  | TaskUpdatedMessage
+  | TasksCreatedMessage
+  | TasksUpdatedMessage
+  | TasksArchivedMessage
+  | StatsMessage
+  | StatsDeltaMessage
+  | ErrorMessage;